@@ -0,0 +1,84 @@
+"""
+页面分类微基准：比较 page_classifier 各匹配后端的单个 URL 分类耗时，并校验各后端结果一致。
+
+用法:
+    python benchmarks/bench_classifier.py                 # 合成 URL (默认 20 万条)
+    python benchmarks/bench_classifier.py -n 500000
+    python benchmarks/bench_classifier.py --csv crawl.csv # 使用 Screaming Frog 导出 (Address / Title 1 列)
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from page_classifier import BACKENDS, PageClassifier, ahocorasick  # noqa: E402
+
+SEGMENTS = ["about", "contact-us", "faq", "help", "news", "blog", "press", "product", "products", "shop",
+            "category", "collection", "item", "service", "tag", "list", "2024", "story", "search", "?s=test",
+            "关于", "产品", "en", "index.html", "deep", "p", "media", "solutions", "detail", "page"]
+BRANDS = ["Brand", "Acme Co", "The Store", "品牌", "Vape Works"]
+
+
+def synthetic_rows(n, seed=1):
+    """生成近似真实站点的 (URL, 标题)：多数为带 slug 的深层页面，少量首页/无标题"""
+    rng = random.Random(seed)
+    domains = [f"www.site{i}.com" for i in range(50)]
+    rows = []
+    for i in range(n):
+        path = "/".join(rng.choice(SEGMENTS) for _ in range(rng.randint(0, 4)))
+        if rng.random() < 0.7:
+            path += f"/item-{i}-{rng.randrange(10 ** 6)}"
+        url = f"https://{rng.choice(domains)}/{path}"
+        title = "" if rng.random() < 0.05 else f"Page {i} | {rng.choice(BRANDS)}"
+        rows.append((url, title))
+    return rows
+
+
+def csv_rows(path, limit):
+    import pandas as pd
+    df = pd.read_csv(path, nrows=limit or None)
+    df.columns = df.columns.str.strip()
+    titles = df["Title 1"] if "Title 1" in df.columns else [""] * len(df)
+    return list(zip(df["Address"].astype(str), titles))
+
+
+def bench(classifier, rows, repeat):
+    """返回 (最佳总耗时 秒, 分类结果)"""
+    best, result = None, None
+    classify = classifier.classify
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = [classify(url, title) for url, title in rows]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="page_classifier 微基准")
+    parser.add_argument("-n", type=int, default=200000, help="合成 URL 数量")
+    parser.add_argument("--csv", help="使用 Screaming Frog 导出的 CSV 代替合成数据")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数 (取最快一次)")
+    args = parser.parse_args()
+
+    rows = csv_rows(args.csv, args.n) if args.csv else synthetic_rows(args.n)
+    print(f"📊 {len(rows)} 个 URL，重复 {args.repeat} 次取最快")
+    if ahocorasick is None:
+        print("ℹ️ 未安装 pyahocorasick，跳过 ahocorasick 后端 (pip install pyahocorasick)")
+
+    baseline = None
+    for backend in BACKENDS:
+        if backend == "ahocorasick" and ahocorasick is None:
+            continue
+        elapsed, result = bench(PageClassifier(backend=backend), rows, args.repeat)
+        if baseline is None:
+            baseline = result
+        same = "✅ 一致" if result == baseline else "❌ 结果不一致"
+        print(f"   - {backend:<12} {elapsed * 1e6 / len(rows):6.2f} µs/URL | {len(rows) / elapsed:>9,.0f} URL/s | {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+本地合成站点 (基准测试用)：每个项目一个 127.0.0.1 端口，页面结构模仿常见企业站/电商站。
+
+包含: 无限滚动 (滚动到底部时 fetch 追加内容)、懒加载图片 (loading=lazy + data-src)、年龄验证弹窗、
+慢资源 (延迟返回的 JS/图片)、301/302 重定向链、robots.txt、sitemap 索引 (含 .xml.gz 子文件)、noindex 页面与 404。
+所有内容由参数决定，同样的参数每次生成完全相同的站点。
+
+单独运行可手动浏览: python benchmarks/fixture_site.py --sites 2
+"""
+import argparse
+import gzip
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BRANDS = ["Acme Vapor", "Northwind", "Bluepeak", "Lumen Labs", "Orbit Goods", "Cedar & Co", "Kite Audio", "Moss Tech"]
+
+
+def make_png(width, height, seed):
+    """生成纯色渐变 PNG (不依赖 Pillow)"""
+    rows = []
+    for y in range(height):
+        shade = (seed * 37 + y * 255 // max(1, height - 1)) % 256
+        rows.append(b"\x00" + bytes((shade, (seed * 91) % 256, 255 - shade)) * width)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"".join(rows), 6)) + chunk(b"IEND", b"")
+
+
+class FixtureSite:
+    """
+    单个合成站点的页面与参数。
+    scroll_batches: 无限滚动可追加的批次数；lazy_images: 首页懒加载图片数；slow_ms: 慢资源延迟；
+    age_gate: 是否显示年龄验证弹窗；products / news: 详情页数量
+    """
+    def __init__(self, index, scroll_batches=4, lazy_images=12, slow_ms=800, age_gate=False, products=30, news=20):
+        self.index = index
+        self.brand = BRANDS[index % len(BRANDS)]
+        self.scroll_batches = scroll_batches
+        self.lazy_images = lazy_images
+        self.slow_ms = slow_ms
+        self.age_gate = age_gate
+        self.products = products
+        self.news = news
+        self.base_url = ""
+        self.hits = 0 # 请求计数 (所有路径)
+        self._png = {}
+
+    # ---------- 页面清单 ----------
+
+    def detail_paths(self):
+        products = [f"/products/{i:03d}-{self.slug(i)}/" for i in range(self.products)]
+        news = [f"/news/2024/{i:03d}-announcement-{self.slug(i + 7)}.html" for i in range(self.news)]
+        return products, news
+
+    @staticmethod
+    def slug(i):
+        words = ["alpha", "vertex", "nimbus", "delta", "quartz", "ember", "zenith", "harbor", "cobalt", "onyx"]
+        return f"{words[i % 10]}-{words[(i * 3 + 1) % 10]}"
+
+    def key_pages(self):
+        """基准任务表使用的页面: (Category, PageType, 路径)"""
+        products, news = self.detail_paths()
+        return [
+            ("首页", "首页", "/"),
+            ("关于我们", "关于我们", "/about-us/"),
+            ("联系我们", "联系我们", "/contact/"),
+            ("FAQ", "FAQ", "/faq/"),
+            ("新闻", "新闻聚合页", "/news/"),
+            ("新闻", "新闻单页", news[len(news) // 2]),
+            ("产品", "产品聚合页", "/products/"),
+            ("产品", "产品分类页", "/product-category/featured/"),
+            ("产品", "产品单页", products[len(products) // 2]),
+            ("其他", "重定向", "/go/contact"),
+        ]
+
+    # ---------- HTML ----------
+
+    def layout(self, title, body, extra_head=""):
+        nav = "".join(f'<a href="{href}">{text}</a> ' for href, text in [
+            ("/", "Home"), ("/about-us/", "About Us"), ("/contact/", "Contact"), ("/faq/", "FAQ"),
+            ("/news/", "News"), ("/products/", "Products"), ("/product-category/featured/", "Featured"),
+            ("/search/?s=demo", "Search"), ("/old-about", "Our Story"),
+        ])
+        gate = ""
+        if self.age_gate:
+            gate = """
+<div id="age-gate" style="position:fixed;inset:0;background:rgba(0,0,0,.85);z-index:9999;display:flex;align-items:center;justify-content:center">
+  <div style="background:#fff;padding:40px;text-align:center"><p>You must be 21+ to enter.</p>
+  <button id="age-gate-yes" onclick="document.cookie='age=1;path=/';document.getElementById('age-gate').remove()">I am 21+</button></div>
+</div>
+<script>if (document.cookie.indexOf('age=1') >= 0) document.getElementById('age-gate').remove();</script>"""
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} | {self.brand}</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">{extra_head}
+<script src="/static/slow.js?ms={self.slow_ms}" defer></script>
+<style>body{{font-family:sans-serif;margin:0}} header{{padding:16px;background:#223}} header a{{color:#fff;margin-right:12px}}
+main{{padding:24px;max-width:1200px;margin:auto}} .grid{{display:grid;grid-template-columns:repeat(4,1fr);gap:16px}}
+.card{{border:1px solid #ddd;padding:12px;min-height:260px}} .card img{{width:100%;height:160px;background:#eee}}</style>
+</head><body><header>{nav}</header><main>{body}</main>{gate}
+<footer style="padding:40px;background:#eee">&copy; {self.brand}</footer></body></html>"""
+
+    def cards(self, start, count, link_prefix="/products/"):
+        products, _ = self.detail_paths()
+        html = []
+        for i in range(start, start + count):
+            href = products[i % len(products)] if link_prefix == "/products/" else f"{link_prefix}{i}"
+            html.append(f'<div class="card"><img loading="lazy" data-src="/img/{i}.png?ms={self.slow_ms // 4}" alt="">'
+                        f'<a href="{href}">Item {i}</a><p>{"Lorem ipsum dolor sit amet. " * 6}</p></div>')
+        return "".join(html)
+
+    def home(self):
+        products, news = self.detail_paths()
+        links = "".join(f'<li><a href="{p}">{p}</a></li>' for p in products[:6] + news[:6])
+        body = f"""<h1>Welcome to {self.brand}</h1><ul>{links}</ul>
+<div id="feed" class="grid">{self.cards(0, self.lazy_images)}</div><div id="sentinel" style="height:40px"></div>
+<script>
+(function () {{
+  var page = 0, loading = false, max = {self.scroll_batches};
+  var io = new IntersectionObserver(function (entries) {{
+    entries.forEach(function (e) {{ if (e.isIntersecting && e.target.dataset.src) {{ e.target.src = e.target.dataset.src; io.unobserve(e.target); }} }});
+  }}, {{ rootMargin: "200px" }});
+  function watch() {{ document.querySelectorAll("img[data-src]:not([src])").forEach(function (img) {{ io.observe(img); }}); }}
+  function more() {{
+    if (loading || page >= max) return;
+    loading = true;
+    fetch("/api/more?page=" + (++page)).then(function (r) {{ return r.text(); }}).then(function (html) {{
+      document.getElementById("feed").insertAdjacentHTML("beforeend", html); loading = false; watch();
+    }});
+  }}
+  window.addEventListener("scroll", function () {{
+    if (window.innerHeight + window.scrollY > document.body.scrollHeight - 600) more();
+  }});
+  watch();
+}})();
+</script>"""
+        return self.layout("Home", body)
+
+    def listing(self, title, paths):
+        items = "".join(f'<li><a href="{p}">{p.strip("/").split("/")[-1]}</a></li>' for p in paths)
+        return self.layout(title, f"<h1>{title}</h1><ul>{items}</ul><div class='grid'>{self.cards(0, 8)}</div>")
+
+    def page(self, path):
+        """返回 (状态码, 附加响应头, 内容类型, 正文)"""
+        products, news = self.detail_paths()
+        simple = {
+            "/about-us/": ("About Us", "<h1>About us</h1><p>Our story since 1999.</p>"),
+            "/contact/": ("Contact", "<h1>Contact</h1><form><input name='email'><button>Send</button></form>"),
+            "/faq/": ("FAQ", "<h1>FAQ</h1>" + "<details><summary>Question?</summary>Answer.</details>" * 10),
+            "/search/": ("Search", "<h1>Search results</h1>"),
+        }
+        html = "text/html; charset=utf-8"
+        if path == "/":
+            return 200, {}, html, self.home()
+        if path in simple:
+            title, body = simple[path]
+            return 200, {}, html, self.layout(title, body)
+        if path == "/news/":
+            return 200, {}, html, self.listing("News", news)
+        if path == "/products/":
+            return 200, {}, html, self.listing("Products", products)
+        if path == "/product-category/featured/":
+            return 200, {}, html, self.listing("Featured Products", products[::3])
+        if path in products:
+            i = products.index(path)
+            return 200, {}, html, self.layout(f"Product {i}", f"<h1>Product {i}</h1><div class='grid'>{self.cards(i, 4)}</div>")
+        if path in news:
+            i = news.index(path)
+            head = '\n<meta name="robots" content="noindex,follow">' if i == 0 else "" # 第一篇新闻不可索引
+            return 200, {}, html, self.layout(f"Announcement {i}", f"<h1>Announcement {i}</h1><p>{'News text. ' * 200}</p>", head)
+        # 重定向: 301 单跳 / 302 两跳
+        if path == "/old-about":
+            return 301, {"Location": "/about-us/"}, html, ""
+        if path == "/go/contact":
+            return 302, {"Location": "/go/contact-2"}, html, ""
+        if path == "/go/contact-2":
+            return 302, {"Location": "/contact/"}, html, ""
+        return 404, {}, html, self.layout("404 Not Found", "<h1>404</h1>")
+
+    # ---------- SEO 文件 ----------
+
+    def robots(self):
+        return f"User-agent: *\nDisallow: /search/\nSitemap: {self.base_url}/sitemap_index.xml\n"
+
+    def sitemap_index(self):
+        items = "".join(f"<sitemap><loc>{self.base_url}{p}</loc></sitemap>" for p in ("/sitemap-pages.xml", "/sitemap-products.xml.gz"))
+        return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{items}</sitemapindex>'
+
+    def urlset(self, paths):
+        items = "".join(f"<url><loc>{self.base_url}{p}</loc></url>" for p in paths)
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{items}</urlset>'
+
+    def png(self, n):
+        if n not in self._png:
+            self._png[n] = make_png(320, 160, self.index * 100 + n)
+        return self._png[n]
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass # 静默
+
+        def send(self, status, content_type, body, headers=None):
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(data)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            site.hits += 1
+            parsed = urlparse(self.path)
+            path, query = parsed.path, parse_qs(parsed.query)
+            delay = int(query.get("ms", ["0"])[0]) / 1000.0
+            products, news = site.detail_paths()
+
+            if path == "/robots.txt":
+                return self.send(200, "text/plain", site.robots())
+            if path == "/sitemap_index.xml":
+                return self.send(200, "application/xml", site.sitemap_index())
+            if path == "/sitemap-pages.xml":
+                pages = ["/", "/about-us/", "/contact/", "/faq/", "/news/", "/products/"] + news
+                return self.send(200, "application/xml", site.urlset(pages))
+            if path == "/sitemap-products.xml.gz":
+                return self.send(200, "application/x-gzip", gzip.compress(site.urlset(products).encode("utf-8")))
+            if path == "/static/slow.js":
+                time.sleep(delay)
+                return self.send(200, "application/javascript", "window.__fixtureSlowLoaded = true;")
+            if path.startswith("/img/"):
+                time.sleep(delay)
+                try:
+                    n = int(path[5:].split(".")[0])
+                except ValueError:
+                    n = 0
+                return self.send(200, "image/png", site.png(n % 64), {"Cache-Control": "max-age=3600"})
+            if path == "/api/more":
+                page = int(query.get("page", ["1"])[0])
+                if page > site.scroll_batches:
+                    return self.send(200, "text/html", "")
+                return self.send(200, "text/html", site.cards(site.lazy_images + (page - 1) * 8, 8))
+
+            status, headers, content_type, body = site.page(path)
+            self.send(status, content_type, body, headers)
+
+    return Handler
+
+
+class FixtureServer:
+    """启动多个合成站点 (每站一个端口)，可用作 with 上下文"""
+    def __init__(self, sites=3, host="127.0.0.1", **site_options):
+        self.host = host
+        self.sites = [FixtureSite(i, age_gate=(i % 2 == 1), **site_options) for i in range(sites)] # 奇数站点带年龄弹窗
+        self.servers = []
+
+    def start(self):
+        for site in self.sites:
+            server = ThreadingHTTPServer((self.host, 0), make_handler(site))
+            server.daemon_threads = True
+            site.base_url = f"http://{self.host}:{server.server_address[1]}"
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append(server)
+        return self
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def tasks(self):
+        """巡检任务表行: Project / Category / PageType / URL"""
+        return [
+            {"Project": site.brand, "Category": category, "PageType": page_type, "URL": site.base_url + path}
+            for site in self.sites for category, page_type, path in site.key_pages()
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动本地合成站点")
+    parser.add_argument("--sites", type=int, default=2)
+    parser.add_argument("--slow-ms", type=int, default=800)
+    args = parser.parse_args()
+    with FixtureServer(args.sites, slow_ms=args.slow_ms) as fixtures:
+        for site in fixtures.sites:
+            print(f"🌐 {site.brand}: {site.base_url}/")
+        print("按 Ctrl+C 退出")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
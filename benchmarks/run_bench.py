@@ -0,0 +1,323 @@
+"""
+巡检机器人 / 智能爬虫基准测试：对本地合成站点 (fixture_site.py) 无头运行，记录各阶段耗时、吞吐量与峰值内存，输出 JSON。
+
+用法:
+    python benchmarks/run_bench.py                                  # 默认 3 个站点，爬虫 + 巡检
+    python benchmarks/run_bench.py --sites 6 --concurrency 4 --scroll-strategy legacy --format webp
+    python benchmarks/run_bench.py --skip-crawler --out results/adaptive-jpeg.json
+
+对比改动时保持 --sites / --slow-ms / --retention 不变，只改要比较的参数。
+阶段耗时为该阶段所有调用的累计时间 (并发执行时会大于墙钟时间)，另给出调用次数、平均值与最大值。
+"""
+import argparse
+import asyncio
+import functools
+import importlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+from fixture_site import FixtureServer  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+BOT_STAGES = ["capture_task", "load_page", "enhanced_scroll_and_wait", "dwell_and_capture", "save_screenshot",
+              "run_visual_diff", "generate_reports"]
+CRAWLER_STAGES = ["crawl_site", "handle_age_gate", "probe_seo_files", "collect_sitemap", "fetch_links", "check_indexable"]
+MODULE_DIR = os.path.join(tempfile.gettempdir(), f"seo-bench-modules-{os.getpid()}") # load_module 复制出的可导入脚本
+
+
+def load_module(name, filename):
+    """
+    按文件路径加载脚本并注册为可导入的模块。
+    screen-bot-latest.py 文件名含连字符无法直接 import，而 spawn 方式的编码进程池需要按模块名重新导入
+    encode_screenshot 等函数，因此复制为 <临时目录>/<name>.py 并把该目录加入 sys.path (子进程继承 sys.path)
+    """
+    os.makedirs(MODULE_DIR, exist_ok=True)
+    shutil.copyfile(os.path.join(ROOT, filename), os.path.join(MODULE_DIR, f"{name}.py"))
+    if MODULE_DIR not in sys.path:
+        sys.path.insert(0, MODULE_DIR)
+    importlib.invalidate_caches()
+    sys.modules.pop(name, None)
+    return importlib.import_module(name)
+
+
+class StageTimer:
+    """把对象上的方法替换为计时包装 (同步/异步均可)，按方法名汇总耗时"""
+    def __init__(self):
+        self.samples = {}
+
+    def wrap(self, obj, name):
+        fn = getattr(obj, name, None)
+        if fn is None:
+            return
+        samples = self.samples.setdefault(name, [])
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    samples.append(time.perf_counter() - start)
+        else:
+            @functools.wraps(fn)
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    samples.append(time.perf_counter() - start)
+        setattr(obj, name, timed)
+
+    def summary(self):
+        out = {}
+        for name, values in self.samples.items():
+            if not values:
+                continue
+            out[name] = {
+                "calls": len(values),
+                "total_s": round(sum(values), 3),
+                "mean_s": round(sum(values) / len(values), 3),
+                "max_s": round(max(values), 3),
+            }
+        return out
+
+
+class RssSampler:
+    """后台线程定期采样本进程及全部子进程 (浏览器、编码进程) 的 RSS 之和，记录峰值"""
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        if psutil is None:
+            return 0
+        total = 0
+        try:
+            proc = psutil.Process()
+            for p in [proc] + proc.children(recursive=True):
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            pass
+        self.peak = max(self.peak, total)
+        return total
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.peak = 0
+        self.sample()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._stop.clear()
+
+
+def peak_rss_mb(sampler):
+    """峰值内存 (MB)：有 psutil 时为进程树采样峰值，否则退回 getrusage (仅本进程)"""
+    if psutil is not None:
+        return round(sampler.peak / 1024 / 1024, 1)
+    if resource is not None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(kb / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+    return None
+
+
+def make_logger(path):
+    lock = threading.Lock()
+    f = open(path, "a", encoding="utf-8")
+
+    def log(msg):
+        with lock:
+            f.write(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}\n")
+            f.flush()
+    log.close = f.close
+    return log
+
+
+def bench_crawler(fixtures, workdir, args):
+    v5 = load_module("crawler_bench", "generate_monitor_list_v5_crawler.py")
+    targets = os.path.join(workdir, "targets.txt")
+    with open(targets, "w", encoding="utf-8") as f:
+        f.write("\n".join(site.base_url + "/" for site in fixtures.sites))
+
+    cfg = v5.CrawlerConfig()
+    cfg.input_file = targets
+    cfg.output_file = os.path.join(workdir, "crawler_urls.xlsx")
+    cfg.check_indexability = True
+    cfg.concurrency = args.concurrency
+    cfg.host_min_interval = 0
+    cfg.headless = True
+    log = make_logger(os.path.join(workdir, "crawler.log"))
+    crawler = v5.SmartCrawler(cfg, log)
+    timer = StageTimer()
+    for name in CRAWLER_STAGES:
+        timer.wrap(crawler, name)
+
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        asyncio.run(crawler.run())
+        wall = time.perf_counter() - start
+    log.close()
+
+    rows = len(pd.read_excel(cfg.output_file)) if os.path.exists(cfg.output_file) else 0
+    return {
+        "sites": len(fixtures.sites),
+        "rules": rows,
+        "wall_s": round(wall, 2),
+        "sites_per_min": round(len(fixtures.sites) * 60 / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss_mb(sampler),
+        "stages": timer.summary(),
+    }
+
+
+def bench_bot(fixtures, workdir, args):
+    bot = load_module("screen_bot_bench", "screen-bot-latest.py")
+    tasks = os.path.join(workdir, "tasks.xlsx")
+    pd.DataFrame(fixtures.tasks()).to_excel(tasks, index=False)
+
+    cfg = bot.InspectionConfig()
+    cfg.excel_path = tasks
+    cfg.output_root = os.path.join(workdir, "inspection")
+    cfg.resume = False
+    cfg.concurrent_tasks = args.concurrency
+    cfg.retention_time = args.retention
+    cfg.scroll_strategy = args.scroll_strategy
+    cfg.screenshot_format = args.format
+    cfg.host_min_interval = 0
+    cfg.max_retries = 0
+    cfg.worker_processes = 1 # 分片子进程内的方法无法计时
+    cfg.visual_diff = args.visual_diff
+    log = make_logger(os.path.join(workdir, "bot.log"))
+    inspector = bot.WebsiteInspector(cfg, log_callback=log)
+    timer = StageTimer()
+    for name in BOT_STAGES:
+        timer.wrap(inspector, name)
+
+    statuses = {}
+    row_fields = getattr(bot, "STAGE_FIELDS", []) + getattr(bot, "NAV_TIMING_FIELDS", [])
+    row_values = {k: [] for k in row_fields}
+    record = inspector.record_result
+
+    def count_result(res, results_list):
+        statuses[res.get("Status", "")] = statuses.get(res.get("Status", ""), 0) + 1
+        if res.get("Status") == "Success":
+            for k in row_fields:
+                if isinstance(res.get(k), (int, float)):
+                    row_values[k].append(res[k])
+        return record(res, results_list)
+    inspector.record_result = count_result
+
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        asyncio.run(inspector.run())
+        wall = time.perf_counter() - start
+    log.close()
+
+    urls = sum(statuses.values())
+    return {
+        "urls": urls,
+        "status": statuses,
+        "wall_s": round(wall, 2),
+        "urls_per_min": round(urls * 60 / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss_mb(sampler),
+        "stages": timer.summary(),
+        # 成功页面结果行中的分阶段耗时 / Navigation Timing (每页的平均值与最大值)
+        "row_stages": {
+            k: {"mean": round(sum(v) / len(v), 3), "max": round(max(v), 3)} for k, v in row_values.items() if v
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="巡检/爬虫基准测试 (本地合成站点)")
+    parser.add_argument("--sites", type=int, default=3, help="合成站点 (项目) 数")
+    parser.add_argument("--slow-ms", type=int, default=800, help="慢资源延迟 (ms)")
+    parser.add_argument("--scroll-batches", type=int, default=4, help="首页无限滚动批次数")
+    parser.add_argument("--concurrency", type=int, default=3, help="巡检/爬虫并发数")
+    parser.add_argument("--retention", type=float, default=2, help="巡检留存时间 (s)")
+    parser.add_argument("--scroll-strategy", default="adaptive", choices=["adaptive", "legacy"])
+    parser.add_argument("--format", default="jpeg", choices=["png", "jpeg", "webp"], help="截图格式")
+    parser.add_argument("--visual-diff", action="store_true", help="开启视觉对比 (需要前一天的截图，一般无基线)")
+    parser.add_argument("--skip-bot", action="store_true")
+    parser.add_argument("--skip-crawler", action="store_true")
+    parser.add_argument("--workdir", help="工作目录 (默认临时目录，结束后删除)")
+    parser.add_argument("--out", help="结果 JSON 路径 (默认 benchmarks/results/bench-时间戳.json)")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="seo-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    out = args.out or os.path.join(ROOT, "benchmarks", "results", f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "workdir")},
+    }
+    print(f"🧪 基准测试 | 站点 {args.sites} | 并发 {args.concurrency} | 滚动 {args.scroll_strategy} | 格式 {args.format} | 工作目录 {workdir}")
+
+    try:
+        with FixtureServer(args.sites, slow_ms=args.slow_ms, scroll_batches=args.scroll_batches) as fixtures:
+            if not args.skip_crawler:
+                print("🕷️ 运行智能爬虫...")
+                try:
+                    result["crawler"] = bench_crawler(fixtures, workdir, args)
+                    print(f"   ✅ {result['crawler']['wall_s']}s | {result['crawler']['sites_per_min']} 站点/分钟 | 峰值内存 {result['crawler']['peak_rss_mb']} MB")
+                except Exception as e:
+                    result["crawler"] = {"error": str(e).splitlines()[0][:200]}
+                    print(f"   ❌ 爬虫运行失败: {result['crawler']['error']}")
+            if not args.skip_bot:
+                print("📸 运行巡检机器人...")
+                try:
+                    result["bot"] = bench_bot(fixtures, workdir, args)
+                    print(f"   ✅ {result['bot']['wall_s']}s | {result['bot']['urls_per_min']} URL/分钟 | 峰值内存 {result['bot']['peak_rss_mb']} MB | {result['bot']['status']}")
+                except Exception as e:
+                    result["bot"] = {"error": str(e).splitlines()[0][:200]}
+                    print(f"   ❌ 巡检运行失败: {result['bot']['error']}")
+            result["fixture_requests"] = sum(site.hits for site in fixtures.sites)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        shutil.rmtree(MODULE_DIR, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"📄 结果已保存: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+# ================= 🗃️ 截图内容寻址存储 =================
+# 巡检机器人 (screen-bot-latest.py) 开启 blob_store 时使用：截图按内容哈希存放在 <output_root>/_blobs/<ab>/<哈希>.<扩展名>，
+# 同一张图无论出现在多少天、多少次巡检里都只占一份空间。
+# 日期目录不再存放图片，改为一份清单 <output_root>/<日期>/_manifest.json: {"项目/页面文件名": {"image": ..., "thumb": ...}}，
+# 路径相对 output_root。按日期查找截图 (视觉对比基线、报告) 时通过清单解析到 blob
+
+BLOB_DIR = "_blobs"
+MANIFEST_FILENAME = "_manifest.json"
+DATE_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+GC_GRACE_S = 86400 # 最近一天内写入或复用的 blob 不回收 (可能属于尚未写出清单的进行中巡检)
+
+
+def manifest_key(project, stem):
+    """清单键：与原日期目录下的相对路径一致 (项目目录/页面文件名，不含扩展名)"""
+    return f"{project}/{stem}"
+
+
+def manifest_path(output_root, day):
+    return os.path.join(output_root, day, MANIFEST_FILENAME)
+
+
+def load_manifest(output_root, day):
+    """读取某一天的清单，不存在或损坏时返回空 dict"""
+    try:
+        with open(manifest_path(output_root, day), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_root, day, entries):
+    """合并写入某一天的清单 (同一天多轮巡检时后写覆盖同名条目)"""
+    manifest = load_manifest(output_root, day)
+    manifest.update(entries)
+    path = manifest_path(output_root, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def resolve(output_root, day, project, stem, field="image"):
+    """按清单把 (日期, 项目, 页面文件名) 解析为 blob 绝对路径，清单中没有或文件已回收时返回 None"""
+    entry = load_manifest(output_root, day).get(manifest_key(project, stem))
+    rel = entry.get(field) if isinstance(entry, dict) else None
+    if not rel:
+        return None
+    path = os.path.join(output_root, rel)
+    return path if os.path.exists(path) else None
+
+
+def resolve_tree_path(path):
+    """
+    把旧的日期目录路径 <output_root>/<日期>/<项目>/<页面文件名>.<扩展名> 通过当天清单解析为 blob 路径；
+    路径不符合该结构或清单中没有时返回 None
+    """
+    if not isinstance(path, str) or not path:
+        return None
+    project_dir = os.path.dirname(path)
+    day_dir = os.path.dirname(project_dir)
+    day = os.path.basename(day_dir)
+    if not DATE_DIR_RE.match(day):
+        return None
+    stem = os.path.splitext(os.path.basename(path))[0]
+    field = "image"
+    if stem.endswith(".thumb"):
+        stem, field = stem[:-len(".thumb")], "thumb"
+    return resolve(os.path.dirname(day_dir), day, os.path.basename(project_dir), stem, field)
+
+
+class BlobStore:
+    """按内容 (SHA-256) 存放图片，put() 可在多个线程中并发调用"""
+    def __init__(self, output_root):
+        self.output_root = output_root
+        self.root = os.path.join(output_root, BLOB_DIR)
+        self.stats_lock = threading.Lock()
+        self.written = 0 # 新写入的 blob 数
+        self.deduped = 0 # 已存在、直接复用的 blob 数
+        self.bytes_saved = 0 # 复用省下的字节数
+
+    def path_for(self, digest, ext):
+        return os.path.join(self.root, digest[:2], f"{digest}.{ext}")
+
+    def put(self, data, ext):
+        """写入图片并返回其 blob 路径；内容相同的图片已存在时不再写盘"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, ext)
+        if self.touch(path):
+            with self.stats_lock:
+                self.deduped += 1
+                self.bytes_saved += len(data)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 临时文件名带进程/线程号，同一张图被并发写入时互不干扰
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self.stats_lock:
+            self.written += 1
+        return path
+
+    def touch(self, path):
+        """
+        复用已有 blob 时刷新其修改时间，返回文件是否仍存在。
+        写入当天清单之前，同时运行的 gc 会因 GC_GRACE_S 跳过它，避免清单指向已回收的文件
+        """
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def relative(self, path):
+        """blob 路径转为清单中使用的相对 output_root 的路径"""
+        return os.path.relpath(path, self.output_root).replace("\\", "/")
+
+    def owns(self, path):
+        """path 是否位于本存储内"""
+        try:
+            return os.path.commonpath([os.path.abspath(path), os.path.abspath(self.root)]) == os.path.abspath(self.root)
+        except ValueError:
+            return False
+
+
+def collect_garbage(output_root, retention_days=0, today=None, dry_run=False, log=print):
+    """
+    保留策略与垃圾回收：
+    1. retention_days > 0 时删除早于 (today - retention_days) 的日期清单 (日期目录中的报告文件保留，但其中的图片将无法显示)
+    2. 删除不再被任何清单引用、且写入/复用超过 GC_GRACE_S 的 blob
+    返回 {"manifests": 删除的清单数, "blobs": 删除的 blob 数, "bytes": 释放的字节数}
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    stats = {"manifests": 0, "blobs": 0, "bytes": 0}
+    blob_root = os.path.join(output_root, BLOB_DIR)
+    if not os.path.isdir(blob_root):
+        return stats
+    try:
+        days = sorted(d for d in os.listdir(output_root) if DATE_DIR_RE.match(d))
+    except OSError:
+        return stats
+
+    cutoff = None
+    if retention_days and retention_days > 0:
+        cutoff = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+
+    referenced = set()
+    for day in days:
+        if cutoff and day < cutoff and os.path.exists(manifest_path(output_root, day)):
+            stats["manifests"] += 1
+            if not dry_run:
+                try:
+                    os.remove(manifest_path(output_root, day))
+                except OSError:
+                    pass
+            continue
+        for entry in load_manifest(output_root, day).values():
+            if isinstance(entry, dict):
+                for rel in entry.values():
+                    if rel:
+                        referenced.add(os.path.normcase(os.path.abspath(os.path.join(output_root, rel))))
+
+    now = time.time()
+    for dirpath, _, files in os.walk(blob_root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            if os.path.normcase(os.path.abspath(path)) in referenced:
+                continue
+            try:
+                st = os.stat(path)
+                if now - st.st_mtime < GC_GRACE_S:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                stats["blobs"] += 1
+                stats["bytes"] += st.st_size
+            except OSError:
+                pass
+
+    action = "可回收" if dry_run else "已回收"
+    log(f"🗃️ 截图存储清理: {action} {stats['blobs']} 个文件 ({stats['bytes'] / 1024 / 1024:.1f} MB)，删除过期清单 {stats['manifests']} 份")
+    return stats
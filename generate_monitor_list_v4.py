@@ -1,6 +1,11 @@
+import heapq
+import numpy as np
 import pandas as pd
 import os
 import re
+import zlib
+from collections import Counter
+from page_classifier import load_classifier, split_url
 from urllib.parse import urlparse
 import tkinter as tk
 from tkinter import filedialog
@@ -9,16 +14,39 @@ from tkinter import filedialog
 DEFAULT_INPUT_FILE = "crawl_result.xlsx"
 OUTPUT_FILE = "urls.xlsx"
 
-# 关键词映射 (可根据需求扩展)
-KEYWORDS = {
-    "Contact": ["contact", "lianxi", "联系", "support"],
-    "About": ["about", "profile", "story", "guanyu", "company", "简介", "关于"],
-    "FAQ": ["faq", "help", "question", "wenti", "常见问题"],
-    "News": ["news", "blog", "press", "media", "insight", "article", "zixun", "dongtai", "journal", "资讯", "新闻", "动态"],
-    "Product": ["product", "item", "shop", "store", "collection", "category", "solution", "service", "chanpin", "anli", "产品", "案例", "服务", "解决方案"],
-    "Search": ["search", "sousuo", "搜索", "?s="]
+# 自定义关键词 (可选): JSON 格式与 page_classifier.KEYWORDS 相同，文件存在时覆盖同名分类的关键词
+KEYWORDS_FILE = "keywords.json"
+
+# 候选池输出顺序: (池名, Category, PageType 前缀, 选取策略, 是否追加 slug)
+# 选取策略: first = 原始顺序第一个；shortest / longest / median 均按 (长度, URL) 排序
+SELECTION_RULES = [
+    ("首页", "首页", "首页", "first", False),
+    ("关于我们", "关于我们", "关于我们", "shortest", False),
+    ("联系我们", "联系我们", "联系我们", "shortest", False),
+    ("FAQ", "FAQ", "FAQ", "shortest", False),
+    ("搜索页", "搜索页", "搜索页", "shortest", False),
+    ("新闻聚合页", "新闻", "新闻聚合页", "shortest", False),
+    ("新闻详情页", "新闻", "新闻单页", "longest", True), # 详情页URL通常较长
+    ("产品聚合页", "产品", "产品聚合页", "shortest", False),
+    ("产品分类页", "产品", "产品分类页", "shortest", True),
+    ("产品详情页", "产品", "产品单页", "median", True), # 选中等长度，避免选中极其复杂的参数页
+]
+
+# 需要读取的列 (按顺序取第一个存在的列名)，其余列不读入内存
+COLUMN_ALIASES = {
+    "url": ['Address', 'URL', 'Original Url'],
+    "status": ['Status Code', 'Status'],
+    "title": ['Title 1', 'Title'],
+    "h1": ['H1-1', 'H1'],
+    "content_type": ['Content Type'],
 }
 
+# 流式读取 (超大导出): 文件超过该大小 (MB) 时自动切换，峰值内存与文件大小无关
+STREAM_THRESHOLD_MB = 200
+STREAM_CHUNK_ROWS = 50000 # 每块行数
+STREAM_POOL_CAP = 1000 # 每个候选池保留的样本数 (首个/最短/最长 URL 精确保留)
+STREAM_NAME_CAP = 1000 # 每个域名保留的不同项目名数量上限
+
 def select_file():
     """弹出文件选择框"""
     root = tk.Tk()
@@ -52,64 +80,21 @@ def get_domain_project(url, title=None):
     except:
         return "Unknown"
 
+_classifier = None
+
+def get_classifier():
+    """分类器 (首次使用时按 KEYWORDS_FILE 创建)"""
+    global _classifier
+    if _classifier is None:
+        _classifier = load_classifier(KEYWORDS_FILE)
+    return _classifier
+
 def classify_page(url, title, h1):
     """
-    核心分类逻辑
+    核心分类逻辑 (见 page_classifier.PageClassifier)
     返回: (Category, SubType, Score)
-    Category: Product, News, About, Contact, Home, Other
-    SubType: List, Detail, None
     """
-    u = str(url).lower()
-    t = str(title).lower() if pd.notna(title) else ""
-    h = str(h1).lower() if pd.notna(h1) else ""
-    path = urlparse(u).path
-
-    # 1. 首页
-    if path in ["", "/", "/index.php", "/index.html", "/default.aspx"]:
-        return "首页", None, 100
-
-    # 2. 搜索页
-    if any(k in u for k in KEYWORDS["Search"]):
-        return "搜索页", None, 90
-
-    # 3. 关于我们
-    if any(k in u or k in t for k in KEYWORDS["About"]):
-        return "关于我们", None, 90
-
-    # 4. 联系我们
-    if any(k in u or k in t for k in KEYWORDS["Contact"]):
-        return "联系我们", None, 90
-
-    # 5. FAQ
-    if any(k in u or k in t for k in KEYWORDS["FAQ"]):
-        return "FAQ", None, 90
-
-    # 6. 新闻/博客
-    if any(k in u for k in KEYWORDS["News"]):
-        # 判断是列表还是详情
-        # 列表特征: 路径短, 包含 category, tag, list
-        # 详情特征: 路径长, 包含 .html, 日期, 具体文章名
-        
-        is_list = False
-        if "category" in u or "tag" in u or "list" in u or path.endswith("/news/") or path.endswith("/blog/"):
-            is_list = True
-        elif len(path.strip("/").split("/")) <= 2: # 路径很浅可能是列表
-            is_list = True
-            
-        return "新闻", "聚合页" if is_list else "详情页", 80
-
-    # 7. 产品/解决方案
-    if any(k in u for k in KEYWORDS["Product"]):
-        is_list = False
-        if "category" in u or "collection" in u or "list" in u or path.endswith("/product/") or path.endswith("/products/"):
-            is_list = True
-        # 排除可能是详情的情况
-        elif len(path.strip("/").split("/")) > 3: 
-            is_list = False
-            
-        return "产品", "聚合页" if is_list else "详情页", 80
-
-    return "其他", None, 0
+    return get_classifier().classify(url, title)
 
 def get_slug_identifier(url):
     """从URL获取唯一标识符(Slug)，用于生成稳定的文件名"""
@@ -132,6 +117,252 @@ def get_slug_identifier(url):
     except:
         return "unknown"
 
+# ================= ⚡ 批量处理 (大表专用) =================
+# 逐行 apply / iterrows 在几十万行的导出上要跑好几分钟。批量版本把每一列只遍历一次：
+# URL 拆分、分类在一次循环里完成 (规则见 page_classifier.py)，项目名按唯一标题计算，
+# 选取用一次排序 + 分组完成
+
+def title_brand(title):
+    """从标题提取品牌名 (通常在 - 或 | 之后)，提取不到返回 None"""
+    if not isinstance(title, str):
+        return None
+    for sep in ['-', '|', '_', '—']:
+        if sep in title:
+            candidate = title.split(sep)[-1].strip()
+            # 品牌名通常不长
+            if 1 < len(candidate) < 20:
+                return candidate
+    return None
+
+def classify_urls(urls, titles=None):
+    """
+    批量分类: 每个 URL 只拆分、转小写、匹配一次。
+    返回 (域名列表, 候选池列表)，域名去掉 www. (与 get_domain_project 一致)
+    """
+    urls = [x if type(x) is str else str(x) for x in urls]
+    if titles is None:
+        titles = [""] * len(urls)
+    else:
+        titles = ["" if missing else str(x) for x, missing in zip(titles, pd.isna(titles))]
+
+    pool = get_classifier().pool
+    domains, pools = [], []
+    for url, t in zip(urls, titles):
+        netloc, path = split_url(url)
+        domains.append(netloc[4:] if netloc.startswith("www.") else netloc)
+        pools.append(pool(url, t, path))
+    return domains, pools
+
+def project_names(domains, titles):
+    """每行的项目名: 标题中的品牌名优先，否则用域名 (每个不同的标题只解析一次)"""
+    codes, uniques = pd.factorize(titles)
+    brands = np.array([title_brand(x) for x in uniques] + [None], dtype=object) # 末位对应缺失标题 (code = -1)
+    names = brands[codes]
+    missing = pd.isna(names)
+    names[missing] = np.asarray(domains, dtype=object)[missing]
+    return names
+
+def project_mode(domains, names):
+    """每个域名下出现最多的项目名 (并列时取排序最小者，与 Series.mode()[0] 一致)"""
+    counts = pd.DataFrame({"d": domains, "n": names}).groupby(["d", "n"]).size().reset_index(name="c")
+    counts = counts.sort_values(["d", "c", "n"], ascending=[True, False, True], kind="mergesort")
+    return counts.drop_duplicates("d").set_index("d")["n"].to_dict()
+
+def select_candidates(domains, pools, urls, names_by_domain):
+    """
+    一次排序 + 分组完成所有池的选取 (first / shortest / longest / median)，返回输出行列表。
+    shortest / longest / median 按 (长度, URL) 排序；首页取原始顺序第一个
+    """
+    frame = pd.DataFrame({"Domain": domains, "Pool": pools, "URL": [x if type(x) is str else str(x) for x in urls]})
+    frame = frame[frame["Pool"].notna()]
+    strategy = {rule[0]: rule[3] for rule in SELECTION_RULES}
+
+    # 组内按 (长度, URL) 排序: 用数值编码做 lexsort，避免对字符串多列排序
+    url_rank = pd.factorize(frame["URL"], sort=True)[0]
+    dom_code, dom_values = pd.factorize(frame["Domain"])
+    pool_code, pool_values = pd.factorize(frame["Pool"])
+    lengths = frame["URL"].str.len().to_numpy()
+    order = np.lexsort((url_rank, lengths, pool_code, dom_code))
+
+    # 各组在排序结果中的起止位置
+    keys = dom_code[order] * len(pool_values) + pool_code[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    first_seen = {} # 首页: 原始顺序第一个
+    for i in np.flatnonzero(frame["Pool"].to_numpy() == "首页"):
+        first_seen.setdefault(dom_code[i], i)
+
+    urls_arr = frame["URL"].to_numpy()
+    chosen = {}
+    for start, end in zip(starts, ends):
+        row = order[start]
+        domain, pool = dom_values[dom_code[row]], pool_values[pool_code[row]]
+        rule = strategy[pool]
+        if rule == "first": pick = first_seen[dom_code[row]]
+        elif rule == "longest": pick = order[end - 1]
+        elif rule == "median": pick = order[start + (end - start) // 2]
+        else: pick = row
+        chosen[(domain, pool)] = urls_arr[pick]
+    return build_rows(chosen, set(domains), names_by_domain)
+
+def build_rows(chosen, domains, names_by_domain):
+    """按域名排序、SELECTION_RULES 顺序生成输出行；chosen 为 {(域名, 池名): URL}"""
+    final_rows = []
+    for domain in sorted(domains):
+        project_name = names_by_domain.get(domain, domain)
+        for pool, category, page_type, _, with_slug in SELECTION_RULES:
+            url = chosen.get((domain, pool))
+            if url is None: continue
+            final_rows.append({
+                "Project": project_name,
+                "Category": category,
+                "PageType": f"{page_type}-{get_slug_identifier(url)}" if with_slug else page_type,
+                "URL": url
+            })
+    return final_rows
+
+# ================= 📦 流式读取 (超大导出专用) =================
+# 几 GB 的导出整表读入会撑爆内存：CSV 按块读取，xlsx 用 openpyxl 只读模式逐行迭代，只保留需要的列。
+# 每块复用上面的批量分类，再把结果并入各 (域名, 候选池) 的有界样本
+
+WANTED_COLUMNS = frozenset(c for names in COLUMN_ALIASES.values() for c in names)
+
+def wanted_column(name):
+    """read_csv / read_excel 的 usecols 过滤函数"""
+    return str(name).strip() in WANTED_COLUMNS
+
+def find_columns(columns):
+    """按 COLUMN_ALIASES 查找关键列，返回 {键: 列名}，找不到为 None"""
+    columns = set(columns)
+    return {key: next((c for c in names if c in columns), None) for key, names in COLUMN_ALIASES.items()}
+
+def filter_rows(df, cols):
+    """只保留状态码 200 的 HTML 页面"""
+    if cols["status"]:
+        df = df[df[cols["status"]] == 200]
+    if cols["content_type"]:
+        df = df[df[cols["content_type"]].astype(str).str.contains("html", case=False, na=False)]
+    return df
+
+def should_stream(input_file):
+    """文件超过 STREAM_THRESHOLD_MB 时使用流式读取 (旧版 .xls 不支持逐行读取)"""
+    if input_file.lower().endswith('.xls'):
+        return False
+    try:
+        return os.path.getsize(input_file) >= STREAM_THRESHOLD_MB * 1024 * 1024
+    except OSError:
+        return False
+
+def iter_csv_chunks(input_file, chunk_rows=STREAM_CHUNK_ROWS):
+    for chunk in pd.read_csv(input_file, usecols=wanted_column, chunksize=chunk_rows):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+def iter_xlsx_chunks(input_file, chunk_rows=STREAM_CHUNK_ROWS):
+    """openpyxl 只读模式逐行读取第一个工作表，不会把整个工作簿载入内存"""
+    from openpyxl import load_workbook
+    wb = load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        keep = [i for i, c in enumerate(header) if c is not None and wanted_column(c)]
+        names = [str(header[i]).strip() for i in keep]
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in keep])
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=names)
+                buffer = []
+        yield pd.DataFrame(buffer, columns=names)
+    finally:
+        wb.close()
+
+class StreamPool:
+    """
+    流式候选池: 精确记录首个 / 最短 / 最长 URL；cap > 0 时另按 URL 哈希保留最小的 cap 个作为均匀样本 (bottom-k)。
+    样本只由 URL 本身决定，同一份导出每次选出的中位数页面都相同；数量不超过 cap 时结果与整表模式一致
+    """
+    __slots__ = ("cap", "first", "shortest", "longest", "heap")
+
+    def __init__(self, cap=0):
+        self.cap = cap
+        self.first = None
+        self.shortest = None
+        self.longest = None
+        self.heap = [] # (-哈希, URL) 最大堆，堆顶为样本中哈希最大者
+
+    def add(self, url):
+        if self.first is None:
+            self.first = url
+        key = (len(url), url)
+        if self.shortest is None or key < self.shortest: self.shortest = key
+        if self.longest is None or key > self.longest: self.longest = key
+        if self.cap:
+            item = (-zlib.crc32(url.encode("utf-8", "surrogatepass")), url)
+            if len(self.heap) < self.cap:
+                heapq.heappush(self.heap, item)
+            elif item > self.heap[0]:
+                heapq.heapreplace(self.heap, item)
+
+    def pick(self, rule):
+        if rule == "first": return self.first
+        if rule == "longest": return self.longest[1]
+        if rule == "median":
+            sample = sorted((len(url), url) for _, url in self.heap)
+            return sample[len(sample) // 2][1]
+        return self.shortest[1]
+
+def process_stream(input_file, chunk_rows=STREAM_CHUNK_ROWS, cap=STREAM_POOL_CAP):
+    """
+    流式处理整份导出，返回 (输出行, {域名: 项目名}, {域名: 页面数})；找不到 URL 列时返回 None
+    """
+    if input_file.endswith('.csv'):
+        chunks = iter_csv_chunks(input_file, chunk_rows)
+    else:
+        chunks = iter_xlsx_chunks(input_file, chunk_rows)
+    strategy = {rule[0]: rule[3] for rule in SELECTION_RULES}
+    pools, name_counts, page_counts = {}, {}, Counter()
+    cols = None
+    rows_read = 0
+
+    for chunk in chunks:
+        if cols is None:
+            cols = find_columns(chunk.columns)
+            if not cols["url"]:
+                return None
+            print(f"✅ 找到关键列: URL='{cols['url']}', Title='{cols['title']}', Status='{cols['status']}'")
+        rows_read += len(chunk)
+        chunk = filter_rows(chunk, cols)
+        if chunk.empty:
+            continue
+
+        urls = [x if type(x) is str else str(x) for x in chunk[cols["url"]].tolist()]
+        titles = chunk[cols["title"]] if cols["title"] else None
+        domains, chunk_pools = classify_urls(urls, titles.tolist() if titles is not None else None)
+        names = project_names(domains, titles) if titles is not None else domains
+        page_counts.update(domains)
+
+        for (domain, name), count in Counter(zip(domains, names)).items():
+            counter = name_counts.setdefault(domain, Counter())
+            counter[name] += count
+            if len(counter) > STREAM_NAME_CAP: # 只保留高频项目名，低频的对众数没有影响
+                name_counts[domain] = Counter(dict(counter.most_common(STREAM_NAME_CAP // 2)))
+
+        for domain, pool, url in zip(domains, chunk_pools, urls):
+            if pool is None: continue
+            state = pools.get((domain, pool))
+            if state is None:
+                state = pools[(domain, pool)] = StreamPool(cap if strategy[pool] == "median" else 0)
+            state.add(url)
+        print(f"   ... 已读取 {rows_read} 行")
+
+    if cols is None:
+        return None
+    # 众数: 出现最多的项目名，并列时取排序最小者 (与 project_mode 一致)
+    names_by_domain = {d: min(c.items(), key=lambda kv: (-kv[1], kv[0]))[0] for d, c in name_counts.items()}
+    chosen = {key: state.pick(strategy[key[1]]) for key, state in pools.items()}
+    return build_rows(chosen, page_counts, names_by_domain), names_by_domain, page_counts
+
 def main():
     print("🚀 启动 URL 智能分类工具...")
     
@@ -142,196 +373,62 @@ def main():
         return
 
     print(f"📂 正在读取: {input_file}")
-    
-    try:
-        if input_file.endswith('.csv'):
-            df = pd.read_csv(input_file)
-        else:
-            df = pd.read_excel(input_file)
-    except Exception as e:
-        print(f"❌ 读取文件失败: {e}")
-        return
 
-    # 2. 规范化列名
-    df.columns = df.columns.str.strip()
-    
-    # 寻找关键列
-    url_col = next((c for c in ['Address', 'URL', 'Original Url'] if c in df.columns), None)
-    status_col = next((c for c in ['Status Code', 'Status'] if c in df.columns), None)
-    title_col = next((c for c in ['Title 1', 'Title'] if c in df.columns), None)
-    h1_col = next((c for c in ['H1-1', 'H1'] if c in df.columns), None)
-    content_type_col = next((c for c in ['Content Type'] if c in df.columns), None)
-
-    if not url_col:
-        print("❌ 无法找到 URL 列 (Address/URL)")
-        return
+    if should_stream(input_file):
+        # 超大导出: 分块读取，边读边分类
+        print(f"📦 文件超过 {STREAM_THRESHOLD_MB} MB，使用流式分块读取...")
+        try:
+            result = process_stream(input_file)
+        except Exception as e:
+            print(f"❌ 读取文件失败: {e}")
+            return
+        if result is None:
+            print("❌ 无法找到 URL 列 (Address/URL)")
+            return
+        final_rows, names_by_domain, page_counts = result
+        print(f"🔍 识别到 {len(names_by_domain)} 个网站项目")
+        for domain, count in sorted(page_counts.items()):
+            print(f"   - 处理: {names_by_domain.get(domain, domain)} ({domain}) | 页面数: {count}")
+    else:
+        try:
+            # 只读取需要的列
+            if input_file.endswith('.csv'):
+                df = pd.read_csv(input_file, usecols=wanted_column)
+            else:
+                df = pd.read_excel(input_file, usecols=wanted_column)
+        except Exception as e:
+            print(f"❌ 读取文件失败: {e}")
+            return
 
-    print(f"✅ 找到关键列: URL='{url_col}', Title='{title_col}', Status='{status_col}'")
+        # 2. 规范化列名，寻找关键列
+        df.columns = df.columns.str.strip()
+        cols = find_columns(df.columns)
+        url_col, title_col = cols["url"], cols["title"]
 
-    # 3. 预处理
-    # 过滤非 200
-    if status_col:
-        df = df[df[status_col] == 200]
-    
-    # 过滤非 HTML
-    if content_type_col:
-        df = df[df[content_type_col].astype(str).str.contains("html", case=False, na=False)]
+        if not url_col:
+            print("❌ 无法找到 URL 列 (Address/URL)")
+            return
 
-    # 提取项目名 (基于域名)
-    df['Domain_Project'] = df[url_col].apply(lambda x: get_domain_project(x))
-    
-    # 进一步优化项目名：如果同一域名下 Title 后缀一致，则使用 Title 后缀
-    # 这里简单处理：直接使用 apply 结合 title
-    if title_col:
-        df['Project_Name'] = df.apply(lambda row: get_domain_project(row[url_col], row[title_col]), axis=1)
-    else:
-        df['Project_Name'] = df['Domain_Project']
+        print(f"✅ 找到关键列: URL='{url_col}', Title='{title_col}', Status='{cols['status']}'")
 
-    final_rows = []
-    
-    # 4. 按项目分组处理
-    grouped = df.groupby('Domain_Project') # 还是按域名分组最稳妥
-    
-    print(f"🔍 识别到 {len(grouped)} 个网站项目，开始分类...")
+        # 3. 预处理: 过滤非 200、非 HTML
+        df = filter_rows(df, cols)
 
-    for domain, group in grouped:
-        # 获取该组最常用的 Project Name (众数)
-        project_name = group['Project_Name'].mode()[0] if not group['Project_Name'].empty else domain
-        print(f"   - 处理: {project_name} ({domain}) | 页面数: {len(group)}")
-        
-        # 分类容器
-        pools = {
-            "首页": [],
-            "关于我们": [],
-            "联系我们": [],
-            "FAQ": [],
-            "搜索页": [],
-            "新闻聚合页": [],
-            "新闻详情页": [],
-            "产品聚合页": [],
-            "产品详情页": [],
-            "产品分类页": [] # 额外区分
-        }
-
-        for _, row in group.iterrows():
-            url = row[url_col]
-            title = row[title_col] if title_col else ""
-            h1 = row[h1_col] if h1_col else ""
-            
-            cat, sub, score = classify_page(url, title, h1)
-            
-            if cat == "首页":
-                pools["首页"].append(url)
-            elif cat == "关于我们":
-                pools["关于我们"].append(url)
-            elif cat == "联系我们":
-                pools["联系我们"].append(url)
-            elif cat == "FAQ":
-                pools["FAQ"].append(url)
-            elif cat == "搜索页":
-                pools["搜索页"].append(url)
-            elif cat == "新闻":
-                if sub == "聚合页": pools["新闻聚合页"].append(url)
-                else: pools["新闻详情页"].append(url)
-            elif cat == "产品":
-                if sub == "聚合页": 
-                    # 细分：如果URL包含 category 可能是分类页，否则是总聚合
-                    if "category" in str(url):
-                        pools["产品分类页"].append(url)
-                    else:
-                        pools["产品聚合页"].append(url)
-                else: 
-                    pools["产品详情页"].append(url)
+        # 4. 批量分类 (每个 URL 只遍历一次)，按域名分组 (还是按域名分组最稳妥)
+        titles = df[title_col] if title_col else None
+        domains, pools = classify_urls(df[url_col].tolist(), titles.tolist() if titles is not None else None)
+
+        # 提取项目名：如果同一域名下 Title 后缀一致，则使用 Title 后缀 (取众数)
+        names = project_names(domains, titles) if title_col else domains
+        names_by_domain = project_mode(domains, names)
+
+        print(f"🔍 识别到 {len(names_by_domain)} 个网站项目，开始分类...")
+        for domain, count in sorted(pd.Series(domains).value_counts().items()):
+            print(f"   - 处理: {names_by_domain.get(domain, domain)} ({domain}) | 页面数: {count}")
 
         # 5. 抽样逻辑 (Selection)
         # 使用 (len(x), x) 排序确保确定性：优先短路径，长度相同时按字母序
-        
-        # 首页: 必选
-        if pools["首页"]:
-            final_rows.append({
-                "Project": project_name, 
-                "Category": "首页",
-                "PageType": "首页", 
-                "URL": pools["首页"][0]
-            })
-        
-        # 功能页: 选路径最短的
-        for p_type in ["关于我们", "联系我们", "FAQ", "搜索页"]:
-            if pools[p_type]:
-                best_url = sorted(pools[p_type], key=lambda x: (len(x), x))[0]
-                final_rows.append({
-                    "Project": project_name, 
-                    "Category": p_type,
-                    "PageType": p_type, 
-                    "URL": best_url
-                })
-
-        # 新闻: 
-        if pools["新闻聚合页"]:
-            # 最短的作为聚合
-            best_url = sorted(pools["新闻聚合页"], key=lambda x: (len(x), x))[0]
-            final_rows.append({
-                "Project": project_name, 
-                "Category": "新闻",
-                "PageType": "新闻聚合页", 
-                "URL": best_url
-            })
-        
-        if pools["新闻详情页"]:
-            # 选一个长度适中的，或者最新的 (如果有日期)
-            # 这里简单选最长的，通常详情页URL较长
-            sorted_news = sorted(pools["新闻详情页"], key=lambda x: (len(x), x))
-            best_detail = sorted_news[-1] if len(sorted_news) > 0 else sorted_news[0]
-            
-            # 生成唯一标识
-            slug = get_slug_identifier(best_detail)
-            final_rows.append({
-                "Project": project_name, 
-                "Category": "新闻",
-                "PageType": f"新闻单页-{slug}", 
-                "URL": best_detail
-            })
-
-        # 产品:
-        # 1. 聚合页 (Root)
-        if pools["产品聚合页"]:
-             best_url = sorted(pools["产品聚合页"], key=lambda x: (len(x), x))[0]
-             final_rows.append({
-                 "Project": project_name, 
-                 "Category": "产品",
-                 "PageType": "产品聚合页", 
-                 "URL": best_url
-             })
-        
-        # 2. 分类页 (Category)
-        if pools["产品分类页"]:
-             # 选一个代表
-             best_url = sorted(pools["产品分类页"], key=lambda x: (len(x), x))[0]
-             slug = get_slug_identifier(best_url)
-             final_rows.append({
-                 "Project": project_name, 
-                 "Category": "产品",
-                 "PageType": f"产品分类页-{slug}", 
-                 "URL": best_url
-             })
-        elif not pools["产品聚合页"] and pools["产品详情页"]: 
-             # 如果没有聚合页和分类页，但有详情页，可能详情页的上级就是列表，这里暂不处理复杂反推
-             pass
-
-        # 3. 详情页
-        if pools["产品详情页"]:
-            sorted_prods = sorted(pools["产品详情页"], key=lambda x: (len(x), x))
-            # 选一个中等长度的，避免选中极其复杂的参数页
-            idx = len(sorted_prods) // 2
-            best_detail = sorted_prods[idx]
-            
-            slug = get_slug_identifier(best_detail)
-            final_rows.append({
-                "Project": project_name, 
-                "Category": "产品",
-                "PageType": f"产品单页-{slug}", 
-                "URL": best_detail
-            })
+        final_rows = select_candidates(domains, pools, df[url_col].tolist(), names_by_domain)
 
     # 6. 输出结果
     result_df = pd.DataFrame(final_rows)
@@ -348,4 +445,4 @@ def main():
         print("⚠️ 未匹配到任何有效页面，请检查输入文件数据。")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,22 +4,24 @@ import re
 import sys
 import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog, messagebox, ttk
 from urllib.parse import urlparse, urljoin
 import pandas as pd
+from host_scheduler import HostScheduler, host_key
+from page_classifier import load_classifier
+from sitemap_reader import Reservoir, iter_sitemap_urls
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
 # ================= ⚙️ 全局配置 =================
 
-# 关键词映射 (与 v4 保持一致)
-KEYWORDS = {
-    "Contact": ["contact", "lianxi", "联系", "support"],
-    "About": ["about", "profile", "story", "guanyu", "company", "简介", "关于"],
-    "FAQ": ["faq", "help", "question", "wenti", "常见问题"],
-    "News": ["news", "blog", "press", "media", "insight", "article", "zixun", "dongtai", "journal", "资讯", "新闻", "动态"],
-    "Product": ["product", "item", "shop", "store", "collection", "category", "solution", "service", "chanpin", "anli", "产品", "案例", "服务", "解决方案"],
-    "Search": ["search", "sousuo", "搜索", "?s="]
-}
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
 
 # 忽略的资源后缀
 IGNORED_EXTENSIONS = {
@@ -34,8 +36,120 @@ class CrawlerConfig:
         self.check_indexability = False  # 是否检查可索引性
         self.max_pages_per_site = 50     # 单个站点最大抓取数 (软限制)
         self.concurrency = 3             # 并发站点数
+        self.per_host_concurrency = 1    # 同一站点最大并发 (输入中重复的域名不会同时爬)
+        self.host_min_interval = 1.0     # 同一站点两次开始之间的最小间隔 (秒)
+        self.site_concurrency = 3        # 单站点内并行的页面/请求数 (深入抓取、SEO文件探测、可索引性检查)
+        self.http_fast_path = True       # robots/sitemap 探测与可索引性检查优先走 HTTP 客户端 (需要 requests)，JS 渲染页面自动回退浏览器
+        self.http_workers = 16           # HTTP 客户端线程数 (同时也是连接池大小)
+        self.sitemap_ingest = True       # 读取 Sitemap 内容作为候选 URL 来源 (需要 http_fast_path)
+        self.sitemap_max_urls = 200000   # 单站点最多读取的 Sitemap URL 数
+        self.sitemap_max_files = 50      # 单站点最多读取的 Sitemap 文件数 (含索引展开的子文件)
+        self.sitemap_pool_cap = 1000     # 每个分类池最多保留的 Sitemap URL 数 (超出后抽样，最短/最长精确保留)
+        self.keywords_file = "keywords.json" # 自定义分类关键词 (可选，格式同 page_classifier.KEYWORDS，文件存在时覆盖同名分类)
         self.headless = True             # 无头模式
 
+# ================= ⚡ HTTP 快速通道 =================
+
+class HttpFetcher:
+    """
+    基于 requests.Session 的轻量 HTTP 客户端 (连接池 + keep-alive)，请求在线程池中执行，不阻塞事件循环。
+    用于 robots/sitemap 探测和可索引性检查：只流式读取到 </head> 为止，不渲染页面
+    """
+    HEAD_LIMIT = 256 * 1024 # 最多读取的 HTML 字节数
+    JS_GATE_MARKERS = ("enable javascript", "javascript is required", "challenge-platform", "just a moment", "__cf_chl", "captcha")
+    META_RE = re.compile(r"<meta\b[^>]*>", re.I)
+    ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+    TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+
+    def __init__(self, workers=16, timeout=(10, 20)):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8"})
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+
+    async def run(self, fn, *args):
+        """在 HTTP 线程池中执行阻塞函数"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _get_text(self, url):
+        resp = self.session.get(url, timeout=self.timeout)
+        return resp.status_code, resp.text if resp.status_code == 200 else ""
+
+    def _get_status(self, url):
+        # 流式请求只读响应头，不下载正文 (sitemap 可能很大)
+        with self.session.get(url, timeout=self.timeout, stream=True) as resp:
+            return resp.status_code
+
+    def _read_head(self, url):
+        """流式读取 HTML 直到 </head>，返回 (状态码, 响应头, 已读 HTML)"""
+        with self.session.get(url, timeout=self.timeout, stream=True) as resp:
+            if "html" not in resp.headers.get("Content-Type", "html").lower():
+                return resp.status_code, resp.headers, ""
+            buf = b""
+            for chunk in resp.iter_content(16384):
+                buf += chunk
+                if b"</head" in buf[-len(chunk) - 6:].lower() or len(buf) >= self.HEAD_LIMIT:
+                    break
+            return resp.status_code, resp.headers, buf.decode(resp.encoding or "utf-8", errors="replace")
+
+    async def get_text(self, url):
+        return await self.run(self._get_text, url)
+
+    async def get_status(self, url):
+        return await self.run(self._get_status, url)
+
+    @classmethod
+    def parse_head(cls, html):
+        """提取 title 与 robots 指令 (meta robots / googlebot)"""
+        m = cls.TITLE_RE.search(html)
+        title = re.sub(r"\s+", " ", m.group(1)).strip() if m else ""
+        robots = []
+        for tag in cls.META_RE.findall(html):
+            attrs = {k.lower(): (a or b or c) for k, a, b, c in cls.ATTR_RE.findall(tag)}
+            if attrs.get("name", "").lower() in ("robots", "googlebot"):
+                robots.append(attrs.get("content", "").lower())
+        return title, robots
+
+    async def check_indexable(self, url):
+        """
+        HTTP 方式判断可索引性: True / False；
+        返回 None 表示需要浏览器渲染才能判断 (JS 挑战页、标题由脚本生成、跳转页等)
+        """
+        status, headers, html = await self.run(self._read_head, url)
+
+        # X-Robots-Tag 响应头 (可能带爬虫前缀，如 "googlebot: noindex")
+        x_robots = headers.get("X-Robots-Tag", "").lower()
+        if "noindex" in x_robots:
+            return False
+        if status in (404, 410):
+            return False
+
+        lowered = html.lower()
+        if status in (403, 429, 503) or "cf-mitigated" in headers or any(m in lowered for m in self.JS_GATE_MARKERS):
+            return None
+        if status != 200:
+            return None # 其他异常状态交给浏览器判断
+        if not html:
+            return True # 非 HTML 资源
+        if 'http-equiv="refresh"' in lowered or "http-equiv='refresh'" in lowered:
+            return None
+
+        title, robots = self.parse_head(html)
+        if any("noindex" in r for r in robots):
+            return False
+        if not title:
+            return None # 标题由脚本生成，交给浏览器
+        if "404" in title or "not found" in title.lower():
+            return False
+        return True
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
 # ================= 🕷️ 爬虫核心逻辑 =================
 
 class SmartCrawler:
@@ -43,6 +157,8 @@ class SmartCrawler:
         self.cfg = config
         self.log = log_callback
         self.stop_signal = False
+        self.http = None # HttpFetcher (http_fast_path 开启时在 run 中创建)
+        self.classifier = load_classifier(config.keywords_file, log=log_callback)
 
     def get_slug_identifier(self, url):
         """从URL获取唯一标识符(Slug)"""
@@ -57,50 +173,46 @@ class SmartCrawler:
         except: return "unknown"
 
     def classify_page(self, url, title=""):
-        """核心分类逻辑"""
-        u = str(url).lower()
-        t = str(title).lower()
-        path = urlparse(u).path
-
-        # 1. 首页
-        if path in ["", "/", "/index.php", "/index.html", "/default.aspx"]:
-            return "首页", None, 100
-
-        # 2. 搜索页
-        if any(k in u for k in KEYWORDS["Search"]):
-            return "搜索页", None, 90
-
-        # 3. 关于我们
-        if any(k in u or k in t for k in KEYWORDS["About"]):
-            return "关于我们", None, 90
-
-        # 4. 联系我们
-        if any(k in u or k in t for k in KEYWORDS["Contact"]):
-            return "联系我们", None, 90
-
-        # 5. FAQ
-        if any(k in u or k in t for k in KEYWORDS["FAQ"]):
-            return "FAQ", None, 90
-
-        # 6. 新闻/博客
-        if any(k in u for k in KEYWORDS["News"]):
-            is_list = False
-            if "category" in u or "tag" in u or "list" in u or path.endswith("/news/") or path.endswith("/blog/"):
-                is_list = True
-            elif len(path.strip("/").split("/")) <= 2: 
-                is_list = True
-            return "新闻", "聚合页" if is_list else "详情页", 80
-
-        # 7. 产品/解决方案
-        if any(k in u for k in KEYWORDS["Product"]):
-            is_list = False
-            if "category" in u or "collection" in u or "list" in u or path.endswith("/product/") or path.endswith("/products/"):
-                is_list = True
-            elif len(path.strip("/").split("/")) > 3: 
-                is_list = False
-            return "产品", "聚合页" if is_list else "详情页", 80
-
-        return "其他", None, 0
+        """核心分类逻辑 (见 page_classifier.PageClassifier)，返回 (Category, SubType, Score)"""
+        return self.classifier.classify(url, title)
+
+    def pool_for(self, url):
+        """按分类结果返回候选池名称，不属于任何池时返回 None"""
+        return self.classifier.pool(url)
+
+    def ingest_sitemap(self, sitemap_url, site_host):
+        """
+        (在 HTTP 线程池中执行) 流式读取 sitemap 并逐条分类，
+        返回 ({池名: [url, ...]}, 读取的 URL 总数)；每个池最多保留 sitemap_pool_cap 条
+        """
+        reservoirs = {}
+        total = 0
+        for loc in iter_sitemap_urls(self.http.session, sitemap_url, max_urls=self.cfg.sitemap_max_urls,
+                                     max_files=self.cfg.sitemap_max_files, stop=lambda: self.stop_signal):
+            total += 1
+            url = loc.split('#')[0].rstrip('/')
+            if not url.startswith("http") or host_key(url) != site_host: continue
+            path = urlparse(url).path.lower()
+            if any(path.endswith(ext) for ext in IGNORED_EXTENSIONS): continue
+            key = self.pool_for(url)
+            if key:
+                if key not in reservoirs: reservoirs[key] = Reservoir(self.cfg.sitemap_pool_cap)
+                reservoirs[key].add(url)
+        return {k: r.items() for k, r in reservoirs.items()}, total
+
+    async def collect_sitemap(self, seo_task, start_url, project_name):
+        """等待 SEO 文件探测找到 Sitemap 后读取其内容，返回 ingest_sitemap 的结果"""
+        try:
+            seo_results = await asyncio.shield(seo_task)
+            sitemap_url = next((r["URL"] for r in seo_results if r["PageType"] == "Sitemap"), None)
+            if not sitemap_url: return {}, 0
+            self.log(f"   🗺️ [{project_name}] 读取 Sitemap: {sitemap_url}")
+            return await self.http.run(self.ingest_sitemap, sitemap_url, host_key(start_url))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.log(f"      ⚠️ [{project_name}] 读取 Sitemap 出错: {str(e)[:80]}")
+            return {}, 0
 
     async def handle_age_gate(self, page):
         """处理年龄验证弹窗"""
@@ -144,17 +256,145 @@ class SmartCrawler:
         except:
             return True # 默认放行
 
+    async def fetch_links(self, context, url, limiter, timeout=30000):
+        """在独立标签页中打开页面并返回所有链接 (受单站点并发限制)"""
+        async with limiter:
+            page = await context.new_page()
+            try:
+                await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+                await self.handle_age_gate(page)
+                return await page.evaluate("""() => Array.from(document.querySelectorAll('a')).map(a => a.href)""")
+            finally:
+                await page.close()
+
+    async def probe_seo_files(self, context, start_url, project_name, limiter):
+        """并发探测 robots.txt 与 Sitemap，返回 SEO核心 候选列表"""
+        self.log(f"   🤖 [{project_name}] 检查 SEO 核心文件...")
+
+        async def fetch(url, want_text=False):
+            async with limiter:
+                if self.http:
+                    try:
+                        if want_text: return await self.http.get_text(url)
+                        return await self.http.get_status(url), ""
+                    except Exception: pass # HTTP 客户端被拦或出错，回退到浏览器请求
+                resp = await context.request.get(url)
+                text = ""
+                if want_text and resp.status == 200:
+                    try: text = await resp.text()
+                    except: pass
+                return resp.status, text
+
+        async def probe(url):
+            try:
+                status, _ = await fetch(url)
+                return status == 200
+            except: return False
+
+        results = []
+        robots_url = urljoin(start_url, "/robots.txt")
+        common_paths = [
+            "/sitemap.xml",
+            "/sitemap_index.xml", 
+            "/sitemap-index.xml",
+            "/wp-sitemap.xml",
+            "/sitemap/sitemap.xml"
+        ]
+        common_urls = [urljoin(start_url, p) for p in common_paths]
+
+        # 1. robots.txt 与常见 Sitemap 路径同时发出
+        robots_task = asyncio.create_task(fetch(robots_url, want_text=True))
+        common_tasks = {u: asyncio.create_task(probe(u)) for u in common_urls}
+
+        robots_content = ""
+        try:
+            status, robots_content = await robots_task
+            if status == 200:
+                self.log(f"      ✅ 发现 Robots.txt: {robots_url}")
+                results.append({
+                    "Project": project_name,
+                    "Category": "SEO核心",
+                    "PageType": "Robots.txt",
+                    "URL": robots_url
+                })
+            else:
+                self.log(f"      ⚠️ 未找到 Robots.txt (Status: {status})")
+        except Exception as e:
+            self.log(f"      ❌ 检查 Robots.txt 出错: {e}")
+
+        # 2. robots.txt 中声明的 Sitemap (优先级最高)
+        sitemap_candidates = []
+        if robots_content:
+            for sm in re.findall(r'Sitemap:\s*(http[s]?://[^\s]+)', robots_content, re.IGNORECASE):
+                sm = sm.strip()
+                if sm not in sitemap_candidates and sm not in common_tasks: sitemap_candidates.append(sm)
+        robots_tasks = {u: asyncio.create_task(probe(u)) for u in sitemap_candidates}
+
+        # 3. 按优先级取第一个可用的 (找到一个能用的就行，避免重复添加干扰监控)
+        ordered = list(robots_tasks.items()) + list(common_tasks.items())
+        self.log(f"      🔍 开始探测 Sitemap (共 {len(ordered)} 个潜在路径)...")
+        sitemap_url = None
+        for sm_url, task in ordered:
+            if await task:
+                sitemap_url = sm_url
+                break
+        for _, task in ordered:
+            task.cancel()
+
+        if sitemap_url:
+            self.log(f"      ✅ 发现 Sitemap: {sitemap_url}")
+            results.append({
+                "Project": project_name,
+                "Category": "SEO核心",
+                "PageType": "Sitemap",
+                "URL": sitemap_url
+            })
+        else:
+            self.log(f"      ⚠️ 警告: 未找到任何有效的 Sitemap! (已尝试 {len(ordered)} 个路径)")
+            # 用户要求"防止静默失败"，这里已经打印了警告日志。
+        return results
+
+    async def check_indexable(self, context, item, limiter):
+        """检查单个候选页面 (优先 HTTP，必要时在独立标签页中渲染)，返回 True/False；已停止时返回 None"""
+        async with limiter:
+            if self.stop_signal: return None
+            if self.http:
+                try:
+                    verdict = await self.http.check_indexable(item["URL"])
+                    if verdict is not None:
+                        return verdict
+                except Exception: pass
+            page = await context.new_page()
+            try:
+                await page.goto(item["URL"], timeout=20000, wait_until="domcontentloaded")
+                # 不需要等太久，只要能看到 meta 即可
+                return await self.is_indexable(page)
+            except Exception:
+                return True # 访问出错也算通过吧，防止误杀
+            finally:
+                await page.close()
+
     async def crawl_site(self, context, start_url, project_name):
-        """爬取单个站点"""
+        """
+        爬取单个站点：首页之后的深入抓取、SEO 文件探测、可索引性检查并行执行，
+        单站点内同时进行的页面/请求数由 site_concurrency 限制
+        """
         domain = urlparse(start_url).netloc
         self.log(f"🌐 [{project_name}] 开始爬取: {start_url}")
         
         discovered_links = set()
         pools = {k: [] for k in ["首页", "关于我们", "联系我们", "FAQ", "搜索页", "新闻聚合页", "新闻详情页", "产品聚合页", "产品详情页", "产品分类页"]}
+        limiter = asyncio.Semaphore(max(1, int(self.cfg.site_concurrency)))
+        seo_task = sitemap_task = None
         
         page = await context.new_page()
         
         try:
+            # 0. SEO 核心文件探测与 Sitemap 读取不依赖页面，与首页加载同时进行
+            seo_task = asyncio.create_task(self.probe_seo_files(context, start_url, project_name, limiter))
+            if self.http and self.cfg.sitemap_ingest:
+                sitemap_task = asyncio.create_task(self.collect_sitemap(seo_task, start_url, project_name))
+
             # 1. 访问首页
             try:
                 await page.goto(start_url, timeout=40000, wait_until="domcontentloaded")
@@ -193,32 +433,32 @@ class SmartCrawler:
                         internal_links.append(full_url)
                         
                         # 立即分类
-                        cat, sub, _ = self.classify_page(full_url)
-                        if cat == "首页": pools["首页"].append(full_url)
-                        elif cat == "关于我们": pools["关于我们"].append(full_url)
-                        elif cat == "联系我们": pools["联系我们"].append(full_url)
-                        elif cat == "FAQ": pools["FAQ"].append(full_url)
-                        elif cat == "搜索页": pools["搜索页"].append(full_url)
-                        elif cat == "新闻":
-                            if sub == "聚合页": pools["新闻聚合页"].append(full_url)
-                            else: pools["新闻详情页"].append(full_url)
-                        elif cat == "产品":
-                            if sub == "聚合页": 
-                                if "category" in full_url: pools["产品分类页"].append(full_url)
-                                else: pools["产品聚合页"].append(full_url)
-                            else: pools["产品详情页"].append(full_url)
+                        key = self.pool_for(full_url)
+                        if key: pools[key].append(full_url)
 
             self.log(f"   📊 [{project_name}] 首页发现 {len(internal_links)} 个链接")
-
-            # 6. 二级深度搜索 (如果缺少关键页面)
+            await page.close() # 首页已处理完，后续分支各自开标签页
+
+            # 5.1 合并 Sitemap 中的候选 (首页链接优先，排在前面)
+            if sitemap_task:
+                sitemap_pools, sitemap_total = await sitemap_task
+                added = 0
+                for key, urls in sitemap_pools.items():
+                    for u in urls:
+                        if u not in discovered_links:
+                            discovered_links.add(u)
+                            pools[key].append(u)
+                            added += 1
+                if sitemap_total:
+                    self.log(f"   🗺️ [{project_name}] Sitemap 共 {sitemap_total} 个 URL，新增候选 {added} 个")
+
+            # 6. 二级深度搜索 (如果缺少关键页面，Sitemap 已补全时自动跳过)
             # 策略：如果缺少详情页，但有聚合页，去聚合页抓取
             
             async def quick_fetch_children(parent_url):
                 self.log(f"   🔍 [{project_name}] 深入抓取: {parent_url}")
                 try:
-                    await page.goto(parent_url, timeout=30000, wait_until="domcontentloaded")
-                    await self.handle_age_gate(page)
-                    child_hrefs = await page.evaluate("""() => Array.from(document.querySelectorAll('a')).map(a => a.href)""")
+                    child_hrefs = await self.fetch_links(context, parent_url, limiter)
                     new_found = 0
                     for h in child_hrefs:
                         fu = urljoin(start_url, h).split('#')[0].rstrip('/')
@@ -231,18 +471,21 @@ class SmartCrawler:
                     return new_found
                 except: return 0
 
+            dive_targets = []
             # 补全产品详情
             if not pools["产品详情页"] and (pools["产品聚合页"] or pools["产品分类页"]):
                 candidates = pools["产品分类页"] + pools["产品聚合页"]
                 # 选最短的一个去抓
                 if candidates:
-                    target = sorted(candidates, key=len)[0]
-                    await quick_fetch_children(target)
+                    dive_targets.append(sorted(candidates, key=len)[0])
 
             # 补全新闻详情
             if not pools["新闻详情页"] and pools["新闻聚合页"]:
                 target = sorted(pools["新闻聚合页"], key=len)[0]
-                await quick_fetch_children(target)
+                if target not in dive_targets: dive_targets.append(target)
+
+            if dive_targets:
+                await asyncio.gather(*(quick_fetch_children(t) for t in dive_targets))
 
             # 7. 生成候选列表 (Selection)
             final_candidates = []
@@ -299,104 +542,23 @@ class SmartCrawler:
             add_candidate("产品分类页", "产品", "产品分类页")
             add_candidate("产品详情页", "产品", "产品单页", selection_strategy="median") # 选中等长度的
 
-            # --- NEW: Check SEO Core Files ---
-            self.log(f"   🤖 [{project_name}] 检查 SEO 核心文件...")
-            
-            # 1. 检查 robots.txt
-            robots_url = urljoin(start_url, "/robots.txt")
-            robots_content = ""
-            try:
-                resp_robots = await page.request.get(robots_url)
-                if resp_robots.status == 200:
-                    self.log(f"      ✅ 发现 Robots.txt: {robots_url}")
-                    final_candidates.append({
-                        "Project": project_name,
-                        "Category": "SEO核心",
-                        "PageType": "Robots.txt",
-                        "URL": robots_url
-                    })
-                    # 尝试获取内容以解析 Sitemap
-                    try:
-                        robots_content = await resp_robots.text()
-                    except: pass
-                else:
-                    self.log(f"      ⚠️ 未找到 Robots.txt (Status: {resp_robots.status})")
-            except Exception as e:
-                self.log(f"      ❌ 检查 Robots.txt 出错: {e}")
-
-            # 2. 检查 Sitemap
-            sitemap_found = False
-            sitemap_candidates = []
-            
-            # 2.1 从 robots.txt 解析 (优先级最高)
-            if robots_content:
-                found_in_robots = re.findall(r'Sitemap:\s*(http[s]?://[^\s]+)', robots_content, re.IGNORECASE)
-                for sm in found_in_robots:
-                    sitemap_candidates.append(sm.strip())
-            
-            # 2.2 添加常见路径变体
-            common_paths = [
-                "/sitemap.xml",
-                "/sitemap_index.xml", 
-                "/sitemap-index.xml",
-                "/wp-sitemap.xml",
-                "/sitemap/sitemap.xml"
-            ]
-            for p in common_paths:
-                sitemap_candidates.append(urljoin(start_url, p))
-            
-            # 去重并保持顺序
-            unique_candidates = []
-            for c in sitemap_candidates:
-                if c not in unique_candidates: unique_candidates.append(c)
-                
-            # 2.3 依次探测
-            self.log(f"      🔍 开始探测 Sitemap (共 {len(unique_candidates)} 个潜在路径)...")
-            for sm_url in unique_candidates:
-                try:
-                    resp_sm = await page.request.get(sm_url)
-                    if resp_sm.status == 200:
-                        self.log(f"      ✅ 发现 Sitemap: {sm_url}")
-                        final_candidates.append({
-                            "Project": project_name,
-                            "Category": "SEO核心",
-                            "PageType": "Sitemap",
-                            "URL": sm_url
-                        })
-                        sitemap_found = True
-                        break # 找到一个能用的就行，避免重复添加干扰监控
-                except: pass
-            
-            if not sitemap_found:
-                self.log(f"      ⚠️ 警告: 未找到任何有效的 Sitemap! (已尝试 {len(unique_candidates)} 个路径)")
-                # 即使没找到，也可以把 sitemap.xml 作为占位符加进去，或者就不加了以免监控报错？
-                # 用户要求"防止静默失败"，这里已经打印了警告日志。
-                # 也可以添加一个 "Sitemap-Missing" 的条目？暂时只记录日志。
+            # --- Check SEO Core Files (已在深入抓取时并行探测) ---
+            final_candidates.extend(await seo_task)
 
-            # 8. 可索引性检查 (Check Indexability)
+            # 8. 可索引性检查 (Check Indexability)：各候选页并行检查，结果保持原顺序
             valid_results = []
             if self.cfg.check_indexability:
                 self.log(f"   🕵️ [{project_name}] 正在检查 {len(final_candidates)} 个页面的可索引性...")
-                for item in final_candidates:
-                    if self.stop_signal: break
-                    
+                checks = await asyncio.gather(*(
                     # 跳过非 HTML 页面的检查
-                    if item["Category"] == "SEO核心":
-                        valid_results.append(item)
-                        continue
-
-                    try:
-                        # 复用当前页面对象进行检查
-                        await page.goto(item["URL"], timeout=20000, wait_until="domcontentloaded")
-                        # 不需要等太久，只要能看到 meta 即可
-                        is_ok = await self.is_indexable(page)
-                        if is_ok:
-                            valid_results.append(item)
-                        else:
-                            self.log(f"      🚫 跳过不可索引页面: {item['PageType']}")
-                    except Exception as e:
-                        # 访问出错也算通过吧，防止误杀
+                    self.check_indexable(context, item, limiter) if item["Category"] != "SEO核心" else asyncio.sleep(0, True)
+                    for item in final_candidates
+                ))
+                for item, is_ok in zip(final_candidates, checks):
+                    if is_ok:
                         valid_results.append(item)
+                    elif is_ok is False:
+                        self.log(f"      🚫 跳过不可索引页面: {item['PageType']}")
             else:
                 valid_results = final_candidates
 
@@ -407,7 +569,11 @@ class SmartCrawler:
             # 至少返回首页
             return [{"Project": project_name, "Category": "首页", "PageType": "首页", "URL": start_url}]
         finally:
-            await page.close()
+            for task in (seo_task, sitemap_task):
+                if task and not task.done():
+                    task.cancel()
+            if not page.is_closed():
+                await page.close()
 
     async def run(self):
         self.log("🚀 启动智能爬虫任务...")
@@ -430,35 +596,49 @@ class SmartCrawler:
         self.log(f"📂 读取到 {len(urls)} 个目标站点")
 
         all_results = []
+        if self.cfg.http_fast_path and requests is not None:
+            self.http = HttpFetcher(workers=self.cfg.http_workers)
+        elif self.cfg.http_fast_path:
+            self.log("⚠️ 未安装 requests，SEO 文件探测与可索引性检查将全部使用浏览器")
         
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=self.cfg.headless)
             
-            # 限制并发
-            semaphore = asyncio.Semaphore(self.cfg.concurrency)
+            # 限制并发 (全局 + 单站点，按站点轮询放行)
+            scheduler = HostScheduler(
+                self.cfg.concurrency,
+                per_host_concurrency=self.cfg.per_host_concurrency,
+                min_host_interval=self.cfg.host_min_interval
+            )
             
             async def worker(url):
                 if self.stop_signal: return
-                async with semaphore:
+                parsed = urlparse(url)
+                if not parsed.scheme: url = "https://" + url
+                async with scheduler.slot(host_key(url)):
+                    if self.stop_signal: return
                     # 提取项目名
-                    parsed = urlparse(url)
-                    if not parsed.scheme: url = "https://" + url
                     domain = urlparse(url).netloc.replace("www.", "")
                     project_name = domain.split('.')[0].capitalize()
                     
-                    context = await browser.new_context(
-                        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-                    )
+                    context = await browser.new_context(user_agent=USER_AGENT)
                     
                     try:
                         res = await self.crawl_site(context, url, project_name)
                         all_results.extend(res)
                     finally:
                         await context.close()
+                    if scheduler.queue_depth:
+                        self.log(f"📶 调度状态: {scheduler.describe()}")
 
             tasks = [worker(u) for u in urls]
-            await asyncio.gather(*tasks)
-            await browser.close()
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                await browser.close()
+                if self.http:
+                    self.http.close()
+                    self.http = None
 
         if self.stop_signal:
             self.log("🛑 任务已停止")
@@ -512,7 +692,7 @@ class CrawlerApp:
         frame2.pack(fill=tk.X, pady=5)
         
         ttk.Checkbutton(frame2, text="仅筛选可索引页面 (Check Indexable)", variable=self.check_idx).grid(row=0, column=0, sticky=tk.W, padx=10)
-        ttk.Label(frame2, text="ℹ️ 开启后会自动过滤 noindex 和 404 页面，但速度会变慢").grid(row=1, column=0, sticky=tk.W, padx=10, pady=(2,0))
+        ttk.Label(frame2, text="ℹ️ 开启后会自动过滤 noindex 和 404 页面 (优先 HTTP 检查，必要时渲染页面)").grid(row=1, column=0, sticky=tk.W, padx=10, pady=(2,0))
         
         ttk.Checkbutton(frame2, text="后台静默运行 (Headless)", variable=self.headless_mode).grid(row=2, column=0, sticky=tk.W, padx=10, pady=(10,0))
         
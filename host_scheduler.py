@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+# ================= 🚦 按站点调度的并发控制 =================
+# 巡检机器人 (screen-bot-latest.py) 与智能爬虫 (generate_monitor_list_v5_crawler.py) 共用
+
+
+def host_key(url):
+    """提取用于限流的站点标识 (小写域名，去掉 www.)"""
+    try:
+        netloc = urlparse(str(url).strip()).netloc.lower()
+    except Exception:
+        return ""
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+class HostScheduler:
+    """
+    站点级并发调度器：
+    - 全局并发上限 max_concurrency
+    - 同一站点并发上限 per_host_concurrency，同一站点两次开始之间至少间隔 min_host_interval 秒
+    - 等待中的任务按站点轮询放行 (不再因为任务表按 Project 排序而扎堆访问同一个站点)
+
+    用法: async with scheduler.slot(host): ...
+    """
+    def __init__(self, max_concurrency, per_host_concurrency=1, min_host_interval=0.0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self.min_host_interval = max(0.0, float(min_host_interval))
+        self._waiters = OrderedDict() # host -> deque[Future]，顺序即轮询顺序
+        self._in_flight = {} # host -> 进行中数量
+        self._last_start = {} # host -> 上次放行时间 (monotonic)
+        self._total = 0
+        self._timer = None
+
+    @property
+    def queue_depth(self):
+        """排队等待中的任务数"""
+        return sum(1 for q in self._waiters.values() for f in q if not f.done())
+
+    @property
+    def in_flight(self):
+        """全局进行中的任务数"""
+        return self._total
+
+    def in_flight_by_host(self):
+        """各站点进行中的任务数"""
+        return {h: n for h, n in self._in_flight.items() if n}
+
+    def describe(self):
+        """一行状态摘要，用于日志"""
+        busy = ", ".join(f"{h}:{n}" for h, n in sorted(self.in_flight_by_host().items()))
+        return f"排队 {self.queue_depth} | 进行中 {self._total}/{self.max_concurrency} | {busy or '-'}"
+
+    @asynccontextmanager
+    async def slot(self, host):
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(host, deque()).append(fut)
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 已放行但调用方被取消，归还名额
+                self._release(host)
+            raise
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def _release(self, host):
+        self._in_flight[host] -= 1
+        self._total -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """尽可能多地放行等待中的任务；仅因站点间隔受限时，定时再次调度"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        next_delay = None
+        while self._total < self.max_concurrency:
+            now = time.monotonic()
+            granted = None
+            for host, q in self._waiters.items():
+                while q and q[0].done(): # 丢弃已取消的等待者
+                    q.popleft()
+                if not q or self._in_flight.get(host, 0) >= self.per_host_concurrency:
+                    continue
+                wait = self._last_start.get(host, float("-inf")) + self.min_host_interval - now
+                if wait > 0:
+                    next_delay = wait if next_delay is None else min(next_delay, wait)
+                    continue
+                granted = host
+                break
+
+            if granted is None:
+                break
+
+            self._waiters[granted].popleft().set_result(None)
+            self._in_flight[granted] = self._in_flight.get(granted, 0) + 1
+            self._total += 1
+            self._last_start[granted] = now
+            self._waiters.move_to_end(granted) # 轮询: 刚放行的站点排到最后
+            next_delay = None
+
+        # 清理空队列，避免长时间运行时字典无限增长
+        for host in [h for h, q in self._waiters.items() if not q]:
+            del self._waiters[host]
+
+        if next_delay is not None and self._total < self.max_concurrency:
+            self._timer = asyncio.get_running_loop().call_later(next_delay, self._dispatch)
@@ -0,0 +1,218 @@
+import json
+import re
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# ================= 🏷️ 页面分类 =================
+# URL 智能分类工具 (generate_monitor_list_v4.py) 与智能爬虫 (generate_monitor_list_v5_crawler.py) 共用。
+# 所有分类的关键词编译进同一个匹配器，URL 与标题各扫描一遍即可得到命中的全部分类，再按优先级取第一个
+
+# 关键词映射 (可根据需求扩展，或通过 JSON 配置覆盖)
+KEYWORDS = {
+    "Contact": ["contact", "lianxi", "联系", "support"],
+    "About": ["about", "profile", "story", "guanyu", "company", "简介", "关于"],
+    "FAQ": ["faq", "help", "question", "wenti", "常见问题"],
+    "News": ["news", "blog", "press", "media", "insight", "article", "zixun", "dongtai", "journal", "资讯", "新闻", "动态"],
+    "Product": ["product", "item", "shop", "store", "collection", "category", "solution", "service", "chanpin", "anli", "产品", "案例", "服务", "解决方案"],
+    "Search": ["search", "sousuo", "搜索", "?s="]
+}
+
+# 首页路径
+HOME_PATHS = ["", "/", "/index.php", "/index.html", "/default.aspx"]
+
+# 分类优先级: (分类, 关键词键, 是否同时匹配标题, 分数)
+CATEGORY_ORDER = [
+    ("搜索页", "Search", False, 90),
+    ("关于我们", "About", True, 90),
+    ("联系我们", "Contact", True, 90),
+    ("FAQ", "FAQ", True, 90),
+    ("新闻", "News", False, 80),
+    ("产品", "Product", False, 80),
+]
+
+BACKENDS = ("ahocorasick", "regex", "scan")
+
+# URL 拆分: netloc / path (与 urlparse 一致，path 不含 ?query 与 #fragment)
+URL_RE = re.compile(r"^(?:[A-Za-z][A-Za-z0-9+.\-]*:)?(?://([^/?#]*))?([^?#]*)")
+
+
+def split_url(url):
+    """返回 (netloc, path)，与 urlparse(url).netloc / .path 一致"""
+    m = URL_RE.match(url)
+    path = m.group(2)
+    if ";" in path: # urlparse 会把最后一段路径中 ; 之后的部分当作 params 去掉
+        i = path.find(";", path.rfind("/"))
+        if i >= 0: path = path[:i]
+    return m.group(1) or "", path
+
+
+def load_keywords(path):
+    """
+    读取自定义关键词 JSON，格式与 KEYWORDS 相同 ({"Product": ["product", ...], ...})。
+    文件中出现的分类整体替换默认列表，未出现的沿用默认值；未知分类名抛出 ValueError
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("关键词配置必须是 {分类: [关键词, ...]} 格式")
+    unknown = sorted(set(data) - set(KEYWORDS))
+    if unknown:
+        raise ValueError(f"未知分类: {', '.join(unknown)} (可用: {', '.join(KEYWORDS)})")
+    keywords = {k: list(v) for k, v in KEYWORDS.items()}
+    for key, words in data.items():
+        if isinstance(words, str) or not all(isinstance(w, str) for w in words):
+            raise ValueError(f"分类 {key} 的关键词必须是字符串列表")
+        keywords[key] = list(words)
+    return keywords
+
+
+class PageClassifier:
+    """
+    页面分类引擎：classify() 返回 (Category, SubType, Score)，pool() 返回候选池名称。
+
+    backend:
+    - ahocorasick: 安装了 pyahocorasick 时使用，所有关键词编译成一个自动机，一次扫描得到全部命中
+    - regex: 所有关键词合并成一个前瞻正则，逐位置扫描 (同一位置只报告最长的关键词，前缀关键词的分类预先并入)
+    - scan: 按优先级逐个关键词做子串查找，命中即停
+    - auto (默认): 有 pyahocorasick 用 ahocorasick，否则用 scan (纯 Python 下比 regex 快，见 benchmarks/bench_classifier.py)
+    """
+    def __init__(self, keywords=None, backend="auto"):
+        keywords = keywords or KEYWORDS
+        if backend == "auto":
+            backend = "ahocorasick" if ahocorasick is not None else "scan"
+        if backend not in BACKENDS:
+            raise ValueError(f"未知的匹配后端: {backend}")
+        if backend == "ahocorasick" and ahocorasick is None:
+            raise ImportError("需要安装 pyahocorasick")
+        self.backend = backend
+        self.home_paths = frozenset(HOME_PATHS)
+        self.order = [(name, score) for name, _, _, score in CATEGORY_ORDER]
+
+        # 每个关键词命中的分类位掩码 (位序即优先级)；标题只参与 title_mask 中的分类
+        masks = {}
+        self.title_mask = 0
+        for bit, (_, key, match_title, _) in enumerate(CATEGORY_ORDER):
+            for word in keywords.get(key, ()):
+                word = word.lower()
+                if word:
+                    masks[word] = masks.get(word, 0) | (1 << bit)
+            if match_title:
+                self.title_mask |= 1 << bit
+        self.masks = masks
+        self.scan_order = [
+            (bit, tuple(w.lower() for w in keywords.get(key, ()) if w), match_title)
+            for bit, (_, key, match_title, _) in enumerate(CATEGORY_ORDER)
+        ]
+
+        if backend == "ahocorasick":
+            self.automaton = ahocorasick.Automaton()
+            for word, mask in masks.items():
+                self.automaton.add_word(word, mask)
+            self.automaton.make_automaton()
+        elif backend == "regex":
+            # 最长优先：同一位置命中的其它关键词都是它的前缀，把前缀的分类并入掩码
+            words = sorted(masks, key=len, reverse=True)
+            self.regex_masks = {w: 0 for w in words}
+            for w in words:
+                for other, mask in masks.items():
+                    if w.startswith(other):
+                        self.regex_masks[w] |= mask
+            self.regex = re.compile("(?=(" + "|".join(map(re.escape, words)) + "))") if words else None
+
+    def _mask(self, text):
+        """text 中命中的全部分类位掩码"""
+        mask = 0
+        if not text:
+            return mask
+        if self.backend == "ahocorasick":
+            for _, m in self.automaton.iter(text):
+                mask |= m
+        elif self.regex is not None:
+            regex_masks = self.regex_masks
+            for m in self.regex.finditer(text):
+                mask |= regex_masks[m.group(1)]
+        return mask
+
+    def match(self, u, t=""):
+        """返回最高优先级的命中分类序号 (CATEGORY_ORDER 下标)；u / t 为已转小写的 URL 与标题，未命中返回 -1"""
+        if self.backend == "scan":
+            ut = u + "\x00" + t if t else u # 关键词不含 \x00，不会跨界命中
+            for bit, words, match_title in self.scan_order:
+                text = ut if match_title else u
+                for k in words:
+                    if k in text:
+                        return bit
+            return -1
+        mask = self._mask(u) | (self._mask(t) & self.title_mask)
+        return (mask & -mask).bit_length() - 1
+
+    def _classify(self, url, title, path):
+        u = url.lower()
+        if isinstance(title, str):
+            t = title.lower()
+        else:
+            t = "" if title is None or title != title else str(title).lower() # None / NaN 视为无标题
+        if path is None:
+            path = split_url(url)[1]
+        path = path.lower()
+
+        # 1. 首页
+        if path in self.home_paths:
+            return "首页", None, 100
+
+        bit = self.match(u, t)
+        if bit < 0:
+            return "其他", None, 0
+        name, score = self.order[bit]
+
+        # 新闻/博客: 列表特征 路径短, 包含 category, tag, list；详情特征 路径长, 包含 .html, 日期, 具体文章名
+        if name == "新闻":
+            is_list = "category" in u or "tag" in u or "list" in u or path.endswith("/news/") or path.endswith("/blog/") \
+                or path.strip("/").count("/") < 2 # 路径很浅可能是列表
+            return name, "聚合页" if is_list else "详情页", score
+
+        # 产品/解决方案
+        if name == "产品":
+            is_list = "category" in u or "collection" in u or "list" in u or path.endswith("/product/") or path.endswith("/products/")
+            return name, "聚合页" if is_list else "详情页", score
+
+        return name, None, score
+
+    def classify(self, url, title=""):
+        """
+        核心分类逻辑
+        返回: (Category, SubType, Score)
+        Category: 首页, 搜索页, 关于我们, 联系我们, FAQ, 新闻, 产品, 其他
+        SubType: 聚合页, 详情页, None
+        """
+        return self._classify(str(url), title, None)
+
+    def pool(self, url, title="", path=None):
+        """候选池名称 (首页 / 关于我们 / ... / 产品详情页)，不属于任何池返回 None；path 可传入已拆分好的路径"""
+        url = str(url)
+        cat, sub, _ = self._classify(url, title, path)
+        if cat == "新闻":
+            return "新闻聚合页" if sub == "聚合页" else "新闻详情页"
+        if cat == "产品":
+            if sub == "聚合页":
+                # 细分：如果URL包含 category 可能是分类页，否则是总聚合
+                return "产品分类页" if "category" in url else "产品聚合页"
+            return "产品详情页"
+        return None if cat == "其他" else cat
+
+
+def load_classifier(path="", backend="auto", log=print):
+    """按配置文件创建分类器：path 为空或文件不存在时使用默认关键词，配置有误时打印原因并回退默认关键词"""
+    keywords = None
+    if path:
+        try:
+            keywords = load_keywords(path)
+            log(f"🏷️ 已加载自定义关键词: {path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log(f"⚠️ 关键词配置读取失败，使用默认关键词: {e}")
+    return PageClassifier(keywords, backend)
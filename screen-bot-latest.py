@@ -1,16 +1,35 @@
+import argparse
 import asyncio
+import html
+import io
+import json
 import os
 import time
 import signal
 import sys
 import threading
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from datetime import datetime
-import pandas as pd
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import random
 from urllib.parse import urlparse
+from host_scheduler import HostScheduler, host_key
+from url_history import HISTORY_FILENAME, TERMINAL_STATUSES, CyclePlanner, UrlHistory, history_key
+import visual_diff
+import blob_store
+import weakref
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 # ================= ⚙️ 全局配置与常量 =================
 
@@ -21,8 +40,27 @@ BLOCK_DOMAINS = [
     "hm.baidu.com", "cnzz.com", "hotjar.com", "sentry.io", "clarity.ms"
 ]
 
+# 第三方视频嵌入 (block_video_embeds 开启时屏蔽，被巡检站点自身的域名除外)
+VIDEO_EMBED_DOMAINS = [
+    "youtube.com", "youtube-nocookie.com", "ytimg.com", "googlevideo.com", "vimeo.com", "vimeocdn.com",
+    "wistia.com", "wistia.net", "jwplayer.com", "jwpcdn.com", "player.youku.com", "player.bilibili.com", "v.qq.com"
+]
+
+# 被拦截请求的体积估算 (KB)，还没有同类型响应样本时使用
+BLOCKED_SIZE_DEFAULT_KB = {"script": 40, "image": 30, "media": 800, "font": 40, "stylesheet": 20, "document": 60}
+
+# 实时保存的进度日志文件名 (位于当日报告目录)
+AUTOSAVE_FILENAME = "_autosave_progress.jsonl"
+
+# WebP 单边最大像素，超长整页截图自动改用 JPEG
+WEBP_MAX_DIMENSION = 16383
+
 STOP_REQUESTED = False
 
+# GUI 模块只在启动图形界面时导入 (见 _load_tkinter)，命令行/守护模式与分片子进程不依赖 Tkinter；
+# pandas 导入约需 0.5s，同样在读取任务表/写报告时才导入，命令行启动无需等待
+tk = ttk = filedialog = messagebox = None
+
 class InspectionConfig:
     def __init__(self):
         self.excel_path = ""
@@ -30,10 +68,46 @@ class InspectionConfig:
         self.proxy_server = ""
         self.concurrent_tasks = 2
         self.page_timeout = 60000  # ms
-        self.max_retries = 2
+        self.max_retries = 2 # 单个任务最多重试次数 (各失败类别的重试规则见 RETRY_RULES)
+        self.retry_rules = {} # 覆盖 RETRY_RULES，如 {"timeout": [2, 10]} (最多重试次数, 首次退避秒数)
+        self.retry_budget = 0.2 # 本轮重试总次数上限 = 任务数 × 该比例 (至少 5 次)，0 为不限
+        self.task_deadline_s = 0 # 单次尝试 (加载 + 留存 + 截图，不含排队) 的硬性截止时间，超时视为卡死并丢弃上下文；0 为自动
+        self.browser_recycle_pages = 500 # 每服务多少个页面重启一次浏览器 (回收内存)，0 为不重启
+        self.browser_memory_limit_mb = 0 # 浏览器进程树内存超过该值 (MB) 时重启，0 为不检查 (需要 psutil)
+        self.max_browser_restarts = 5 # 浏览器崩溃后最多自动重启次数
         self.strict_load_mode = True
         self.resume = True # 是否断点续传(如果想要重新巡检的化，需要将该值设为False)
         self.retention_time = 15 # ms -> s 页面留存时间
+        self.overlap_retention = True # 留存阶段不占用加载并发槽 (改由 max_dwelling_pages 单独限制)
+        self.max_dwelling_pages = 8 # 同时处于留存阶段的页面上限
+        self.context_pool_size = 0 # 浏览器上下文池上限，0 为自动 (加载并发 + 留存页面上限)
+        self.context_per_project = False # 每个项目独占全新上下文 (项目内保留Cookie等会话状态，不与其他项目混用)
+        self.scroll_strategy = "adaptive" # 滚动策略: adaptive(页内懒加载探测，稳定即返回) / legacy(原固定等待)
+        self.scroll_max_time = 20 # s 自适应滚动的最长耗时
+        self.per_host_concurrency = 2 # 同一站点最大并发 (全局并发可以放心调高，单站压力由此限制)
+        self.host_min_interval = 0.5 # s 同一站点两次打开页面的最小间隔
+        self.screenshot_format = "jpeg" # 截图格式: png / jpeg / webp (webp 需要 Pillow)
+        self.screenshot_quality = 80 # jpeg/webp 压缩质量 (1-100)
+        self.thumbnail_width = 480 # 报告缩略图宽度 (px)，0 为不生成 (需要 Pillow)
+        self.encoder_workers = 2 # webp/缩略图编码进程数
+        self.visual_diff = True # 与前一天同项目同页面的截图做视觉对比 (需要 numpy + Pillow)
+        self.diff_threshold = 0.90 # 分块 SSIM 低于该值视为变化
+        self.diff_workers = 0 # 视觉对比进程数，0 为 CPU 核数
+        self.worker_processes = 1 # 分片进程数 (>1 时按 Project 拆分到多个进程，每个进程独立浏览器与事件循环)
+        self.block_resource_types = [] # 额外按资源类型屏蔽，如 ["media", "font"] (会影响截图中视频封面/图标字体的显示)
+        self.block_video_embeds = False # 屏蔽第三方视频嵌入 (YouTube/Vimeo 等)
+        self.block_allow = {} # 按项目放行: {"项目名": ["youtube.com", "font"]}，可填域名或资源类型
+        self.open_report = True # 完成后自动打开汇总报告 (仅 Windows，命令行模式下关闭)
+        self.schedule_mode = False # 调度模式: 按 URL 历史只挑选本轮到期的任务 (失败/常变化页面优先)，适合守护模式
+        self.cycle_budget_min = 60 # 调度模式每轮时间预算 (分钟)，0 为不限
+        self.recheck_min_hours = 1 # 失败/频繁变化页面的复查间隔 (小时)
+        self.recheck_max_hours = 72 # 稳定页面的最长复查间隔 (小时)
+        self.skip_unchanged = False # 页面内容指纹与上次截图时一致则跳过整页截图，报告直接引用上次的截图
+        self.reuse_max_days = 7 # 沿用截图的最长天数，超过后即使指纹未变也重新截图 (指纹不含样式变化)
+        self.blob_store = False # 截图按内容哈希去重存放在 <输出目录>/_blobs，日期目录只保存清单 _manifest.json (相同截图只占一份空间)
+        self.blob_retention_days = 0 # >0 时每轮结束后删除超过该天数的清单并回收不再引用的截图，0 为不清理
+        self.early_abort = True # 看门狗早停: 恶意跳转、主文档 4xx/5xx、假验证遮罩一出现就中止页面，不等加载与留存结束
+        self.abort_dom_grace_s = 10 # 假验证文本/全屏 iframe 持续超过该秒数才中止 (真实验证页通常数秒内自动跳转)，不超过留存时间
 
 # ================= 📊 报告生成模块 =================
 class ReportGenerator:
@@ -125,21 +199,71 @@ class ReportGenerator:
         return summary_path
 
     @staticmethod
-    def create_html_report(results, save_dir):
-        """创建详细的可视化报告"""
-        total = len(results)
-        success = len([r for r in results if r['Status']=='Success'])
-        failed = len([r for r in results if r['Status']=='Failed'])
-        
-        # 相对路径处理
+    def rel_path(path, save_dir):
+        """图片路径转为相对报告目录的路径；日期目录下的路径不存在时按清单解析到内容寻址存储，仍找不到返回空字符串"""
+        if not isinstance(path, str) or not path:
+            return ""
+        if not os.path.exists(path):
+            path = blob_store.resolve_tree_path(path)
+            if not path:
+                return ""
+        try:
+            return os.path.relpath(path, save_dir).replace('\\', '/')
+        except ValueError:
+            return ""
+
+    @staticmethod
+    def report_items(results, save_dir):
+        """
+        把结果整理成报告用的紧凑索引 (按项目首次出现顺序分组)：
+        projects: [项目名...]；items: [[项目序号, 页面类型, URL, 状态, 耗时, 缩略图, 原图, 对比状态, 变化%, 变化区域], ...]
+        """
+        grouped = {}
         for res in results:
-            if res['ScreenshotPath'] and os.path.exists(res['ScreenshotPath']):
+            grouped.setdefault(str(res.get('Project', '')), []).append(res)
+
+        projects, items = [], []
+        for project, rows in grouped.items():
+            pi = len(projects)
+            projects.append(project)
+            for res in rows:
+                rel = ReportGenerator.rel_path(res.get('ScreenshotPath'), save_dir)
+                thumb = ReportGenerator.rel_path(res.get('ThumbPath'), save_dir) or rel
+                diff_status = res.get('DiffStatus') if isinstance(res.get('DiffStatus'), str) else ""
                 try:
-                    res['RelPath'] = os.path.relpath(res['ScreenshotPath'], save_dir).replace('\\', '/')
+                    regions = json.loads(res['DiffRegions']) if isinstance(res.get('DiffRegions'), str) else []
                 except ValueError:
-                    res['RelPath'] = ""
-            else:
-                res['RelPath'] = ""
+                    regions = []
+                try:
+                    load_time = float(res.get('LoadTime_s') or 0)
+                    load_time = 0 if load_time != load_time else round(load_time, 2) # NaN
+                except (TypeError, ValueError):
+                    load_time = 0
+                try:
+                    changed_pct = float(res.get('ChangedPct') or 0)
+                    changed_pct = 0 if changed_pct != changed_pct else changed_pct
+                except (TypeError, ValueError):
+                    changed_pct = 0
+                items.append([
+                    pi, str(res.get('PageType', '')), str(res.get('URL', '')), str(res.get('Status', '')).lower(),
+                    load_time, thumb, rel, diff_status, changed_pct, regions
+                ])
+        return projects, items
+
+    @staticmethod
+    def create_html_report(results, save_dir, page_size=60):
+        """
+        创建详细的可视化报告。
+        结果以 JSON 索引嵌入页面，卡片按页渲染 (每页 page_size 张)，图片进入视口才加载；
+        筛选只重建一次下标数组，翻页/大图切换都是按下标直接取，几千条结果也不卡
+        """
+        total = len(results)
+        success = len([r for r in results if r['Status']=='Success'])
+        failed = len([r for r in results if r['Status']=='Failed'])
+
+        projects, items = ReportGenerator.report_items(results, save_dir)
+        payload = json.dumps({"projects": projects, "items": items, "pageSize": page_size}, ensure_ascii=False, separators=(',', ':'))
+        payload = payload.replace('</', '<\\/') # 防止 URL/标题中的 </script> 提前结束脚本块
 
         html_content = f"""
         <!DOCTYPE html>
@@ -155,6 +279,8 @@ class ReportGenerator:
                 .controls {{ text-align: center; margin: 20px 0; }}
                 .filter-btn {{ margin: 0 5px; padding: 8px 20px; background: white; color: #555; border: 1px solid #ddd; border-radius: 20px; cursor: pointer; transition: all 0.2s; }}
                 .filter-btn:hover, .filter-btn.active {{ background: var(--primary); color: white; border-color: var(--primary); }}
+                .filter-btn:disabled {{ opacity: 0.4; cursor: default; background: white; color: #555; border-color: #ddd; }}
+                .pager {{ text-align: center; margin: 20px 0; color: #555; }}
                 .grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); gap: 20px; }}
                 .card {{ background: white; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 5px rgba(0,0,0,0.05); transition: transform 0.2s; border: 1px solid #eee; }}
                 .card:hover {{ transform: translateY(-3px); box-shadow: 0 5px 15px rgba(0,0,0,0.1); }}
@@ -170,7 +296,10 @@ class ReportGenerator:
                 
                 /* Modal Styles */
                 .modal {{ display: none; position: fixed; top: 0; left: 0; width: 100%; height: 100%; background: rgba(0,0,0,0.92); z-index: 999; backdrop-filter: blur(5px); }}
-                .modal-content {{ margin: auto; display: block; max-width: 95%; max-height: 85vh; margin-top: 60px; box-shadow: 0 0 20px rgba(0,0,0,0.5); }}
+                .modal-content {{ display: block; max-width: 95vw; max-height: 85vh; box-shadow: 0 0 20px rgba(0,0,0,0.5); }}
+                #imgWrap {{ position: relative; width: fit-content; margin: 60px auto 0; }}
+                .diff-box {{ position: absolute; border: 2px solid #ff9800; background: rgba(255,152,0,0.15); pointer-events: none; }}
+                .diff-badge {{ padding: 2px 8px; border-radius: 10px; font-size: 0.75rem; color: white; background: #ff9800; }}
                 .modal-controls {{ position: fixed; top: 0; left: 0; width: 100%; height: 50px; background: rgba(0,0,0,0.5); display: flex; align-items: center; justify-content: center; z-index: 1000; }}
                 .modal-btn {{ background: transparent; color: white; border: 1px solid rgba(255,255,255,0.3); padding: 5px 15px; margin: 0 5px; border-radius: 4px; cursor: pointer; font-size: 0.9rem; transition: background 0.2s; }}
                 .modal-btn:hover {{ background: rgba(255,255,255,0.2); }}
@@ -195,66 +324,22 @@ class ReportGenerator:
             </div>
             
             <div class="controls">
-                <button class="filter-btn active" onclick="filterResults('all')">全部显示</button>
-                <button class="filter-btn" onclick="filterResults('success')">只看成功</button>
-                <button class="filter-btn" onclick="filterResults('failed')">只看失败</button>
+                <button class="filter-btn active" onclick="filterResults('all', this)">全部显示</button>
+                <button class="filter-btn" onclick="filterResults('success', this)">只看成功</button>
+                <button class="filter-btn" onclick="filterResults('failed', this)">只看失败</button>
+                <button class="filter-btn" onclick="filterResults('changed', this)">只看变化</button>
                 <a href="summary_report.html" class="filter-btn" style="text-decoration:none; background:#9b59b6; color:white; border-color:#9b59b6;">返回总览</a>
             </div>
             
-            <div id="resultsGrid">
-        """
-
-        projects = {}
-        for res in results:
-            project = res['Project']
-            if project not in projects:
-                projects[project] = []
-            projects[project].append(res)
-        
-        for project, project_results in projects.items():
-            project_success = len([r for r in project_results if r['Status'] == 'Success'])
-            project_failed = len([r for r in project_results if r['Status'] == 'Failed'])
-            
-            html_content += f"""
-            <div class="project-group" id="{project}">
-                <div class="project-header">
-                    <span>📂 {project}</span>
-                    <span style="font-size:0.9rem; font-weight:normal">
-                        <span style="color:var(--success)">✔ {project_success}</span> / 
-                        <span style="color:var(--danger)">✘ {project_failed}</span>
-                    </span>
-                </div>
-                <div class="grid">
-            """
+            <div class="pager"></div>
+            <div id="resultsGrid"></div>
+            <div class="pager"></div>
             
-            for res in project_results:
-                color = "#27ae60" if res['Status']=='Success' else "#e74c3c"
-                status_icon = "✅" if res['Status']=='Success' else "❌"
-                img_tag = f'<img src="{res["RelPath"]}" loading="lazy">' if res['RelPath'] else '<div style="padding:60px 0;text-align:center;color:#999">❌ 无预览图</div>'
-                
-                html_content += f"""
-                <div class="card result-item" data-status="{res['Status'].lower()}">
-                    <div style="height:4px; background:{color}"></div>
-                    <div class="img-box" onclick="openModal('{res["RelPath"]}', '{res["URL"]}', '{res["Project"]} - {res["PageType"]}')">
-                        {img_tag}
-                        <button class="overlay-btn" onclick="event.stopPropagation(); window.open('{res["URL"]}', '_blank');">🔗 访问</button>
-                    </div>
-                    <div class="info">
-                        <span class="info-title" title="{res['PageType']}">{res['PageType']}</span>
-                        <div class="info-meta">
-                            <span>⏱️ {res.get('LoadTime_s',0)}s</span>
-                            <span style="color:{color}; font-weight:bold;">{status_icon} {res['Status']}</span>
-                        </div>
-                    </div>
-                </div>
-                """
-            
-            html_content += "</div></div>"
+            <script type="application/json" id="reportData">{payload}</script>
+        """
 
-        # 插入JavaScript (保持原有逻辑但增强交互)
+        # 插入JavaScript
         html_content += """
-            </div>
-            
             <!-- 模态框结构 -->
             <div id="myModal" class="modal" onclick="if(event.target === this) closeModal()">
                 <div class="modal-controls">
@@ -268,28 +353,175 @@ class ReportGenerator:
                 </div>
                 
                 <button class="nav-btn prev" onclick="changeImage(-1)">❮</button>
-                <img class="modal-content" id="img01">
+                <div id="imgWrap"><img class="modal-content" id="img01"><div id="diffLayer"></div></div>
                 <button class="nav-btn next" onclick="changeImage(1)">❯</button>
                 
                 <div id="caption"></div>
             </div>
             
             <script>
-                let modalImages = [], modalUrls = [], modalCaptions = [];
-                let currentIndex = 0;
+                // 数据索引: items 每行 [项目序号, 页面类型, URL, 状态, 耗时, 缩略图, 原图, 对比状态, 变化%, 变化区域]
+                const DATA = JSON.parse(document.getElementById('reportData').textContent);
+                const ITEMS = DATA.items, PROJECTS = DATA.projects, PAGE_SIZE = DATA.pageSize || 60;
+                const F = { P: 0, TYPE: 1, URL: 2, STATUS: 3, LOAD: 4, THUMB: 5, FULL: 6, DIFF: 7, PCT: 8, REGIONS: 9 };
+
+                // 各项目成功/失败数 (只算一次)
+                const projectStats = PROJECTS.map(() => ({ ok: 0, bad: 0 }));
+                ITEMS.forEach(it => {
+                    if (it[F.STATUS] === 'success') projectStats[it[F.P]].ok++;
+                    else if (it[F.STATUS] === 'failed') projectStats[it[F.P]].bad++;
+                });
+
+                let view = [];        // 当前筛选下的结果下标 (指向 ITEMS)
+                let imagePos = [];    // 有截图的结果在 view 中的位置 (大图浏览顺序)
+                let posToImage = [];  // view 位置 -> imagePos 下标 (-1 表示无图)
+                let page = 0;
+                let currentIndex = 0; // 当前大图在 imagePos 中的下标
                 let scale = 1, offsetX = 0, offsetY = 0;
-                let isDragging = false, startX, startY;
-                
+
+                // 卡片图片进入视口 (提前 300px) 才真正加载
+                const imgObserver = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {
+                    entries.forEach(e => {
+                        if (!e.isIntersecting) return;
+                        e.target.src = e.target.dataset.src;
+                        imgObserver.unobserve(e.target);
+                    });
+                }, { rootMargin: '300px' }) : null;
+
+                function esc(s) {
+                    return String(s).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c]));
+                }
+
+                function buildView(status) {
+                    view = []; imagePos = []; posToImage = [];
+                    for (let i = 0; i < ITEMS.length; i++) {
+                        const it = ITEMS[i];
+                        if (status !== 'all' && it[F.STATUS] !== status && it[F.DIFF] !== status) continue;
+                        posToImage.push(it[F.FULL] ? imagePos.length : -1);
+                        if (it[F.FULL]) imagePos.push(view.length);
+                        view.push(i);
+                    }
+                }
+
+                function cardHtml(it, pos) {
+                    const ok = it[F.STATUS] === 'success';
+                    const color = ok ? '#27ae60' : '#e74c3c';
+                    const statusText = (ok ? '✅ ' : '❌ ') + esc(it[F.STATUS].charAt(0).toUpperCase() + it[F.STATUS].slice(1));
+                    const img = it[F.FULL]
+                        ? `<img data-src="${esc(it[F.THUMB])}" loading="lazy" alt="">`
+                        : '<div style="padding:60px 0;text-align:center;color:#999">❌ 无预览图</div>';
+                    const badge = it[F.DIFF] === 'changed' ? `<span class="diff-badge">🟠 变化 ${it[F.PCT]}%</span>` : '';
+                    return `
+                    <div class="card result-item">
+                        <div style="height:4px; background:${color}"></div>
+                        <div class="img-box" onclick="openModal(${pos})">
+                            ${img}
+                            <button class="overlay-btn" onclick="event.stopPropagation(); openUrlAt(${pos});">🔗 访问</button>
+                        </div>
+                        <div class="info">
+                            <span class="info-title" title="${esc(it[F.TYPE])}">${esc(it[F.TYPE])}</span>
+                            <div class="info-meta">
+                                <span>⏱️ ${it[F.LOAD]}s</span>
+                                ${badge}
+                                <span style="color:${color}; font-weight:bold;">${statusText}</span>
+                            </div>
+                        </div>
+                    </div>`;
+                }
+
+                function pageCount() { return Math.max(1, Math.ceil(view.length / PAGE_SIZE)); }
+
+                // 只渲染当前页的卡片，项目分组标题按需插入
+                function renderPage() {
+                    page = Math.min(Math.max(page, 0), pageCount() - 1);
+                    const start = page * PAGE_SIZE, end = Math.min(view.length, start + PAGE_SIZE);
+                    const parts = [];
+                    let lastProject = -1;
+                    for (let pos = start; pos < end; pos++) {
+                        const it = ITEMS[view[pos]];
+                        if (it[F.P] !== lastProject) {
+                            if (lastProject !== -1) parts.push('</div></div>');
+                            lastProject = it[F.P];
+                            const name = esc(PROJECTS[lastProject]), st = projectStats[lastProject];
+                            parts.push(`
+                    <div class="project-group" id="${name}">
+                        <div class="project-header">
+                            <span>📂 ${name}</span>
+                            <span style="font-size:0.9rem; font-weight:normal">
+                                <span style="color:var(--success)">✔ ${st.ok}</span> / 
+                                <span style="color:var(--danger)">✘ ${st.bad}</span>
+                            </span>
+                        </div>
+                        <div class="grid">`);
+                        }
+                        parts.push(cardHtml(it, pos));
+                    }
+                    if (lastProject !== -1) parts.push('</div></div>');
+
+                    const grid = document.getElementById('resultsGrid');
+                    if (imgObserver) imgObserver.disconnect();
+                    grid.innerHTML = parts.length ? parts.join('') : '<div style="text-align:center; color:#999; padding:40px">没有符合条件的结果</div>';
+                    grid.querySelectorAll('img[data-src]').forEach(img => {
+                        if (imgObserver) imgObserver.observe(img); else img.src = img.dataset.src;
+                    });
+                    renderPager();
+                }
+
+                function renderPager() {
+                    const html = `
+                        <button class="filter-btn" onclick="gotoPage(page - 1)" ${page <= 0 ? 'disabled' : ''}>❮ 上一页</button>
+                        <span>第 ${page + 1} / ${pageCount()} 页 · 共 ${view.length} 条</span>
+                        <button class="filter-btn" onclick="gotoPage(page + 1)" ${page >= pageCount() - 1 ? 'disabled' : ''}>下一页 ❯</button>`;
+                    document.querySelectorAll('.pager').forEach(p => p.innerHTML = html);
+                }
+
+                function gotoPage(p, scroll = true) {
+                    if (p < 0 || p >= pageCount() || p === page) return;
+                    page = p;
+                    renderPage();
+                    if (scroll) document.getElementById('resultsGrid').scrollIntoView();
+                }
+
+                function filterResults(status, btn) {
+                    buildView(status);
+                    page = 0;
+                    renderPage();
+                    document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
+                    if (btn) btn.classList.add('active');
+                }
+
+                // 从总览页跳转过来 (#项目名)：翻到该项目所在页并定位
+                function jumpToProject(name) {
+                    const pi = PROJECTS.indexOf(name);
+                    if (pi < 0) return;
+                    const pos = view.findIndex(i => ITEMS[i][F.P] === pi);
+                    if (pos < 0) return;
+                    page = Math.floor(pos / PAGE_SIZE);
+                    renderPage();
+                    const el = document.getElementById(name);
+                    if (el) el.scrollIntoView();
+                }
+
+                function isModalOpen() { return document.getElementById('myModal').style.display === 'block'; }
+
                 // Initialize on load to restore state from URL hash
                 window.onload = function() {
-                    collectModalData();
+                    buildView('all');
                     const hash = window.location.hash;
                     if (hash && hash.startsWith('#view=')) {
+                        renderPage();
                         const index = parseInt(hash.substring(6));
-                        if (!isNaN(index) && index >= 0 && index < modalImages.length) {
+                        if (!isNaN(index) && index >= 0 && index < imagePos.length) {
                             showImage(index);
                             document.getElementById('myModal').style.display = 'block';
                         }
+                    } else if (hash.length > 1) {
+                        let name = hash.substring(1);
+                        try { name = decodeURIComponent(name); } catch(e) {}
+                        renderPage();
+                        jumpToProject(name);
+                    } else {
+                        renderPage();
                     }
                 };
 
@@ -300,44 +532,37 @@ class ReportGenerator:
                         closeModal(false); 
                     } else {
                         const index = parseInt(hash.substring(6));
-                        if (!isNaN(index) && document.getElementById('myModal').style.display !== 'block') {
+                        if (!isNaN(index) && !isModalOpen()) {
                             showImage(index);
                             document.getElementById('myModal').style.display = 'block';
                         }
                     }
                 };
-                
-                function normalize(url) {
-                    try { return decodeURIComponent(url).replace(/\\\\/g, '/'); } catch(e) { return url; }
-                }
 
-                function openModal(imageSrc, url, caption) {
-                    collectModalData();
-                    const normSrc = normalize(imageSrc);
-                    currentIndex = modalImages.findIndex(img => normalize(img).includes(normSrc));
-                    
-                    if(currentIndex === -1 && imageSrc) { // Fallback
-                         document.getElementById('img01').src = imageSrc;
-                         document.getElementById('myModal').style.display = 'block';
-                         return;
-                    }
-                    showImage(currentIndex);
+                function openModal(pos) {
+                    const index = posToImage[pos];
+                    if (index === undefined || index < 0) return;
+                    showImage(index);
                     document.getElementById('myModal').style.display = 'block';
                     history.pushState(null, null, '#view=' + currentIndex);
                 }
                 
+                function currentItem() { return ITEMS[view[imagePos[currentIndex]]]; }
+
                 function showImage(index) {
-                    if(index < 0) index = modalImages.length - 1;
-                    if(index >= modalImages.length) index = 0;
+                    if (!imagePos.length) return;
+                    if(index < 0) index = imagePos.length - 1;
+                    if(index >= imagePos.length) index = 0;
                     currentIndex = index;
                     
-                    const img = document.getElementById('img01');
-                    img.src = modalImages[currentIndex];
-                    document.getElementById('caption').innerHTML = modalCaptions[currentIndex];
-                    document.getElementById('imageCounter').innerText = (currentIndex + 1) + " / " + modalImages.length;
+                    const it = currentItem();
+                    document.getElementById('img01').src = it[F.FULL];
+                    document.getElementById('caption').textContent = PROJECTS[it[F.P]] + ' - ' + it[F.TYPE];
+                    drawDiffRegions(it[F.REGIONS] || []);
+                    document.getElementById('imageCounter').innerText = (currentIndex + 1) + " / " + imagePos.length;
                     resetZoom();
                     
-                    if(document.getElementById('myModal').style.display === 'block') {
+                    if(isModalOpen()) {
                          history.replaceState(null, null, '#view=' + currentIndex);
                     }
                 }
@@ -346,47 +571,37 @@ class ReportGenerator:
                 
                 function closeModal(updateHistory = true) { 
                     document.getElementById('myModal').style.display = 'none'; 
+                    // 大图翻到了别的页：关闭时卡片列表跟过去
+                    if (imagePos.length) gotoPage(Math.floor(imagePos[currentIndex] / PAGE_SIZE), false);
                     if(updateHistory) {
                         history.pushState(null, null, window.location.pathname + window.location.search);
                     }
                 }
-                
-                function collectModalData() {
-                    modalImages = []; modalUrls = []; modalCaptions = [];
-                    document.querySelectorAll('.result-item').forEach(item => {
-                        if(item.style.display !== 'none') { 
-                            const img = item.querySelector('img');
-                            if(img) {
-                                modalImages.push(img.src);
-                                const onclickAttr = item.querySelector('.img-box').getAttribute('onclick');
-                                const parts = onclickAttr.split("'");
-                                modalUrls.push(parts[3]);
-                                modalCaptions.push(parts[5]);
-                            }
-                        }
-                    });
-                }
-                
-                function filterResults(status) {
-                    document.querySelectorAll('.result-item').forEach(item => {
-                        if(status === 'all' || item.dataset.status === status) item.style.display = 'block';
-                        else item.style.display = 'none';
-                    });
-                    document.querySelectorAll('.filter-btn').forEach(btn => btn.classList.remove('active'));
-                    event.target.classList.add('active');
-                    collectModalData(); // Re-collect after filtering
-                }
 
                 // Zoom & Drag Logic
                 function zoomIn() { scale += 0.2; applyZoom(); }
                 function zoomOut() { if(scale > 0.4) scale -= 0.2; applyZoom(); }
                 function resetZoom() { scale = 1; offsetX = 0; offsetY = 0; applyZoom(); }
-                function applyZoom() { document.getElementById('img01').style.transform = `scale(${scale}) translate(${offsetX}px, ${offsetY}px)`; }
+                function applyZoom() { document.getElementById('imgWrap').style.transform = `scale(${scale}) translate(${offsetX}px, ${offsetY}px)`; }
+                
+                // 视觉对比: 按比例坐标在大图上标出变化区域
+                function drawDiffRegions(regions) {
+                    const layer = document.getElementById('diffLayer');
+                    layer.innerHTML = '';
+                    regions.forEach(([x, y, w, h]) => {
+                        const box = document.createElement('div');
+                        box.className = 'diff-box';
+                        box.style.left = (x * 100) + '%'; box.style.top = (y * 100) + '%';
+                        box.style.width = (w * 100) + '%'; box.style.height = (h * 100) + '%';
+                        layer.appendChild(box);
+                    });
+                }
                 
-                function openCurrentUrl() { window.open(modalUrls[currentIndex], '_blank'); }
+                function openUrlAt(pos) { window.open(ITEMS[view[pos]][F.URL], '_blank'); }
+                function openCurrentUrl() { window.open(currentItem()[F.URL], '_blank'); }
                 function downloadImage() { 
                     const a = document.createElement('a');
-                    a.href = modalImages[currentIndex];
+                    a.href = currentItem()[F.FULL];
                     a.download = '';
                     a.target = '_blank';
                     document.body.appendChild(a);
@@ -396,10 +611,13 @@ class ReportGenerator:
 
                 // Keyboard support
                 document.addEventListener('keydown', e => {
-                    if(document.getElementById('myModal').style.display === 'block') {
+                    if(isModalOpen()) {
                         if(e.key === 'ArrowLeft') changeImage(-1);
                         if(e.key === 'ArrowRight') changeImage(1);
                         if(e.key === 'Escape') closeModal();
+                    } else {
+                        if(e.key === 'PageUp') gotoPage(page - 1);
+                        if(e.key === 'PageDown') gotoPage(page + 1);
                     }
                 });
             </script>
@@ -411,6 +629,833 @@ class ReportGenerator:
         with open(report_path, "w", encoding="utf-8") as f: f.write(html_content)
         return report_path
 
+# ================= 💾 进度日志 (断点续传) =================
+class ProgressJournal:
+    """
+    追加写入的进度日志 (JSONL，每行一条结果)，内存中按 (Project, PageType, URL) 建索引：
+    - 续传时判断是否已完成为 O(1) 查询；同一任务多次写入以最后一条为准
+    - 每条写入立即 flush 给操作系统 (进程崩溃不丢数据)，fsync 按条数/时间批量执行
+    - 打开时截掉崩溃留下的半行记录，文件始终保持可解析
+    """
+    def __init__(self, path, fsync_every=50, fsync_interval=2.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._index = {} # key -> record
+        self._fh = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+
+    @staticmethod
+    def key(record):
+        return (str(record.get('Project')).strip(), str(record.get('PageType')).strip(), str(record.get('URL')).strip())
+
+    def open(self):
+        """加载已有记录并以追加模式打开"""
+        good_offset = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    offset += len(line)
+                    if not line.endswith(b"\n"):
+                        break # 末尾半行：崩溃时未写完
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        good_offset = offset # 中间的损坏行直接跳过
+                        continue
+                    self._index[self.key(record)] = record
+                    good_offset = offset
+            if good_offset < os.path.getsize(self.path):
+                with open(self.path, "r+b") as f:
+                    f.truncate(good_offset)
+        self._fh = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def records(self):
+        """每个任务的最新一条记录"""
+        return list(self._index.values())
+
+    def append(self, record):
+        if not self._fh:
+            return
+        self._fh.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._fh.flush()
+        self._index[self.key(record)] = record
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.time() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._fh and self._unsynced:
+            os.fsync(self._fh.fileno())
+            self._unsynced = 0
+            self._last_sync = time.time()
+
+    def close(self):
+        if self._fh:
+            self.sync()
+            self._fh.close()
+            self._fh = None
+
+# ================= 🧩 浏览器上下文池 =================
+class ContextPool:
+    """
+    浏览器上下文池：按项目租用/归还 BrowserContext，避免每个URL都新建上下文、重复注册路由。
+    - 共享模式: 归还时重置会话 (通过 CDP 清空租用期间访问过的所有源的 Cookie、Web Storage、IndexedDB、
+      Service Worker 与 Cache Storage，再关闭标签页)，路由规则保留，可被任意项目复用；清理失败时直接销毁该上下文
+    - 独占模式 (per_project): 每个项目使用自己的全新上下文，项目内保留会话状态，池满时淘汰其他项目的空闲上下文
+    """
+    def __init__(self, factory, max_size=4, per_project=False):
+        self.factory = factory # async () -> BrowserContext，负责创建上下文并注册路由
+        self.max_size = max(1, int(max_size))
+        self.per_project = per_project
+        self._idle = {} # project -> [context]
+        self._owner = {} # context -> project
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self._origins = weakref.WeakKeyDictionary() # context -> 租用期间访问过的源 (含重定向链与 iframe 文档)
+
+    def _take_idle(self, project):
+        """取一个可直接复用的空闲上下文 (优先同项目)"""
+        same = self._idle.get(project)
+        if same:
+            return same.pop()
+        if not self.per_project:
+            for contexts in self._idle.values():
+                if contexts:
+                    return contexts.pop()
+        return None
+
+    def _take_victim(self):
+        """独占模式下池已满: 取出其他项目的一个空闲上下文用于淘汰"""
+        for contexts in self._idle.values():
+            if contexts:
+                return contexts.pop()
+        return None
+
+    async def acquire(self, project):
+        victim = None
+        async with self._cond:
+            while True:
+                context = self._take_idle(project)
+                if context:
+                    self._owner[context] = project
+                    return context
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if self.per_project:
+                    victim = self._take_victim()
+                    if victim:
+                        self._owner.pop(victim, None)
+                        break
+                await self._cond.wait()
+
+        if victim:
+            try: await victim.close()
+            except: pass
+
+        try:
+            context = await self.factory()
+        except Exception:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._owner[context] = project
+        if not self.per_project:
+            self._track_origins(context)
+        return context
+
+    def _track_origins(self, context):
+        """记录上下文中每个文档请求 (主框架、重定向中间页、iframe) 的源，归还时逐一清理"""
+        origins = self._origins.setdefault(context, set())
+
+        def on_request(request):
+            try:
+                if request.resource_type == "document":
+                    parsed = urlparse(request.url)
+                    if parsed.scheme in ("http", "https") and parsed.netloc:
+                        origins.add(f"{parsed.scheme}://{parsed.netloc}")
+            except Exception:
+                pass
+        context.on("request", on_request)
+
+    async def _reset(self, context):
+        """
+        重置会话状态；路由与上下文本身保留。
+        共享模式下用 CDP Storage.clearDataForOrigin 清空访问过的每个源的全部存储 (不止最终页面的 localStorage)，
+        任一步失败都会抛出异常，由 release() 销毁该上下文，保证下一个项目拿到的是干净的会话
+        """
+        origins = self._origins.get(context)
+        if not self.per_project and origins:
+            page = context.pages[0] if context.pages else await context.new_page()
+            session = await context.new_cdp_session(page)
+            try:
+                for origin in sorted(origins):
+                    await session.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            finally:
+                try: await session.detach()
+                except: pass
+            origins.clear()
+        for page in list(context.pages):
+            await page.close()
+        if not self.per_project:
+            await context.clear_cookies()
+
+    async def release(self, context, discard=False):
+        """归还上下文；出现系统级异常时 discard=True 直接销毁"""
+        if not discard:
+            try:
+                await self._reset(context)
+            except Exception:
+                discard = True
+
+        async with self._cond:
+            project = self._owner.get(context)
+            if discard:
+                self._owner.pop(context, None)
+                self._size -= 1
+            else:
+                self._idle.setdefault(project, []).append(context)
+            self._cond.notify()
+
+        if discard:
+            try: await context.close()
+            except: pass
+
+    async def close(self):
+        """关闭全部空闲上下文 (租出中的上下文随浏览器一起关闭)"""
+        async with self._cond:
+            contexts = [c for group in self._idle.values() for c in group]
+            self._idle.clear()
+            self._size -= len(contexts)
+        for context in contexts:
+            self._owner.pop(context, None)
+            try: await context.close()
+            except: pass
+
+# ================= 🩺 浏览器守护 =================
+class BrowserSupervisor:
+    """
+    浏览器守护：负责启动浏览器并持有上下文池，任务通过 acquire()/release() 租用上下文。
+    - 浏览器断开 (崩溃) 时自动重启，进行中的任务由 capture_task 重新排队 (不消耗重试次数与重试预算)
+    - 每服务 recycle_pages 个页面、浏览器进程树内存超过 memory_limit_mb、或连续 stall_recycle 个任务卡死时，
+      暂停发放上下文，等进行中的页面结束 (排空) 后重启浏览器，回收长时间运行积累的内存
+    """
+    def __init__(self, playwright, launch_args, context_factory, pool_size, per_project=False, log=print,
+                 recycle_pages=0, memory_limit_mb=0, max_restarts=5, stall_recycle=3):
+        self.playwright = playwright
+        self.launch_args = launch_args
+        self.context_factory = context_factory # async (browser) -> BrowserContext
+        self.pool_size = pool_size
+        self.per_project = per_project
+        self.log = log
+        self.recycle_pages = recycle_pages
+        self.memory_limit_mb = memory_limit_mb
+        self.max_restarts = max_restarts
+        self.stall_recycle = stall_recycle
+        self.browser = None
+        self.pool = None
+        self.generation = 0 # 每次启动浏览器 +1，用于识别旧浏览器的上下文
+        self.pages = 0 # 当前浏览器已服务的页面数
+        self.stalls = 0 # 连续卡死的任务数
+        self.restarts = 0 # 崩溃后的重启次数
+        self.crashed = False
+        self.failed = False # 重启次数用尽或无法启动，放弃
+        self.recycle_reason = None # 非空时等待排空后重启
+        self.closing = False
+        self._owner = {} # context -> (generation, pool)
+        self._in_use = {} # generation -> 租出中的上下文数
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        await self._launch()
+        return self
+
+    async def _launch(self):
+        browser = await self.playwright.chromium.launch(**self.launch_args)
+        self.generation += 1
+        generation = self.generation
+        browser.on("disconnected", lambda _: self._on_disconnected(generation))
+        self.browser = browser
+        self.pool = ContextPool(lambda: self.context_factory(browser), max_size=self.pool_size, per_project=self.per_project)
+        self.pages = 0
+        self.stalls = 0
+
+    def _on_disconnected(self, generation):
+        if generation == self.generation and not self.closing:
+            self.crashed = True
+            self.log("💥 浏览器已断开 (崩溃或被终止)，将自动重启，进行中的任务重新排队...")
+
+    def request_recycle(self, reason):
+        """请求排空后重启浏览器"""
+        if self.recycle_reason is None and not self.crashed:
+            self.recycle_reason = reason
+            self.log(f"♻️ {reason}，等待进行中的页面结束后重启浏览器...")
+
+    def is_lost(self, context):
+        """该上下文所属的浏览器已崩溃或已被替换 (任务失败与页面本身无关，应重新排队)"""
+        owner = self._owner.get(context)
+        if owner is None:
+            return self.crashed
+        return owner[0] != self.generation or self.crashed
+
+    async def acquire(self, project):
+        while True:
+            if self.failed:
+                raise PageAborted("浏览器多次崩溃或无法启动，放弃该任务", "browser")
+            if self.crashed or (self.recycle_reason and not self._in_use.get(self.generation)):
+                await self._restart()
+                continue
+            if self.recycle_reason: # 排空中：不再发放新上下文
+                await asyncio.sleep(0.2)
+                continue
+
+            generation, pool = self.generation, self.pool
+            try:
+                context = await pool.acquire(project)
+            except Exception:
+                if generation != self.generation or self.crashed:
+                    continue # 等待期间浏览器崩溃/重启，换新浏览器再来
+                raise
+            if generation != self.generation or self.crashed:
+                await pool.release(context, discard=True)
+                continue
+            self._owner[context] = (generation, pool)
+            self._in_use[generation] = self._in_use.get(generation, 0) + 1
+            self.pages += 1
+            if self.recycle_pages and self.pages >= self.recycle_pages:
+                self.request_recycle(f"当前浏览器已服务 {self.pages} 个页面")
+            return context
+
+    async def release(self, context, discard=False, stalled=False):
+        """归还上下文；stalled=True 表示任务超过硬性截止时间 (丢弃该上下文，连续卡死时重启浏览器)"""
+        generation, pool = self._owner.pop(context, (None, None))
+        if generation is not None:
+            self._in_use[generation] -= 1
+        if stalled:
+            self.stalls += 1
+            discard = True
+            if self.stall_recycle and self.stalls >= self.stall_recycle:
+                self.request_recycle(f"连续 {self.stalls} 个任务卡死")
+        elif generation == self.generation:
+            self.stalls = 0
+        stale = generation != self.generation or self.crashed
+        if pool is not None:
+            # 旧浏览器的上下文直接销毁 (同时唤醒旧池中的等待者，使其换到新浏览器)
+            await pool.release(context, discard=discard or stale)
+
+    async def _restart(self):
+        async with self._lock:
+            if not (self.crashed or self.recycle_reason) or self.failed:
+                return # 已由其他任务完成重启
+            reason = "崩溃" if self.crashed else self.recycle_reason
+            if self.crashed:
+                self.restarts += 1
+                if self.restarts > self.max_restarts:
+                    self.failed = True
+                    self.log(f"❌ 浏览器已崩溃 {self.restarts} 次，超过上限 {self.max_restarts}，剩余任务将直接失败")
+                    return
+            old_browser, old_pool = self.browser, self.pool
+            self.closing = True
+            try: await old_pool.close()
+            except: pass
+            try: await old_browser.close()
+            except: pass
+            self.closing = False
+            try:
+                await self._launch()
+            except Exception as e:
+                self.failed = True
+                self.log(f"❌ 浏览器重启失败: {e}")
+                return
+            self.crashed = False
+            self.recycle_reason = None
+            self.log(f"♻️ 浏览器已重启 ({reason}) | 第 {self.generation} 个实例")
+
+    def browser_rss_mb(self):
+        """浏览器进程树内存 (MB)：本进程下所有 Chromium 进程的 RSS 之和，未安装 psutil 时返回 None"""
+        if psutil is None:
+            return None
+        total = 0
+        try:
+            for proc in psutil.Process().children(recursive=True):
+                try:
+                    name = proc.name().lower()
+                    if "chrom" in name or "headless_shell" in name:
+                        total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            return None
+        return total / 1024 / 1024
+
+    async def watch(self, interval=15):
+        """定期检查浏览器内存，超过上限时请求重启"""
+        if not self.memory_limit_mb or psutil is None:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            rss = await asyncio.get_running_loop().run_in_executor(None, self.browser_rss_mb)
+            if rss and rss > self.memory_limit_mb:
+                self.request_recycle(f"浏览器内存 {rss:.0f} MB 超过上限 {self.memory_limit_mb} MB")
+
+    async def close(self):
+        self.closing = True
+        if self.pool:
+            await self.pool.close()
+        if self.browser:
+            try: await self.browser.close()
+            except: pass
+
+# ================= 🚫 请求拦截 =================
+class RequestFilter:
+    """
+    上下文级请求拦截器：每个上下文只注册一个 "**/*" 路由，按域名后缀 (逐级集合查询) 与资源类型判断是否拦截。
+    每次租用上下文时 reset(project, url)，之后的计数即该次页面加载被拦截的请求数与估算体积
+    """
+    SAMPLE_LIMIT = 500 # 每种资源类型最多采样的响应数
+
+    def __init__(self, block_domains, block_types=(), embed_domains=(), allow=None, size_stats=None):
+        self.block_domains = frozenset(d.lower() for d in block_domains)
+        self.block_types = frozenset(block_types)
+        self.embed_domains = frozenset(d.lower() for d in embed_domains)
+        self.allow = allow or {}
+        self.size_stats = size_stats if size_stats is not None else {} # 资源类型 -> [累计字节, 样本数]，可在上下文间共享
+        self.reset()
+
+    def reset(self, project="", url=""):
+        allowed = [str(a).strip().lower() for a in (self.allow.get(project) or [])]
+        self._allow_domains = frozenset(a for a in allowed if "." in a)
+        self._allow_types = frozenset(a for a in allowed if "." not in a)
+        self._site = host_key(url)
+        self.blocked = 0
+        self.blocked_bytes = 0
+
+    @staticmethod
+    def _matches(host, domains):
+        """host 本身或任一上级域名在集合中 (按标签逐级查询)"""
+        while host:
+            if host in domains:
+                return True
+            dot = host.find(".")
+            if dot < 0:
+                return False
+            host = host[dot + 1:]
+        return False
+
+    def should_block(self, url, resource_type):
+        try:
+            host = (urlparse(url).hostname or "").lower()
+        except ValueError:
+            return False
+        if self._allow_domains and self._matches(host, self._allow_domains):
+            return False
+        if self._matches(host, self.block_domains):
+            return True
+        if resource_type in self.block_types and resource_type not in self._allow_types:
+            return True
+        if self.embed_domains and self._matches(host, self.embed_domains):
+            site = self._site
+            return not (site and (host == site or host.endswith("." + site)))
+        return False
+
+    def estimate(self, resource_type):
+        total, count = self.size_stats.get(resource_type, (0, 0))
+        if count:
+            return total / count
+        return BLOCKED_SIZE_DEFAULT_KB.get(resource_type, 10) * 1024
+
+    async def handle(self, route):
+        request = route.request
+        resource_type = request.resource_type
+        if self.should_block(request.url, resource_type):
+            self.blocked += 1
+            self.blocked_bytes += self.estimate(resource_type)
+            try: await route.abort("blockedbyclient")
+            except: pass
+            return
+        try: await route.continue_()
+        except: pass
+
+    def on_response(self, response):
+        """记录放行响应的 content-length，按资源类型求平均，用于估算被拦截请求的体积"""
+        try:
+            stat = self.size_stats.setdefault(response.request.resource_type, [0, 0])
+            if stat[1] >= self.SAMPLE_LIMIT:
+                return
+            size = int(response.headers.get("content-length") or 0)
+            if size > 0:
+                stat[0] += size
+                stat[1] += 1
+        except: pass
+
+# ================= 🐕 页面看门狗 (早停) 与重试策略 =================
+class PageAborted(Exception):
+    """看门狗中止页面 (可重试，如主文档 5xx)；kind 为失败类别，对应 RETRY_RULES"""
+    def __init__(self, message, kind="transient"):
+        super().__init__(message)
+        self.kind = kind
+
+class DeterministicFailure(PageAborted):
+    """确定性失败 (恶意重定向、主文档 4xx、假验证遮罩)：重试结果不会不同，直接判定失败"""
+    def __init__(self, message, kind="security"):
+        super().__init__(message, kind)
+
+RETRYABLE_HTTP_STATUS = {408, 425, 429} # 4xx 中属于临时性错误、仍值得重试的状态码
+
+# 各类失败的重试规则: 类别 -> (最多重试次数, 首次退避秒数)；实际次数不超过 max_retries，可用 retry_rules 配置覆盖
+RETRY_RULES = {
+    "transient": (3, 2.0), # 连接被拒绝/重置、地址不可达、主文档 5xx/429 等临时错误
+    "dns": (1, 10.0), # 域名解析失败：多半是域名失效，只再试一次
+    "timeout": (1, 5.0), # 超时：再试一次，直接用 domcontentloaded 降级加载
+    "http": (0, 0.0), # 主文档 4xx：确定性失败
+    "security": (0, 0.0), # 恶意重定向 / 假验证遮罩：确定性失败
+    "browser": (0, 0.0), # 浏览器多次崩溃、无法重启
+}
+RETRY_BACKOFF_MAX = 60 # s 单次退避上限
+DNS_ERRORS = ("ERR_NAME_NOT_RESOLVED", "ERR_NAME_RESOLUTION_FAILED") # 仅域名解析失败；ERR_ADDRESS_UNREACHABLE 等连通性错误按 transient 处理
+
+class TaskStalled(PageAborted):
+    """任务超过硬性截止时间 (疑似页面或渲染进程卡死)"""
+    def __init__(self, message):
+        super().__init__(message, "timeout")
+
+async def within_deadline(coro, deadline):
+    """在截止时间 (time.monotonic()) 前完成 coro，否则取消并抛出 TaskStalled"""
+    try:
+        return await asyncio.wait_for(coro, max(0.1, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        raise TaskStalled("任务超过硬性截止时间，疑似页面卡死") from None
+
+def classify_failure(exc):
+    """把一次失败归类为 transient / dns / timeout / http / security"""
+    if isinstance(exc, PageAborted):
+        return exc.kind
+    if isinstance(exc, (PlaywrightTimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    msg = str(exc)
+    if any(code in msg for code in DNS_ERRORS):
+        return "dns"
+    if "ERR_TIMED_OUT" in msg or "Timeout" in msg:
+        return "timeout"
+    return "transient"
+
+def backoff_delay(base, n):
+    """第 n 次 (从 0 开始) 重试前的退避时间：指数增长 + 随机抖动，避免同一站点的重试同时涌回"""
+    return min(RETRY_BACKOFF_MAX, base * 2 ** n * random.uniform(0.5, 1.5))
+
+class RetryBudget:
+    """本轮全局重试预算：大面积故障 (断网、代理失效) 时限制重试总量，避免整轮被重试拖垮"""
+    def __init__(self, limit=None):
+        self.limit = limit # None 为不限
+        self.used = 0
+        self.warned = False # 预算用完的提示只输出一次
+
+    def take(self):
+        if self.limit is not None and self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+    @property
+    def exhausted(self):
+        return self.limit is not None and self.used >= self.limit
+
+def foreign_redirect(initial_domain, url):
+    """跳转到与原站无关的域名 (非同域、非子域) 时返回 "原域名 -> 新域名"，否则返回 None"""
+    current_domain = urlparse(url).netloc
+    if not current_domain or not initial_domain or current_domain == initial_domain:
+        return None
+    if initial_domain.endswith(current_domain) or current_domain.endswith(initial_domain):
+        return None
+    return f"{initial_domain} -> {current_domain}"
+
+class PageWatchdog:
+    """
+    页面看门狗：事件驱动地监听主框架跳转 (framenavigated)、主文档响应与 DOM 变化 (MutationObserver)，
+    出现恶意重定向、主文档 HTTP 4xx/5xx 或假验证遮罩时立即触发，guard() 中正在执行的阶段 (加载/滚动/留存) 随即被取消
+    """
+    def __init__(self, url, dom_grace_s=3):
+        self.initial_domain = urlparse(url).netloc
+        self.dom_grace_ms = int(dom_grace_s * 1000)
+        self.failure = None
+        self.tripped = asyncio.Event()
+        self.page = None
+
+    async def attach(self, page):
+        """在导航前挂到新标签页上"""
+        self.page = page
+        page.on("framenavigated", self._on_navigated)
+        page.on("response", self._on_response)
+        try:
+            await page.expose_binding("__seoWatchdog", self._on_dom)
+            await page.add_init_script(script="(%s)(%d)" % (WATCHDOG_INIT_JS, self.dom_grace_ms))
+        except Exception:
+            pass # DOM 监听不可用时仍保留跳转与响应监听，留存后的探测兜底
+
+    def trip(self, failure):
+        if self.failure is None:
+            self.failure = failure
+            self.tripped.set()
+
+    def _on_navigated(self, frame):
+        if frame.parent_frame is not None:
+            return
+        redirect = foreign_redirect(self.initial_domain, frame.url)
+        if redirect:
+            self.trip(DeterministicFailure(f"检测到恶意重定向: {redirect}"))
+
+    def _on_response(self, response):
+        try:
+            request = response.request
+            if request.resource_type != "document" or request.frame.parent_frame is not None or not request.is_navigation_request():
+                return
+            status = response.status
+            challenge = "cf-mitigated" in response.headers
+        except Exception:
+            return
+        if challenge:
+            return # 反爬验证页 (如 Cloudflare "Just a moment...")：由脚本自行跳转，能否通过交给 DOM 监听与留存后的探测判断
+        if status >= 400:
+            msg = f"主文档 HTTP {status}: {response.url}"
+            retryable = status >= 500 or status == 403 or status in RETRYABLE_HTTP_STATUS # 403 也常是 WAF 验证，可重试
+            self.trip(PageAborted(msg) if retryable else DeterministicFailure(msg, "http"))
+
+    def _on_dom(self, source, reason):
+        self.trip(DeterministicFailure(f"页面探伤异常: {reason}"))
+
+    async def guard(self, coro):
+        """执行一个阶段；看门狗先触发时取消该阶段并抛出对应异常"""
+        task = asyncio.ensure_future(coro)
+        trip = asyncio.ensure_future(self.tripped.wait())
+        try:
+            await asyncio.wait({task, trip}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            trip.cancel()
+        if self.failure is not None:
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True) # 阶段本身因中止产生的异常 (如导航被打断) 以看门狗原因为准
+            raise self.failure
+        return task.result()
+
+# ================= 🖼️ 截图编码 =================
+def encode_screenshot(data, fmt, quality, thumb_width):
+    """
+    在编码进程中执行 (CPU 密集，避开事件循环与 GIL)：
+    按需把 PNG 原始截图转码为 WebP，并生成报告用缩略图。
+    返回 (主图字节, 主图扩展名, 缩略图字节或 None)
+    """
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    ext = "png" if fmt == "png" else "jpg"
+
+    if fmt == "webp":
+        buf = io.BytesIO()
+        if max(img.size) <= WEBP_MAX_DIMENSION:
+            img.save(buf, format="WEBP", quality=quality, method=4)
+            ext = "webp"
+        else:
+            img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True)
+        data = buf.getvalue()
+
+    thumb = None
+    if thumb_width:
+        w, h = img.size
+        # 只保留页面顶部区域 (卡片只展示首屏)，宽高比 4:5
+        crop_h = max(1, min(h, int(w * 1.25)))
+        t = img.crop((0, 0, w, crop_h)).convert("RGB")
+        t = t.resize((thumb_width, max(1, int(crop_h * thumb_width / max(1, w)))), Image.LANCZOS)
+        buf = io.BytesIO()
+        t.save(buf, format="JPEG", quality=70, optimize=True)
+        thumb = buf.getvalue()
+
+    return data, ext, thumb
+
+def screenshot_stem(page_type):
+    """截图文件名 (不含扩展名)：去除页面类型中的非法字符"""
+    return "".join([c for c in str(page_type).strip() if c.isalnum() or c in (' ', '-', '_')]).strip()
+
+def write_file_atomic(path, data):
+    """先写临时文件再替换，避免中途崩溃留下半张图"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# ================= 📜 页内脚本 =================
+
+# 自适应滚动：一次 page.evaluate 内完成 "分屏滚动 + 强制懒加载 + 等待稳定"
+# - MutationObserver 记录最后一次 DOM 变化时间
+# - IntersectionObserver 记录进入过视口的图片/iframe，统计其中尚未加载完成的数量
+# - 到达底部后等待 DOM 静默且无待加载资源即返回；页面继续长高(无限滚动)则继续向下
+ADAPTIVE_SCROLL_JS = """
+async ({ maxMs, quietMs, stepDelay, maxSteps }) => {
+    const t0 = performance.now();
+    const now = () => performance.now();
+    const sleep = ms => new Promise(r => setTimeout(r, ms));
+    const height = () => Math.max(
+        document.body ? document.body.scrollHeight : 0,
+        document.documentElement ? document.documentElement.scrollHeight : 0
+    );
+
+    let lastMutation = now();
+    const mo = new MutationObserver(() => { lastMutation = now(); });
+    mo.observe(document.documentElement, { childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'srcset'] });
+
+    const seen = new Set();
+    const loadedFrames = new WeakSet();
+    const io = new IntersectionObserver(entries => {
+        for (const e of entries) {
+            if (!e.isIntersecting || seen.has(e.target)) continue;
+            seen.add(e.target);
+            if (e.target.tagName === 'IFRAME') {
+                e.target.addEventListener('load', () => loadedFrames.add(e.target), { once: true });
+            }
+        }
+    }, { rootMargin: '200px 0px' });
+
+    const observed = new WeakSet();
+    const prepare = () => {
+        document.querySelectorAll('img, iframe').forEach(el => {
+            if (el.loading === 'lazy') el.loading = 'eager';
+            const lazySrc = el.dataset ? (el.dataset.src || el.dataset.lazySrc || el.dataset.original) : null;
+            const cur = el.getAttribute('src') || '';
+            if (lazySrc && (!cur || cur.startsWith('data:'))) el.setAttribute('src', lazySrc);
+            if (el.dataset && el.dataset.srcset && !el.getAttribute('srcset')) el.setAttribute('srcset', el.dataset.srcset);
+            if (!observed.has(el)) { observed.add(el); io.observe(el); }
+        });
+    };
+    const pending = () => {
+        let n = 0;
+        for (const el of seen) {
+            if (!el.isConnected) continue;
+            if (el.tagName === 'IMG' ? (el.currentSrc && !el.complete) : !loadedFrames.has(el)) n++;
+        }
+        return n;
+    };
+    const waitQuiet = async deadline => {
+        while (now() < deadline) {
+            await sleep(100);
+            if (now() - lastMutation >= quietMs && pending() === 0) return true;
+        }
+        return false;
+    };
+
+    const deadline = t0 + maxMs;
+    const vh = window.innerHeight || 1080;
+    let y = 0, steps = 0, settled = false;
+    while (now() < deadline && steps < maxSteps) {
+        prepare();
+        y = Math.min(y + vh, height());
+        window.scrollTo(0, y);
+        steps++;
+        await sleep(stepDelay);
+        if (y + vh < height()) continue;
+
+        // 已到底部：等待 DOM 与资源加载稳定；高度仍在增长说明是无限滚动/追加加载
+        const before = height();
+        settled = await waitQuiet(deadline);
+        if (height() > before) continue;
+        break;
+    }
+
+    window.scrollTo(0, 0);
+    prepare();
+    settled = await waitQuiet(Math.min(deadline, now() + 2000)) && settled;
+    mo.disconnect();
+    io.disconnect();
+    return { steps, height: height(), pending: pending(), settled, elapsedMs: Math.round(now() - t0) };
+}
+"""
+
+# Navigation Timing (ms，相对导航开始)：TTFB = 首字节，DCL = DOMContentLoaded 结束，Load = load 事件结束 (尚未触发为 null)
+NAV_TIMING_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) return null;
+    const ms = v => v > 0 ? Math.round(v) : null;
+    return { ttfb: ms(nav.responseStart), dcl: ms(nav.domContentLoadedEventEnd), load: ms(nav.loadEventEnd) };
+}"""
+
+# 页面内容指纹：标题 + 页面尺寸 + 可见文本 + 图片地址，两组 FNV-1a 拼成 64 位十六进制 (不依赖 crypto.subtle，http 页面同样可用)
+CONTENT_HASH_JS = """() => {
+    const imgs = Array.from(document.images, img => img.currentSrc || img.src).join('\\n');
+    const size = document.documentElement.scrollWidth + 'x' + document.documentElement.scrollHeight;
+    const text = document.title + '\\n' + size + '\\n' + (document.body ? document.body.innerText : '').replace(/\\s+/g, ' ') + '\\n' + imgs;
+    let h1 = 0x811c9dc5, h2 = 0x01000193 ^ text.length;
+    for (let i = 0; i < text.length; i++) {
+        const c = text.charCodeAt(i);
+        h1 = Math.imul(h1 ^ c, 0x01000193);
+        h2 = Math.imul(h2 ^ c, 0x5bd1e995);
+    }
+    return (h1 >>> 0).toString(16).padStart(8, '0') + (h2 >>> 0).toString(16).padStart(8, '0');
+}"""
+
+# 异常 DOM 探测：假验证文本 / 覆盖真实内容的全屏 iframe，返回原因或 null
+SUSPICIOUS_DOM_JS = """() => {
+    // 检查特征文本
+    const text = document.body.innerText.toLowerCase();
+    const keywords = ["verify you are human", "checking your browser", "just a moment..."];
+    if (keywords.some(k => text.includes(k))) return "发现假验证文本特征";
+    
+    // 检查异常全屏 iframe (可能覆盖真实内容)
+    const iframes = document.querySelectorAll('iframe');
+    for (let frame of iframes) {
+        const rect = frame.getBoundingClientRect();
+        const vw = window.innerWidth;
+        const vh = window.innerHeight;
+        if (rect.width > vw * 0.8 && rect.height > vh * 0.8) {
+            return "发现异常全屏Iframe拦截";
+        }
+    }
+    return null;
+}"""
+
+# 看门狗页内脚本 (每个文档加载前注入)：MutationObserver 节流检查异常 DOM，
+# 异常持续 graceMs 以上 (真实验证页通常会自动跳转) 才通过 __seoWatchdog 通知 Python 端
+WATCHDOG_INIT_JS = """graceMs => {
+    if (window.top !== window) return;
+    const check = """ + SUSPICIOUS_DOM_JS + """;
+    let timer = null, since = 0, reported = false;
+    const run = () => {
+        timer = null;
+        if (reported || !document.body) return;
+        let reason = null;
+        try { reason = check(); } catch (e) {}
+        if (!reason) { since = 0; return; }
+        if (!since) since = Date.now();
+        if (Date.now() - since >= graceMs) {
+            reported = true;
+            try { window.__seoWatchdog(reason); } catch (e) {}
+        } else {
+            timer = setTimeout(run, graceMs - (Date.now() - since)); // 持续时间未到：到点再复查一次
+        }
+    };
+    const schedule = () => { if (!timer) timer = setTimeout(run, 500); };
+    const start = () => {
+        new MutationObserver(schedule).observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+        schedule();
+    };
+    if (document.documentElement) start(); else document.addEventListener('DOMContentLoaded', start);
+}"""
+
+# 结果中的分阶段耗时列 (秒)：上下文/标签页准备、导航、滚动、留存、页面探测、截图
+STAGE_FIELDS = ["ContextTime_s", "NavTime_s", "ScrollTime_s", "RetentionTime_s", "ProbeTime_s", "ScreenshotTime_s"]
+NAV_TIMING_FIELDS = ["TTFB_ms", "DCL_ms", "Load_ms"]
+
 # ================= 🕸️ 核心采集逻辑 =================
 class WebsiteInspector:
     def __init__(self, config: InspectionConfig, log_callback=None):
@@ -418,27 +1463,160 @@ class WebsiteInspector:
         self.log_callback = log_callback or print
         self.paused = False # 暂停控制标志
         self.autosave_file = None # 自动保存文件路径
+        self.journal = None # 进度日志 (ProgressJournal)
+        self.result_callback = None # 分片子进程中用于把结果回传主进程
+        self.dwell_slots = None # 留存阶段的并发控制 (在事件循环内创建)
+        self.encoder_pool = None # webp/缩略图编码进程池
+        self.io_pool = None # 截图写盘线程池
+        self.request_filters = weakref.WeakKeyDictionary() # context -> RequestFilter
+        self.response_sizes = {} # 各资源类型的响应体积样本 (所有上下文共享)
+        self.url_history = None # URL 历史 (UrlHistory)，调度模式与跳过未变化截图时加载
+        self.blobs = blob_store.BlobStore(config.output_root) if config.blob_store else None # 内容寻址截图存储
+        self.retry_budget = RetryBudget() # 全局重试预算 (每批任务开始时按任务数重建)
 
     def init_autosave(self):
-        """初始化自动保存文件"""
+        """初始化自动保存文件 (进度日志)"""
         try:
             today = datetime.now().strftime("%Y-%m-%d")
             save_dir = os.path.join(self.cfg.output_root, today)
             os.makedirs(save_dir, exist_ok=True)
-            self.autosave_file = os.path.join(save_dir, "_autosave_progress.csv")
+            self.autosave_file = os.path.join(save_dir, AUTOSAVE_FILENAME)
+            self.journal = ProgressJournal(self.autosave_file).open()
             
-            # 如果文件不存在，写入表头
-            if not os.path.exists(self.autosave_file):
-                pd.DataFrame(columns=["Project", "PageType", "URL", "Status", "LoadTime_s", "ScreenshotPath", "ErrorMessage"]).to_csv(self.autosave_file, index=False, encoding='utf-8-sig')
+            # 兼容旧版 CSV 进度文件：首次升级时导入
+            legacy_csv = os.path.join(save_dir, "_autosave_progress.csv")
+            if not len(self.journal) and os.path.exists(legacy_csv):
+                import pandas as pd
+                for record in pd.read_csv(legacy_csv, dtype=str).fillna("").to_dict('records'):
+                    self.journal.append(record)
+                os.rename(legacy_csv, legacy_csv + ".imported")
         except Exception as e:
             self.log(f"⚠️ 无法初始化自动保存: {e}")
 
+    def close_autosave(self):
+        if self.journal is not None:
+            try: self.journal.close()
+            except: pass
+            self.journal = None
+
     def append_to_autosave(self, result):
-        """追加单条结果到CSV"""
-        if not self.autosave_file: return
+        """追加单条结果到进度日志"""
+        if self.journal is None: return # 空日志的 len() 为 0，不能用真值判断
         try:
-            pd.DataFrame([result]).to_csv(self.autosave_file, mode='a', header=False, index=False, encoding='utf-8-sig')
-        except: pass
+            self.journal.append(result)
+        except Exception as e:
+            self.log(f"⚠️ 写入进度失败: {e}")
+
+    def start_encoders(self):
+        """按配置启动编码进程池与写盘线程池；缺少 Pillow 时降级"""
+        fmt = self.cfg.screenshot_format
+        if Image is None and (fmt == "webp" or self.cfg.thumbnail_width):
+            if fmt == "webp":
+                self.cfg.screenshot_format = "jpeg"
+                self.log("⚠️ 未安装 Pillow，WebP 不可用，已改用 JPEG")
+            if self.cfg.thumbnail_width:
+                self.cfg.thumbnail_width = 0
+                self.log("⚠️ 未安装 Pillow，跳过缩略图生成")
+        if self.cfg.screenshot_format == "webp" or self.cfg.thumbnail_width:
+            self.encoder_pool = ProcessPoolExecutor(
+                max_workers=max(1, self.cfg.encoder_workers),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        self.io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="screenshot-io")
+
+    def stop_encoders(self):
+        for executor in (self.encoder_pool, self.io_pool):
+            if executor:
+                executor.shutdown(wait=True)
+        self.encoder_pool = self.io_pool = None
+
+    async def save_screenshot(self, page, save_base):
+        """
+        截图并落盘：PNG/JPEG 由浏览器直接编码，WebP 与缩略图交给编码进程池，
+        文件写入放到线程池，磁盘 I/O 不阻塞事件循环。返回 (主图路径, 缩略图路径)
+        """
+        fmt = self.cfg.screenshot_format
+        options = {"full_page": True, "type": "jpeg" if fmt == "jpeg" else "png"}
+        if fmt == "jpeg":
+            options["quality"] = self.cfg.screenshot_quality
+        data = await page.screenshot(**options)
+
+        loop = asyncio.get_running_loop()
+        ext, thumb = ("jpg" if fmt == "jpeg" else "png"), None
+        if self.encoder_pool:
+            data, ext, thumb = await loop.run_in_executor(
+                self.encoder_pool, encode_screenshot,
+                data, fmt, self.cfg.screenshot_quality, self.cfg.thumbnail_width
+            )
+
+        if self.blobs:
+            save_path = await loop.run_in_executor(self.io_pool, self.blobs.put, data, ext)
+            thumb_path = await loop.run_in_executor(self.io_pool, self.blobs.put, thumb, "jpg") if thumb else ""
+            return save_path, thumb_path
+
+        save_path = f"{save_base}.{ext}"
+        thumb_path = f"{save_base}.thumb.jpg" if thumb else ""
+        await loop.run_in_executor(self.io_pool, write_file_atomic, save_path, data)
+        if thumb:
+            await loop.run_in_executor(self.io_pool, write_file_atomic, thumb_path, thumb)
+        return save_path, thumb_path
+
+    def task_deadline(self):
+        """单次尝试的硬性截止时长 (秒)：自动值 = 页面超时 + 极速模式重试 + 滚动上限 + 留存 + 余量"""
+        if self.cfg.task_deadline_s > 0:
+            return self.cfg.task_deadline_s
+        return self.cfg.page_timeout / 1000 + 30 + self.cfg.scroll_max_time + self.cfg.retention_time + 60
+
+    def dom_grace(self):
+        """看门狗判定假验证遮罩的宽限秒数：不超过留存时间 (否则早停比原先留存结束后再探测还慢)"""
+        if self.cfg.retention_time > 0:
+            return min(self.cfg.abort_dom_grace_s, self.cfg.retention_time)
+        return self.cfg.abort_dom_grace_s
+
+    def retry_delay(self, kind, retries):
+        """
+        按失败类别决定是否重试：返回退避秒数，不再重试时返回 None。
+        retries 为该任务各类别已重试次数 (会被更新)；每次重试消耗一次全局重试预算
+        """
+        limit, base = self.cfg.retry_rules.get(kind) or RETRY_RULES.get(kind, RETRY_RULES["transient"])
+        n = retries.get(kind, 0)
+        if n >= min(limit, self.cfg.max_retries) or sum(retries.values()) >= self.cfg.max_retries:
+            return None
+        if not self.retry_budget.take():
+            if not self.retry_budget.warned:
+                self.retry_budget.warned = True
+                self.log(f"⚠️ 本轮重试预算 ({self.retry_budget.limit} 次) 已用完，后续失败不再重试")
+            return None
+        retries[kind] = n + 1
+        return backoff_delay(base, n)
+
+    def reusable_screenshot(self, res):
+        """skip_unchanged: 内容指纹与上次截图时一致、未超过 reuse_max_days 且旧文件仍在时返回 (主图, 缩略图)，否则 None"""
+        if not self.cfg.skip_unchanged or self.url_history is None or not res.get("ContentHash"):
+            return None
+        entry = self.url_history.get(history_key(res["Project"], res["PageType"], res["URL"])) or {}
+        if entry.get("ShotHash") != res["ContentHash"]:
+            return None
+        if time.time() - entry.get("ShotAt", 0) > self.cfg.reuse_max_days * 86400:
+            return None
+        path, thumb = entry.get("ScreenshotPath"), entry.get("ThumbPath") or ""
+        if not path or not os.path.exists(path):
+            return None
+        if self.blobs and self.blobs.owns(path):
+            # 沿用的截图在写入今天的清单前可能被并发的 gc 回收：刷新修改时间使其处于保护期
+            if not self.blobs.touch(path):
+                return None
+            if thumb and self.blobs.owns(thumb) and not self.blobs.touch(thumb):
+                thumb = ""
+        return path, thumb if thumb and os.path.exists(thumb) else ""
+
+    async def navigation_timing(self, page):
+        """读取 Navigation Timing 指标 (TTFB / DCL / Load，单位 ms)，取不到时为 None"""
+        try:
+            timing = await page.evaluate(NAV_TIMING_JS) or {}
+        except Exception:
+            timing = {}
+        return {"TTFB_ms": timing.get("ttfb"), "DCL_ms": timing.get("dcl"), "Load_ms": timing.get("load")}
 
     def log(self, message):
         if self.log_callback:
@@ -476,7 +1654,30 @@ class WebsiteInspector:
             await asyncio.sleep(random.uniform(0.5, 2.0))
 
     async def enhanced_scroll_and_wait(self, page):
-        """深度优化的滚动策略"""
+        """滚动触发懒加载，按配置选择策略，返回滚动阶段耗时(秒)，用于对比不同策略"""
+        start_t = time.time()
+        if self.cfg.scroll_strategy == "legacy":
+            await self.legacy_scroll_and_wait(page)
+        else:
+            await self.adaptive_scroll_and_wait(page)
+        return round(time.time() - start_t, 2)
+
+    async def adaptive_scroll_and_wait(self, page):
+        """自适应滚动：页内探测懒加载，DOM 与图片加载稳定后立即返回，不再固定休眠"""
+        try:
+            stats = await page.evaluate(ADAPTIVE_SCROLL_JS, {
+                "maxMs": int(self.cfg.scroll_max_time * 1000),
+                "quietMs": 500,
+                "stepDelay": 100,
+                "maxSteps": 60
+            })
+            if not stats.get("settled"):
+                self.log(f"   [滚动] 未完全稳定 ({stats.get('elapsedMs')}ms, 待加载资源 {stats.get('pending')})")
+        except Exception as e:
+            self.log(f"   [滚动微扰] {str(e)[:50]}")
+
+    async def legacy_scroll_and_wait(self, page):
+        """深度优化的滚动策略 (原固定等待版本)"""
         try:
             last_height = await page.evaluate("document.body.scrollHeight")
             
@@ -535,186 +1736,301 @@ class WebsiteInspector:
         except Exception as e:
             self.log(f"   [滚动微扰] {str(e)[:50]}")
 
-    async def capture_task(self, browser, row, semaphore, results_list):
-        if STOP_REQUESTED: return 
-        async with semaphore:
-            project = str(row['Project']).strip()
-            page_type = str(row['PageType']).strip()
-            url = str(row['URL']).strip()
-            
-            res = {"Project": project, "PageType": page_type, "URL": url, "Status": "Pending", "LoadTime_s": 0.0, "ScreenshotPath": ""}
-            
-            # 创建日期目录
-            today = datetime.now().strftime("%Y-%m-%d")
-            save_dir = os.path.join(self.cfg.output_root, today, project)
-            os.makedirs(save_dir, exist_ok=True)
-            
-            # 文件名处理：去除非法字符
-            safe_name = "".join([c for c in page_type if c.isalnum() or c in (' ', '-', '_')]).strip()
-            save_path = os.path.join(save_dir, f"{safe_name}.png")
-            
-            context = None
-            try:
-                # 随机User-Agent (简单的两个现代UA轮换，避免太复杂)
-                ua_list = [
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-                ]
-                ua = ua_list[int(time.time()) % 2]
-                
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent=ua,
-                    ignore_https_errors=True,
-                    device_scale_factor=1
-                )
-                
-                page = await context.new_page()
+    async def new_context(self, browser):
+        """创建浏览器上下文并在上下文级别注册拦截路由 (由上下文池调用，每个上下文只执行一次)"""
+        # 随机User-Agent (简单的两个现代UA轮换，避免太复杂)
+        ua_list = [
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+        ]
+        ua = ua_list[int(time.time()) % 2]
 
-                # 屏蔽请求
-                for d in BLOCK_DOMAINS:
-                    try: await page.route(f"**/*{d}*", lambda r: r.abort())
-                    except: pass
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=ua,
+            ignore_https_errors=True,
+            device_scale_factor=1
+        )
 
-                # 重试循环
-                for attempt in range(self.cfg.max_retries + 1):
-                    if STOP_REQUESTED: break
-                    while self.paused: await asyncio.sleep(0.5)
-                    try:
+        # 屏蔽请求：单个路由 + 域名后缀集合查询 (替代每个域名一条 glob 规则)
+        request_filter = RequestFilter(
+            BLOCK_DOMAINS,
+            block_types=self.cfg.block_resource_types,
+            embed_domains=VIDEO_EMBED_DOMAINS if self.cfg.block_video_embeds else (),
+            allow=self.cfg.block_allow,
+            size_stats=self.response_sizes
+        )
+        try:
+            await context.route("**/*", request_filter.handle)
+            context.on("response", request_filter.on_response)
+            self.request_filters[context] = request_filter
+        except: pass
+        return context
+
+    async def load_page(self, page, url, res, project, page_type, fast=False):
+        """加载阶段：打开页面并滚动触发懒加载 (占用加载并发槽)；fast=True 时 (上次超时) 直接用 domcontentloaded"""
+        wait_policy = "networkidle" if self.cfg.strict_load_mode and not fast else "domcontentloaded"
+        
+        nav_t = time.time()
+        try:
+            await page.goto(url, timeout=self.cfg.page_timeout, wait_until=wait_policy)
+            res["WaitPolicy"] = wait_policy
+        except PlaywrightTimeoutError:
+            self.log(f"   [⚠️ 超时] {project} - {page_type} (切换极速模式)")
+            await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+            res["WaitPolicy"] = f"{wait_policy}->domcontentloaded"
+        res["NavTime_s"] = round(time.time() - nav_t, 2) # 含超时后切换极速模式的重试
+
+        res["ScrollTime_s"] = await self.enhanced_scroll_and_wait(page)
+
+    async def dwell_and_capture(self, page, url, res, save_base, project, start_t):
+        """留存阶段：模拟用户停留、检测延迟攻击，最后截图"""
+        # --- 新增: 延迟留存与异常检测 ---
+        initial_domain = urlparse(url).netloc
+        
+        if self.cfg.retention_time > 0:
+            self.log(f"   [留存等待] {project} - 等待 {self.cfg.retention_time}s 以检测延迟攻击...")
+            stage_t = time.time()
+            await self.simulate_human_and_wait(page, self.cfg.retention_time)
+            res["RetentionTime_s"] = round(time.time() - stage_t, 2)
+        
+        probe_t = time.time()
+        res.update(await self.navigation_timing(page))
+        try:
+            res["ContentHash"] = await page.evaluate(CONTENT_HASH_JS)
+        except Exception:
+            pass
+
+        # 检测重定向 (看门狗已在跳转发生时中止，这里兜底关闭早停或事件遗漏的情况)
+        redirect = foreign_redirect(initial_domain, page.url)
+        if redirect:
+            res["ProbeTime_s"] = round(time.time() - probe_t, 2)
+            raise DeterministicFailure(f"检测到恶意重定向: {redirect}")
+        
+        # 检测异常 DOM
+        suspicious_detected = await page.evaluate(SUSPICIOUS_DOM_JS)
+        res["ProbeTime_s"] = round(time.time() - probe_t, 2)
+        if suspicious_detected:
+            raise DeterministicFailure(f"页面探伤异常: {suspicious_detected}")
+        # ----------------------------------
+        
+        res["LoadTime_s"] = round(time.time() - start_t, 2)
+        reused = self.reusable_screenshot(res)
+        if reused:
+            # 内容未变化：不截图、不编码，报告指向上次的截图
+            res["ScreenshotPath"], res["ThumbPath"] = reused
+            res["Reused"] = True
+            self.log(f"   [♻️ 内容未变化] {project} - 沿用上次截图")
+            return
+        shot_t = time.time()
+        res["ScreenshotPath"], res["ThumbPath"] = await self.save_screenshot(page, save_base)
+        res["ScreenshotTime_s"] = round(time.time() - shot_t, 2) # 含编码与写盘
+
+    async def capture_task(self, supervisor, row, scheduler, results_list):
+        if STOP_REQUESTED: return 
+        project = str(row['Project']).strip()
+        page_type = str(row['PageType']).strip()
+        url = str(row['URL']).strip()
+        host = host_key(url)
+        
+        res = {"Project": project, "PageType": page_type, "URL": url, "Status": "Pending", "LoadTime_s": 0.0, "ScreenshotPath": "", "ThumbPath": "", "BlockedRequests": 0, "BlockedKB_est": 0.0}
+        res.update({k: 0.0 for k in STAGE_FIELDS})
+        res.update({k: None for k in NAV_TIMING_FIELDS})
+        res["WaitPolicy"] = ""
+        res["ContentHash"] = ""
+        res["Reused"] = False
+        res["AbortedEarly"] = False
+        res["Attempts"] = 0
+        res["FailureClass"] = ""
+        
+        # 创建日期目录
+        today = datetime.now().strftime("%Y-%m-%d")
+        save_dir = os.path.join(self.cfg.output_root, today, project)
+        os.makedirs(save_dir, exist_ok=True)
+        
+        save_base = os.path.join(save_dir, screenshot_stem(page_type)) # 扩展名由截图格式决定
+        
+        try:
+            # 重试循环：失败先归还上下文与并发槽，按类别退避后重新排队 (退避期间不占用任何名额)
+            retries = {} # 各失败类别已重试次数
+            fast_load = False # 超时后降级：下次尝试直接用 domcontentloaded
+            requeues = 0 # 因浏览器崩溃/重启而免费重新排队的次数
+            while not STOP_REQUESTED:
+                while self.paused: await asyncio.sleep(0.5)
+                res["Attempts"] += 1
+                context = None
+                delay = None
+                stalled = False
+                # 看门狗：恶意跳转/主文档错误/假验证遮罩出现时立即中止当前阶段
+                watchdog = PageWatchdog(url, self.dom_grace()) if self.cfg.early_abort else None
+                guard = watchdog.guard if watchdog else (lambda coro: coro)
+                try:
+                    # 加载阶段：占用站点/全局并发槽
+                    async with scheduler.slot(host):
+                        if STOP_REQUESTED: break
+                        # 从上下文池租用 (已注册屏蔽路由)，每次尝试只需开关一个标签页
+                        stage_t = time.time()
+                        context = await supervisor.acquire(project)
+                        deadline = time.monotonic() + self.task_deadline() # 硬性截止时间，防止卡死的页面一直占着名额
+                        request_filter = self.request_filters.get(context)
+                        if request_filter: request_filter.reset(project, url)
+                        page = await context.new_page()
+                        if watchdog: await watchdog.attach(page)
+                        res["ContextTime_s"] = round(time.time() - stage_t, 2)
                         start_t = time.time()
-                        wait_policy = "networkidle" if self.cfg.strict_load_mode else "domcontentloaded"
-                        
-                        try:
-                            await page.goto(url, timeout=self.cfg.page_timeout, wait_until=wait_policy)
-                        except PlaywrightTimeoutError:
-                            self.log(f"   [⚠️ 超时] {project} - {page_type} (切换极速模式)")
-                            await page.goto(url, timeout=30000, wait_until="domcontentloaded")
-
-                        await self.enhanced_scroll_and_wait(page)
-                        
-                        # --- 新增: 延迟留存与异常检测 ---
-                        initial_domain = urlparse(url).netloc
-                        
-                        if self.cfg.retention_time > 0:
-                            self.log(f"   [留存等待] {project} - 等待 {self.cfg.retention_time}s 以检测延迟攻击...")
-                            await self.simulate_human_and_wait(page, self.cfg.retention_time)
-                        
-                        # 检测重定向
-                        current_url = page.url
-                        current_domain = urlparse(current_url).netloc
-                        if current_domain and initial_domain and current_domain != initial_domain:
-                            # 简单的判断逻辑，如果完全不包含（比如跨域且不是子域名）
-                            if not (initial_domain.endswith(current_domain) or current_domain.endswith(initial_domain)):
-                                raise Exception(f"检测到恶意重定向: {initial_domain} -> {current_domain}")
-                        
-                        # 检测异常 DOM
-                        suspicious_detected = await page.evaluate('''() => {
-                            // 检查特征文本
-                            const text = document.body.innerText.toLowerCase();
-                            const keywords = ["verify you are human", "checking your browser", "just a moment..."];
-                            if (keywords.some(k => text.includes(k))) return "发现假验证文本特征";
-                            
-                            // 检查异常全屏 iframe (可能覆盖真实内容)
-                            const iframes = document.querySelectorAll('iframe');
-                            for (let frame of iframes) {
-                                const rect = frame.getBoundingClientRect();
-                                const vw = window.innerWidth;
-                                const vh = window.innerHeight;
-                                if (rect.width > vw * 0.8 && rect.height > vh * 0.8) {
-                                    return "发现异常全屏Iframe拦截";
-                                }
-                            }
-                            return null;
-                        }''')
-                        if suspicious_detected:
-                            raise Exception(f"页面探伤异常: {suspicious_detected}")
-                        # ----------------------------------
-                        
-                        res["LoadTime_s"] = round(time.time() - start_t, 2)
-                        await page.screenshot(path=save_path, full_page=True, type='png')
-                        
-                        res["Status"] = "Success"
-                        res["ScreenshotPath"] = save_path
-                        self.log(f"[✅ 成功] {project} - {page_type}")
-                        break
-                    except Exception as e:
-                        err = str(e).splitlines()[0][:100]
-                        if attempt == self.cfg.max_retries:
-                            res["Status"] = "Failed"
-                            res["ErrorMessage"] = err
-                            self.log(f"[❌ 失败] {project} - {page_type}: {err}")
-                            # 记录错误日志
-                            with open(os.path.join(save_dir, "error_log.txt"), "a", encoding='utf-8') as f:
-                                f.write(f"[{datetime.now()}] {url}\nError: {e}\n\n")
-                        else:
-                            self.log(f"   [重试 {attempt+1}] {project} - {page_type}")
-                            await asyncio.sleep(2)
-            
-            except Exception as e:
-                self.log(f"[💥 系统错误] {project}: {e}")
-            finally:
-                if context:
-                    try: await context.close()
-                    except: pass
-            
-            results_list.append(res)
-            self.append_to_autosave(res) # 实时保存
+                        await within_deadline(guard(self.load_page(page, url, res, project, page_type, fast=fast_load)), deadline)
+                        if not self.cfg.overlap_retention:
+                            await within_deadline(guard(self.dwell_and_capture(page, url, res, save_base, project, start_t)), deadline)
 
-    async def run(self):
-        self.log(f"🚀 开始任务 | 并发数: {self.cfg.concurrent_tasks} | 代理: {self.cfg.proxy_server or '无'}")
+                    # 留存阶段：释放加载槽，改由留存页面上限控制，不阻塞其他页面加载
+                    if self.cfg.overlap_retention:
+                        wait_t = time.monotonic()
+                        async with self.dwell_slots:
+                            deadline += time.monotonic() - wait_t # 排队等待留存名额的时间不计入
+                            await within_deadline(guard(self.dwell_and_capture(page, url, res, save_base, project, start_t)), deadline)
+                    
+                    res["Status"] = "Success"
+                    self.log(f"[✅ 成功] {project} - {page_type}")
+                    break
+                except Exception as e:
+                    err = str(e).splitlines()[0][:100]
+                    stalled = isinstance(e, TaskStalled)
+                    lost = not supervisor.failed and (supervisor.is_lost(context) if context else supervisor.crashed)
+                    if lost and requeues < 2: # 同一任务反复遇到崩溃时可能是它自己搞崩了浏览器，之后按普通失败处理
+                        # 浏览器崩溃/被重启导致的失败与页面无关：直接重新排队，不消耗重试次数与重试预算
+                        requeues += 1
+                        self.log(f"   [🔁 重新排队] {project} - {page_type} (浏览器已重启)")
+                        continue
+                    kind = classify_failure(e)
+                    res["FailureClass"] = kind
+                    delay = self.retry_delay(kind, retries)
+                    if delay is None:
+                        res["Status"] = "Failed"
+                        res["ErrorMessage"] = err
+                        if watchdog and e is watchdog.failure:
+                            res["AbortedEarly"] = True
+                        self.log(f"[❌ 失败] {project} - {page_type} ({kind}): {err}")
+                        # 记录错误日志
+                        with open(os.path.join(save_dir, "error_log.txt"), "a", encoding='utf-8') as f:
+                            f.write(f"[{datetime.now()}] {url}\nError ({kind}): {e}\n\n")
+                    else:
+                        fast_load = fast_load or kind == "timeout"
+                        self.log(f"   [重试 {sum(retries.values())}] {project} - {page_type} ({kind}，{delay:.1f}s 后重新排队)")
+                finally:
+                    if context:
+                        request_filter = self.request_filters.get(context)
+                        if request_filter:
+                            res["BlockedRequests"] = request_filter.blocked
+                            res["BlockedKB_est"] = round(request_filter.blocked_bytes / 1024, 1)
+                        await supervisor.release(context, stalled=stalled)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+        
+        except Exception as e:
+            self.log(f"[💥 系统错误] {project}: {e}")
         
+        self.record_result(res, results_list) # 实时保存
+
+    def load_tasks(self):
+        """读取任务表并处理断点续传，返回 (待处理 DataFrame, 已有结果列表)；读取失败返回 (None, None)"""
         try:
             self.init_autosave() # 初始化保存
+            # 调度模式下同一天的多轮巡检共用一份进度与日报：保留旧记录，只是不再跳过已完成任务 (本轮任务由排期决定)
+            keep_journal = self.cfg.resume or self.cfg.schedule_mode
             
             # 如果不续传且文件存在，则清理旧记录（init_autosave已经初始化了路径）
-            if not self.cfg.resume and self.autosave_file and os.path.exists(self.autosave_file):
+            if not keep_journal and self.journal and len(self.journal):
                  try:
+                     self.close_autosave()
                      os.remove(self.autosave_file)
-                     self.init_autosave() # 重建表头
+                     self.init_autosave() # 重建空日志
                      self.log("🧹 已清理旧进度，重新开始...")
                  except Exception as e:
                      self.log(f"⚠️ 清理旧进度失败: {e}")
 
+            import pandas as pd
             df = pd.read_excel(self.cfg.excel_path, dtype=str).dropna(subset=['URL'])
         except Exception as e:
             self.log(f"❌ 读取Excel失败: {e}")
-            return
+            return None, None
 
         results = []
         
         # 断点续传逻辑
-        if self.cfg.resume and self.autosave_file and os.path.exists(self.autosave_file):
+        if keep_journal and self.journal and len(self.journal):
             try:
-                saved_df = pd.read_csv(self.autosave_file)
-                if not saved_df.empty:
-                    # 加载旧数据到结果列表，确保报告完整
-                    results.extend(saved_df.to_dict('records'))
-                    
-                    # 获取已处理的URL集合
-                    processed_urls = set(saved_df['URL'].astype(str).str.strip())
-                    
-                    # 过滤待处理任务
-                    original_count = len(df)
-                    df = df[~df['URL'].str.strip().isin(processed_urls)]
-                    skipped_count = original_count - len(df)
-                    
-                    self.log(f"🔄 断点续传模式: 已加载 {len(saved_df)} 条历史记录，跳过 {skipped_count} 个已完成任务。")
+                # 加载旧数据到结果列表，确保报告完整
+                results.extend(self.journal.records())
+                if not self.cfg.resume:
+                    self.log(f"📅 调度模式: 已加载今日先前轮次的 {len(results)} 条记录，报告将与本轮结果合并")
+                    return df, results
+                
+                # 按 (Project, PageType, URL) 过滤已完成任务，每行 O(1) 查询
+                keys = zip(df['Project'].astype(str).str.strip(), df['PageType'].astype(str).str.strip(), df['URL'].astype(str).str.strip())
+                pending_mask = [k not in self.journal for k in keys]
+                original_count = len(df)
+                df = df[pending_mask]
+                skipped_count = original_count - len(df)
+                
+                self.log(f"🔄 断点续传模式: 已加载 {len(results)} 条历史记录，跳过 {skipped_count} 个已完成任务。")
             except Exception as e:
                 self.log(f"⚠️ 读取历史进度失败，将重新检查: {e}")
 
+        return df, results
+
+    def record_result(self, res, results_list):
+        """登记单条结果：加入结果列表 + 实时保存 (分片子进程中改为回传主进程)"""
+        results_list.append(res)
+        self.append_to_autosave(res)
+        if self.result_callback:
+            self.result_callback(res)
+
+    async def monitor_scheduler(self, scheduler, interval=30):
+        """定期输出调度状态：排队深度与各站点进行中数量"""
+        while True:
+            await asyncio.sleep(interval)
+            if scheduler.queue_depth or scheduler.in_flight:
+                self.log(f"📶 调度状态: {scheduler.describe()}")
+
+    async def inspect_rows(self, df, results):
+        """在当前进程启动浏览器并执行一批任务"""
         async with async_playwright() as p:
-            browser_args = {"headless": True, "args": ['--no-sandbox', '--disable-setuid-sandbox']}
+            # 不让 Playwright 在 Ctrl+C/SIGTERM 时直接关闭浏览器：由 STOP_REQUESTED 控制，进行中的页面可以正常结束
+            browser_args = {"headless": True, "args": ['--no-sandbox', '--disable-setuid-sandbox'], "handle_sigint": False, "handle_sigterm": False}
             if self.cfg.proxy_server:
                 browser_args["proxy"] = {"server": self.cfg.proxy_server}
             
+            # 上下文池默认容量 = 加载并发 + 留存页面上限
+            pool_size = self.cfg.context_pool_size or (
+                self.cfg.concurrent_tasks + (self.cfg.max_dwelling_pages if self.cfg.overlap_retention else 0)
+            )
+            # 浏览器守护：持有浏览器与上下文池，崩溃自动重启，按页面数/内存/卡死情况定期回收
+            supervisor = BrowserSupervisor(
+                p, browser_args, self.new_context, pool_size,
+                per_project=self.cfg.context_per_project,
+                log=self.log,
+                recycle_pages=self.cfg.browser_recycle_pages,
+                memory_limit_mb=self.cfg.browser_memory_limit_mb,
+                max_restarts=self.cfg.max_browser_restarts
+            )
             try:
-                browser = await p.chromium.launch(**browser_args)
+                await supervisor.start()
             except Exception as e:
                 self.log(f"❌ 浏览器启动失败: {e}")
                 return
 
-            semaphore = asyncio.Semaphore(self.cfg.concurrent_tasks)
-            tasks = [self.capture_task(browser, row, semaphore, results) for _, row in df.iterrows()]
+            self.dwell_slots = asyncio.Semaphore(self.cfg.max_dwelling_pages)
+            self.retry_budget = RetryBudget(max(5, int(len(df) * self.cfg.retry_budget)) if self.cfg.retry_budget > 0 else None)
+            self.start_encoders()
+            scheduler = HostScheduler(
+                self.cfg.concurrent_tasks,
+                per_host_concurrency=self.cfg.per_host_concurrency,
+                min_host_interval=self.cfg.host_min_interval
+            )
+            tasks = [self.capture_task(supervisor, row, scheduler, results) for _, row in df.iterrows()]
+            monitor = asyncio.create_task(self.monitor_scheduler(scheduler))
+            health = asyncio.create_task(supervisor.watch())
             
             try:
                 await asyncio.gather(*tasks)
@@ -723,9 +2039,115 @@ class WebsiteInspector:
                 STOP_REQUESTED = True
                 self.log("\n🛑 用户停止！正在保存已有数据...")
             finally:
-                try: await browser.close()
-                except: pass
+                monitor.cancel()
+                health.cancel()
+                await supervisor.close()
+                self.stop_encoders()
+
+    async def inspect_sharded(self, df, results):
+        """分片模式：按 Project 把任务拆到多个子进程，每个子进程独立浏览器与事件循环；
+        结果统一回传主进程，由主进程写入同一个自动保存文件并生成同一份报告"""
+        shards = split_shards(df, self.cfg.worker_processes)
+        self.log(f"🧩 分片模式: {len(shards)} 个进程 | 各分片任务数: {[len(s) for s in shards]}")
+
+        mp_ctx = multiprocessing.get_context("spawn")
+        msg_queue = mp_ctx.Queue()
+        stop_event = mp_ctx.Event()
+        pause_event = mp_ctx.Event()
+        cfg_dict = dict(vars(self.cfg))
+
+        procs = [
+            mp_ctx.Process(target=_shard_worker, args=(cfg_dict, shard.to_dict('records'), msg_queue, stop_event, pause_event))
+            for shard in shards
+        ]
+        for proc in procs: proc.start()
+
+        loop = asyncio.get_running_loop()
+        remaining = len(procs)
+        try:
+            while remaining:
+                # 同步停止/暂停状态到子进程
+                if STOP_REQUESTED: stop_event.set()
+                if self.paused: pause_event.set()
+                else: pause_event.clear()
+
+                try:
+                    kind, payload = await loop.run_in_executor(None, msg_queue.get, True, 0.5)
+                except queue.Empty:
+                    if not any(proc.is_alive() for proc in procs):
+                        self.log(f"⚠️ 有 {remaining} 个分片进程异常退出")
+                        break
+                    continue
+
+                if kind == "log":
+                    self.log(payload)
+                elif kind == "result":
+                    self.record_result(payload, results)
+                elif kind == "done":
+                    remaining -= 1
+        finally:
+            stop_event.set() # 主进程异常退出 (如第二次 Ctrl+C) 时也让子进程尽快收尾
+            for proc in procs:
+                proc.join(timeout=10)
+                if proc.is_alive(): proc.kill() # 子进程忽略 SIGTERM，只能强制结束
+
+    async def run_shard(self, df, stop_event, pause_event):
+        """分片子进程内的执行入口"""
+        async def watch_events():
+            global STOP_REQUESTED
+            while True:
+                if stop_event.is_set(): STOP_REQUESTED = True
+                self.paused = pause_event.is_set()
+                await asyncio.sleep(0.5)
+
+        watcher = asyncio.create_task(watch_events())
+        if self.cfg.skip_unchanged: # 只读，历史由主进程汇总后统一写入
+            self.url_history = UrlHistory(os.path.join(self.cfg.output_root, HISTORY_FILENAME)).load()
+        try:
+            await self.inspect_rows(df, [])
+        finally:
+            watcher.cancel()
+
+    def run_visual_diff(self, results):
+        """与前一天同项目、同页面类型的截图做视觉对比，结果写回每条记录"""
+        if not self.cfg.visual_diff:
+            return
+        if not visual_diff.available():
+            self.log("⚠️ 未安装 numpy/Pillow，跳过视觉对比")
+            return
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        pairs, targets = [], []
+        for res in results:
+            path = res.get('ScreenshotPath')
+            if res.get('Status') != 'Success' or not isinstance(path, str) or not os.path.exists(path):
+                continue
+            if res.get('Reused') is True:
+                res['DiffStatus'] = 'identical' # 沿用的截图，内容指纹未变
+                continue
+            baseline = visual_diff.find_baseline(
+                path, self.cfg.output_root, today, str(res.get('Project', '')).strip(), screenshot_stem(res.get('PageType', ''))
+            )
+            if not baseline:
+                res['DiffStatus'] = 'new' # 无历史基线
+                continue
+            pairs.append((path, baseline))
+            targets.append((res, baseline))
 
+        if not pairs:
+            return
+        self.log(f"🔬 视觉对比: {len(pairs)} 张截图与前一天基线对比中...")
+        start_t = time.time()
+        outcomes = visual_diff.compare_batch(pairs, self.cfg.diff_threshold, self.cfg.diff_workers)
+        for (res, baseline), outcome in zip(targets, outcomes):
+            res.update(outcome)
+            res['BaselinePath'] = baseline
+            res['DiffRegions'] = json.dumps(outcome.get('DiffRegions', []))
+
+        changed = sum(1 for res, _ in targets if res.get('DiffStatus') == 'changed')
+        self.log(f"🔬 视觉对比完成: {changed}/{len(pairs)} 个页面有变化 (耗时 {time.time() - start_t:.1f}s)")
+
+    def generate_reports(self, results):
         if not results:
             self.log("⚠️ 没有生成任何数据")
             return
@@ -738,6 +2160,7 @@ class WebsiteInspector:
         
         # 1. Excel
         try:
+            import pandas as pd
             pd.DataFrame(results).to_excel(os.path.join(report_dir, "report.xlsx"), index=False)
         except: pass
         
@@ -752,11 +2175,139 @@ class WebsiteInspector:
         try:
             summary_path = ReportGenerator.create_project_summary(results, report_dir)
             self.log(f"✅ 汇总报告: {summary_path}")
-            os.startfile(summary_path) # Windows Only
+            if self.cfg.open_report and hasattr(os, "startfile"): # Windows Only
+                os.startfile(summary_path)
         except: pass
         
         self.log("✨ 全部任务完成!")
 
+    async def run(self):
+        self.log(f"🚀 开始任务 | 并发数: {self.cfg.concurrent_tasks} (单站 {self.cfg.per_host_concurrency}) | 滚动策略: {self.cfg.scroll_strategy} | 代理: {self.cfg.proxy_server or '无'}")
+        
+        df, results = self.load_tasks()
+        if df is None:
+            self.close_autosave()
+            return
+
+        history = None
+        if self.cfg.schedule_mode or self.cfg.skip_unchanged:
+            history = self.url_history = UrlHistory(os.path.join(self.cfg.output_root, HISTORY_FILENAME)).load()
+        if self.cfg.schedule_mode:
+            df = self.plan_cycle(df, history)
+        previous = len(results) # 续传加载的历史记录排在前面，之后追加的才是本轮结果
+
+        if len(df) and self.cfg.worker_processes > 1 and df['Project'].nunique() > 1:
+            await self.inspect_sharded(df, results)
+        elif len(df):
+            await self.inspect_rows(df, results)
+        self.close_autosave()
+        fresh = results[previous:]
+        if previous and fresh:
+            # 先前加载的记录中，本轮重新巡检过的任务以本轮结果为准
+            redone = {ProgressJournal.key(res) for res in fresh}
+            results = [res for res in results[:previous] if ProgressJournal.key(res) not in redone] + fresh
+        if self.blobs:
+            self.write_manifest(results)
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.run_visual_diff, results)
+        except Exception as e:
+            self.log(f"❌ 视觉对比失败: {e}")
+        if history is not None:
+            self.update_history(history, fresh)
+        self.generate_reports(results)
+        if self.blobs and self.cfg.blob_retention_days > 0:
+            try:
+                blob_store.collect_garbage(self.cfg.output_root, self.cfg.blob_retention_days, log=self.log)
+            except Exception as e:
+                self.log(f"⚠️ 截图存储清理失败: {e}")
+
+    def write_manifest(self, results):
+        """把今天成功截图的 blob 路径写入当天清单 (日期目录中不再保存图片)"""
+        entries = {}
+        for res in results:
+            path = res.get('ScreenshotPath')
+            if res.get('Status') != 'Success' or not isinstance(path, str) or not path or not self.blobs.owns(path):
+                continue
+            thumb = res.get('ThumbPath')
+            key = blob_store.manifest_key(str(res.get('Project', '')).strip(), screenshot_stem(res.get('PageType', '')))
+            entries[key] = {
+                "image": self.blobs.relative(path),
+                "thumb": self.blobs.relative(thumb) if isinstance(thumb, str) and thumb and self.blobs.owns(thumb) else "",
+            }
+        if not entries:
+            return
+        try:
+            blob_store.save_manifest(self.cfg.output_root, datetime.now().strftime("%Y-%m-%d"), entries)
+            msg = f"🗃️ 截图清单已更新: {len(entries)} 条，共 {len(set(e['image'] for e in entries.values()))} 个不同截图"
+            if self.blobs.written or self.blobs.deduped: # 分片模式下截图在子进程中写入，这里没有统计
+                msg += f" | 新写入 {self.blobs.written} 个文件，去重复用 {self.blobs.deduped} 个 (节省 {self.blobs.bytes_saved / 1024 / 1024:.1f} MB)"
+            self.log(msg)
+        except Exception as e:
+            self.log(f"⚠️ 截图清单写入失败: {e}")
+
+    def plan_cycle(self, df, history):
+        """调度模式：按 URL 历史挑选本轮到期的任务，预计耗时不超过 cycle_budget_min"""
+        planner = CyclePlanner(
+            history, self.cfg.recheck_min_hours, self.cfg.recheck_max_hours,
+            default_task_time_s=self.cfg.retention_time + 15
+        )
+        # 预算按并发折算：同时进行的页面数 = 并发数 × 分片进程数
+        capacity = self.cfg.cycle_budget_min * 60 * self.cfg.concurrent_tasks * max(1, self.cfg.worker_processes)
+        tasks = [(history_key(row['Project'], row['PageType'], row['URL']), idx) for idx, row in df.iterrows()]
+        selected, stats = planner.plan(tasks, capacity)
+        self.log(
+            f"📅 调度模式: 本轮 {stats['selected']}/{stats['total']} 个任务 (到期 {stats['due']}，"
+            f"新任务 {stats['new']}，失败重查 {stats['failing']}) | 预计 {stats['estimated_s'] / 60:.1f} 页面·分钟"
+        )
+        return df.loc[selected]
+
+    def update_history(self, history, results):
+        """把本轮结果写入 URL 历史"""
+        results = [res for res in results if res.get("Status") in TERMINAL_STATUSES] # 跳过因停止请求未执行的 Pending 任务
+        changed = 0
+        for res in results:
+            if history.record(res):
+                changed += 1
+        try:
+            history.save()
+            self.log(f"📅 URL 历史已更新: {len(results)} 条，其中 {changed} 个页面内容有变化")
+        except Exception as e:
+            self.log(f"⚠️ URL 历史保存失败: {e}")
+
+def split_shards(df, n):
+    """按 Project 拆分任务 (同一项目始终落在同一分片)，贪心装箱让各分片行数尽量均衡"""
+    import pandas as pd
+    keys = df['Project'].fillna('').astype(str).str.strip()
+    groups = sorted((g for _, g in df.groupby(keys, sort=False)), key=len, reverse=True)
+    shards = [[] for _ in range(max(1, min(n, len(groups))))]
+    sizes = [0] * len(shards)
+    for g in groups:
+        i = sizes.index(min(sizes))
+        shards[i].append(g)
+        sizes[i] += len(g)
+    return [pd.concat(s) for s in shards if s]
+
+def _shard_worker(cfg_dict, records, msg_queue, stop_event, pause_event):
+    """分片子进程入口 (需为模块级函数以便 spawn 方式序列化)"""
+    # 终端的 Ctrl+C 会发给整个进程组：子进程忽略信号，统一由主进程通过 stop_event 通知，
+    # 进行中的页面正常结束并回传结果，而不是被 KeyboardInterrupt 打断
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    import pandas as pd
+    cfg = InspectionConfig()
+    cfg.__dict__.update(cfg_dict)
+    cfg.worker_processes = 1
+
+    inspector = WebsiteInspector(cfg, log_callback=lambda m: msg_queue.put(("log", m)))
+    inspector.result_callback = lambda r: msg_queue.put(("result", r))
+    try:
+        asyncio.run(inspector.run_shard(pd.DataFrame.from_records(records), stop_event, pause_event))
+    except Exception as e:
+        msg_queue.put(("log", f"[💥 分片进程错误] {e}"))
+    finally:
+        msg_queue.put(("done", None))
+
 # ================= 🖥️ GUI 界面 =================
 class LauncherApp:
     def __init__(self, root):
@@ -778,6 +2329,8 @@ class LauncherApp:
         self.proxy = tk.StringVar()
         self.concurrency = tk.IntVar(value=2)
         self.retention_time = tk.IntVar(value=15)
+        self.workers = tk.IntVar(value=1)
+        self.image_format = tk.StringVar(value="jpeg")
         
         # 尝试自动寻找同级目录的xlsx
         default_excel = os.path.join(os.path.dirname(os.path.abspath(__file__)), "urls.xlsx")
@@ -855,12 +2408,20 @@ class LauncherApp:
         ttk.Label(frame3, text="例如: http://127.0.0.1:7890").grid(row=0, column=2, sticky=tk.W, padx=5)
         
         ttk.Label(frame3, text="并发任务数:").grid(row=1, column=0, sticky=tk.W, pady=5)
-        ttk.Spinbox(frame3, from_=1, to=10, textvariable=self.concurrency, width=5).grid(row=1, column=1, sticky=tk.W, padx=5)
+        ttk.Spinbox(frame3, from_=1, to=32, textvariable=self.concurrency, width=5).grid(row=1, column=1, sticky=tk.W, padx=5)
         
         ttk.Label(frame3, text="页面留存时间(秒):").grid(row=2, column=0, sticky=tk.W, pady=5)
         ttk.Spinbox(frame3, from_=0, to=60, textvariable=self.retention_time, width=5).grid(row=2, column=1, sticky=tk.W, padx=5)
         ttk.Label(frame3, text="抵御延迟验证攻击").grid(row=2, column=2, sticky=tk.W, padx=5)
         
+        ttk.Label(frame3, text="分片进程数:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        ttk.Spinbox(frame3, from_=1, to=16, textvariable=self.workers, width=5).grid(row=3, column=1, sticky=tk.W, padx=5)
+        ttk.Label(frame3, text="按项目拆分到多个浏览器进程").grid(row=3, column=2, sticky=tk.W, padx=5)
+        
+        ttk.Label(frame3, text="截图格式:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        ttk.Combobox(frame3, textvariable=self.image_format, values=["jpeg", "webp", "png"], width=6, state="readonly").grid(row=4, column=1, sticky=tk.W, padx=5)
+        ttk.Label(frame3, text="jpeg/webp 体积约为 png 的 1/10").grid(row=4, column=2, sticky=tk.W, padx=5)
+        
         # 4. 日志区域 (最后pack，占据剩余中间空间)
         ttk.Label(main_frame, text="运行日志:").pack(side=tk.TOP, anchor=tk.W, pady=(10, 0))
         self.log_text = tk.Text(main_frame, height=8, width=70, font=('Consolas', 9), state='disabled')
@@ -901,12 +2462,14 @@ class LauncherApp:
         cfg.proxy_server = self.proxy.get().strip() or None
         cfg.concurrent_tasks = self.concurrency.get()
         cfg.retention_time = self.retention_time.get()
+        cfg.worker_processes = self.workers.get()
+        cfg.screenshot_format = self.image_format.get()
         
         # 检查是否可以断点续传
         today = datetime.now().strftime("%Y-%m-%d")
-        autosave_path = os.path.join(cfg.output_root, today, "_autosave_progress.csv")
-        if os.path.exists(autosave_path) and os.path.getsize(autosave_path) > 100:
-            # 简单判断文件存在且有内容（大于表头）
+        autosave_path = os.path.join(cfg.output_root, today, AUTOSAVE_FILENAME)
+        if os.path.exists(autosave_path) and os.path.getsize(autosave_path) > 0:
+            # 进度日志存在且有记录
             ans = messagebox.askyesno("发现未完成进度", f"检测到今日 ({today}) 有任务记录。\n\n是否继续上次的进度？\n\n【是】：仅检查剩余的网址\n【否】：重新开始（覆盖旧记录）")
             cfg.resume = ans
         
@@ -936,10 +2499,168 @@ class LauncherApp:
         self.root.after(0, lambda: self.pause_btn.config(state='disabled', text="暂停"))
         self.root.after(0, lambda: messagebox.showinfo("完成", "巡检任务已完成！"))
 
-def main():
+# ================= ⌨️ 命令行 / 守护模式 =================
+
+def _load_tkinter():
+    """按需导入 Tkinter (仅图形界面使用)"""
+    global tk, ttk, filedialog, messagebox
+    if tk is None:
+        import tkinter
+        from tkinter import filedialog as _filedialog, messagebox as _messagebox, ttk as _ttk
+        tk, ttk, filedialog, messagebox = tkinter, _ttk, _filedialog, _messagebox
+
+def load_config(path=None, overrides=None):
+    """
+    生成 InspectionConfig：先读取 JSON 配置文件 (键为 InspectionConfig 的属性名)，再应用命令行覆盖项。
+    出现未知配置项时抛出 ValueError
+    """
+    cfg = InspectionConfig()
+    values = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            values.update(json.load(f))
+    values.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    unknown = sorted(set(values) - set(cfg.__dict__))
+    if unknown:
+        raise ValueError(f"未知配置项: {', '.join(unknown)}")
+    cfg.__dict__.update(values)
+    return cfg
+
+def install_signal_handlers(log):
+    """SIGINT / SIGTERM：第一次请求安全停止 (完成当前页面并生成报告)，再次 Ctrl+C 强制退出"""
+    def handler(signum, frame):
+        global STOP_REQUESTED
+        if STOP_REQUESTED and signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        STOP_REQUESTED = True
+        log("🛑 收到停止信号，正在等待当前任务结束并保存报告... (再次 Ctrl+C 强制退出)")
+    signal.signal(signal.SIGINT, handler)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handler)
+
+def next_run_time(now, interval_min=None, at_times=None):
+    """下一次巡检时间：at_times 为每天固定时刻 ["HH:MM", ...]，否则按 interval_min 分钟间隔"""
+    if at_times:
+        candidates = []
+        for text in at_times:
+            hour, minute = (int(x) for x in text.split(":"))
+            t = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            candidates.append(t if t > now else t + timedelta(days=1))
+        return min(candidates)
+    return now + timedelta(minutes=interval_min or 1440)
+
+def run_daemon(cfg, log, interval_min=None, at_times=None, run_now=True):
+    """守护模式：按计划重复巡检 (间隔从上一轮开始时计算)，收到停止信号后在当前轮结束后退出"""
+    next_t = datetime.now() if run_now else next_run_time(datetime.now(), interval_min, at_times)
+    first = True
+    while not STOP_REQUESTED:
+        if next_t > datetime.now():
+            log(f"⏰ 下一次巡检: {next_t.strftime('%Y-%m-%d %H:%M:%S')}")
+        while not STOP_REQUESTED and datetime.now() < next_t:
+            time.sleep(1)
+        if STOP_REQUESTED:
+            break
+        if not first:
+            cfg.resume = False # 同一天的后续轮次重新巡检，而不是跳过已完成的任务 (调度模式仍保留当天先前轮次的记录用于报告)
+        first = False
+        started = datetime.now()
+        asyncio.run(WebsiteInspector(cfg, log_callback=log).run())
+        log(f"🏁 本轮巡检结束，耗时 {(datetime.now() - started).total_seconds():.0f}s")
+        next_t = next_run_time(started, interval_min, at_times)
+    log("👋 守护进程已退出")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SEO 自动巡检工具 (无参数启动图形界面)")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("gui", help="启动图形界面 (默认)")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--config", help="JSON 配置文件 (键为 InspectionConfig 属性名，如 concurrent_tasks)")
+    common.add_argument("-t", "--tasks", dest="excel_path", help="任务表 Excel (Project / PageType / URL)")
+    common.add_argument("-o", "--output", dest="output_root", help="报告存储目录")
+    common.add_argument("--proxy", dest="proxy_server", help="代理地址，如 http://127.0.0.1:7890")
+    common.add_argument("--concurrency", dest="concurrent_tasks", type=int, help="并发任务数")
+    common.add_argument("--retention", dest="retention_time", type=float, help="页面留存时间 (秒)")
+    common.add_argument("--workers", dest="worker_processes", type=int, help="分片进程数")
+    common.add_argument("--format", dest="screenshot_format", choices=["jpeg", "webp", "png"], help="截图格式")
+    common.add_argument("--scroll-strategy", dest="scroll_strategy", choices=["adaptive", "legacy"], help="滚动策略")
+    common.add_argument("--no-resume", dest="resume", action="store_const", const=False, help="忽略今日进度，重新巡检")
+    common.add_argument("--no-visual-diff", dest="visual_diff", action="store_const", const=False, help="关闭视觉对比")
+    common.add_argument("--schedule", dest="schedule_mode", action="store_const", const=True, help="调度模式: 只巡检本轮到期的任务")
+    common.add_argument("--budget", dest="cycle_budget_min", type=float, help="调度模式每轮时间预算 (分钟)")
+    common.add_argument("--skip-unchanged", dest="skip_unchanged", action="store_const", const=True, help="内容未变化的页面沿用上次截图")
+    common.add_argument("--blob-store", dest="blob_store", action="store_const", const=True, help="截图按内容哈希去重存储")
+
+    sub.add_parser("run", parents=[common], help="执行一次巡检后退出")
+    daemon = sub.add_parser("daemon", parents=[common], help="守护模式，按计划重复巡检")
+    daemon.add_argument("--interval", type=float, help="巡检间隔 (分钟，默认 1440)")
+    daemon.add_argument("--at", help="每天固定时刻，逗号分隔，如 08:00,20:00 (优先于 --interval)")
+    daemon.add_argument("--wait-first", action="store_true", help="启动后等到第一个计划时间再巡检")
+    gc = sub.add_parser("gc", help="清理内容寻址截图存储 (过期清单与不再引用的截图)")
+    gc.add_argument("-c", "--config", help="JSON 配置文件 (读取 output_root / blob_retention_days)")
+    gc.add_argument("-o", "--output", dest="output_root", help="报告存储目录")
+    gc.add_argument("--keep-days", dest="blob_retention_days", type=int, help="清单保留天数，0 为只回收无引用的截图")
+    gc.add_argument("--dry-run", action="store_true", help="只统计可回收的文件，不删除")
+    return parser.parse_args(argv)
+
+def run_gc(args, log):
+    """gc 子命令：按保留天数删除过期清单，并回收不再被任何清单引用的截图"""
+    try:
+        cfg = load_config(args.config, {"output_root": args.output_root, "blob_retention_days": args.blob_retention_days})
+    except Exception as e:
+        log(f"❌ 配置错误: {e}")
+        return 2
+    if not cfg.output_root or not os.path.isdir(cfg.output_root):
+        log(f"❌ 报告存储目录不存在: {cfg.output_root or '(未指定，使用 --output 或配置文件 output_root)'}")
+        return 2
+    blob_store.collect_garbage(cfg.output_root, cfg.blob_retention_days, dry_run=args.dry_run, log=log)
+    return 0
+
+def run_gui():
+    _load_tkinter()
     root = tk.Tk()
     app = LauncherApp(root)
     root.mainloop()
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command in (None, "gui"):
+        run_gui()
+        return 0
+
+    def log(msg):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+    if args.command == "gc":
+        return run_gc(args, log)
+
+    overrides = {k: getattr(args, k) for k in (
+        "excel_path", "output_root", "proxy_server", "concurrent_tasks", "retention_time", "worker_processes",
+        "screenshot_format", "scroll_strategy", "resume", "visual_diff", "schedule_mode", "cycle_budget_min", "skip_unchanged",
+        "blob_store"
+    )}
+    overrides["open_report"] = False
+    at_times = [t.strip() for t in args.at.split(",") if t.strip()] if getattr(args, "at", None) else None
+    try:
+        cfg = load_config(args.config, overrides)
+        for t in at_times or []:
+            datetime.strptime(t, "%H:%M")
+    except Exception as e:
+        log(f"❌ 配置错误: {e}")
+        return 2
+    if not cfg.excel_path or not os.path.exists(cfg.excel_path):
+        log(f"❌ 任务表不存在: {cfg.excel_path or '(未指定，使用 --tasks 或配置文件 excel_path)'}")
+        return 2
+    if not cfg.output_root:
+        log("❌ 未指定报告存储目录 (--output 或配置文件 output_root)")
+        return 2
+
+    install_signal_handlers(log)
+    if args.command == "run":
+        asyncio.run(WebsiteInspector(cfg, log_callback=log).run())
+    else:
+        run_daemon(cfg, log, args.interval, at_times, run_now=not args.wait_first)
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
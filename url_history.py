@@ -0,0 +1,153 @@
+import json
+import os
+import time
+
+# ================= 📅 URL 历史与巡检排期 =================
+# 巡检机器人 (screen-bot-latest.py) 的调度模式使用：记录每个 URL 的检查历史，
+# 每轮按优先级挑选到期的任务，在时间预算内优先复查失败页面与经常变化的页面，稳定页面拉长复查间隔
+
+HISTORY_FILENAME = "_url_history.json"
+HISTORY_VERSION = 1
+EWMA_ALPHA = 0.3 # 耗时/变化率的指数平滑系数
+TERMINAL_STATUSES = ("Success", "Failed") # 计入历史的结果状态
+
+
+def history_key(project, page_type, url):
+    """与 ProgressJournal.key 相同的 (Project, PageType, URL) 三元组，序列化为字符串"""
+    return "\t".join(str(x).strip() for x in (project, page_type, url))
+
+
+class UrlHistory:
+    """
+    每个 URL 一条记录:
+    LastChecked / LastSuccess (时间戳)、FailStreak (连续失败次数)、Checks / Changes (成功检查次数与其中内容变化次数)、
+    ChangeRate (变化率，指数平滑)、AvgTaskTime_s (单页耗时，指数平滑)、ContentHash (上次内容指纹)、
+    ScreenshotPath / ThumbPath / ShotHash / ShotAt (最近一次实际截图的文件、当时的指纹与时间)
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == HISTORY_VERSION:
+                self.entries = data.get("urls", {})
+        except (OSError, ValueError):
+            self.entries = {} # 文件不存在或损坏：从空历史开始
+        return self
+
+    def save(self):
+        """先写临时文件再替换，中途崩溃不会留下半个文件"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": HISTORY_VERSION, "urls": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def record(self, res, now=None):
+        """登记一条巡检结果，返回本次是否检测到内容变化 (首次检查返回 None)"""
+        if res.get("Status") not in TERMINAL_STATUSES:
+            return None # 停止请求后未执行的任务 (Pending) 不算检查过，也不算失败
+        now = now or time.time()
+        key = history_key(res.get("Project"), res.get("PageType"), res.get("URL"))
+        entry = self.entries.setdefault(key, {"Checks": 0, "Changes": 0, "FailStreak": 0, "ChangeRate": None, "AvgTaskTime_s": None})
+        entry["LastChecked"] = now
+
+        if res.get("Status") == "Failed":
+            entry["FailStreak"] = entry.get("FailStreak", 0) + 1
+            return None
+
+        entry["FailStreak"] = 0
+        entry["LastSuccess"] = now
+        task_time = sum(float(res.get(k) or 0) for k in ("ContextTime_s", "LoadTime_s", "ScreenshotTime_s"))
+        if task_time > 0:
+            prev = entry.get("AvgTaskTime_s")
+            entry["AvgTaskTime_s"] = round(task_time if prev is None else prev + EWMA_ALPHA * (task_time - prev), 2)
+
+        # 内容是否变化：优先用视觉对比结论，否则比较内容指纹
+        changed = None
+        diff_status = res.get("DiffStatus")
+        new_hash = res.get("ContentHash") or None
+        if diff_status in ("changed", "identical"):
+            changed = diff_status == "changed"
+        elif new_hash and entry.get("ContentHash"):
+            changed = new_hash != entry["ContentHash"]
+        if new_hash:
+            entry["ContentHash"] = new_hash
+        # 实际截图时记下截图路径与当时的指纹，供 skip_unchanged 沿用 (沿用的结果不刷新截图时间)
+        if res.get("ScreenshotPath") and res.get("Reused") is not True:
+            entry["ScreenshotPath"] = os.path.abspath(res["ScreenshotPath"])
+            entry["ThumbPath"] = os.path.abspath(res["ThumbPath"]) if res.get("ThumbPath") else ""
+            entry["ShotHash"] = new_hash
+            entry["ShotAt"] = now
+
+        if changed is not None:
+            entry["Checks"] = entry.get("Checks", 0) + 1
+            entry["Changes"] = entry.get("Changes", 0) + int(changed)
+            prev = entry.get("ChangeRate")
+            entry["ChangeRate"] = round(float(changed) if prev is None else prev + EWMA_ALPHA * (changed - prev), 4)
+        return changed
+
+
+class CyclePlanner:
+    """
+    按历史为每个任务计算复查间隔与优先级，并在时间预算内挑选本轮任务:
+    - 从未检查过的任务: 立即到期，优先级最高
+    - 连续失败的任务: 按 min_interval 复查 (失败越多越靠前)
+    - 其余任务: 复查间隔 = min_interval / 变化率，限制在 [min_interval, max_interval]；
+      没有变化记录时按中间值 (变化率 0.5 以下的先验) 处理
+    优先级 = 距上次检查的时间 / 复查间隔 (>= 1 即到期)
+    """
+    def __init__(self, history, min_interval_h=1.0, max_interval_h=72.0, default_task_time_s=30.0):
+        self.history = history
+        self.min_interval = max(60.0, float(min_interval_h) * 3600)
+        self.max_interval = max(self.min_interval, float(max_interval_h) * 3600)
+        self.default_task_time = default_task_time_s
+
+    def interval(self, entry):
+        """该任务的复查间隔 (秒)"""
+        if entry.get("FailStreak"):
+            return self.min_interval
+        rate = entry.get("ChangeRate")
+        if rate is None:
+            rate = 0.25 # 尚无变化记录：介于频繁与稳定之间
+        return min(self.max_interval, max(self.min_interval, self.min_interval / max(rate, 1e-6)))
+
+    def priority(self, entry, now):
+        if not entry or "LastChecked" not in entry:
+            return float("inf")
+        ratio = (now - entry["LastChecked"]) / self.interval(entry)
+        return ratio * (1 + entry.get("FailStreak", 0)) if ratio >= 1 else ratio
+
+    def plan(self, tasks, capacity_s, now=None):
+        """
+        tasks: [(key, 行数据), ...]；capacity_s: 本轮可用的任务时间 (秒，已乘并发数)，<= 0 为不限。
+        返回 (本轮任务列表 [行数据], 统计 dict)，本轮任务按优先级从高到低排列
+        """
+        now = now or time.time()
+        scored = []
+        for key, row in tasks:
+            entry = self.history.get(key) or {}
+            scored.append((self.priority(entry, now), entry.get("AvgTaskTime_s") or self.default_task_time, key, row))
+        due = [item for item in scored if item[0] >= 1]
+        due.sort(key=lambda item: -item[0])
+
+        selected, used = [], 0.0
+        for prio, cost, key, row in due:
+            if capacity_s > 0 and selected and used + cost > capacity_s:
+                continue # 放不下较贵的任务时继续尝试更便宜的
+            selected.append(row)
+            used += cost
+        stats = {
+            "total": len(tasks),
+            "due": len(due),
+            "selected": len(selected),
+            "new": sum(1 for item in due if item[0] == float("inf")),
+            "failing": sum(1 for item in due if (self.history.get(item[2]) or {}).get("FailStreak")),
+            "estimated_s": round(used, 1),
+        }
+        return selected, stats
@@ -0,0 +1,203 @@
+import hashlib
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import blob_store
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:
+    np = None
+    Image = None
+
+# ================= 🔬 视觉对比 (基线截图 vs 今日截图) =================
+# 流程: 字节哈希一致 -> 直接判定一致；感知哈希一致 -> 判定一致；否则做分块 SSIM 并标记变化区域
+
+DIFF_WIDTH = 480 # SSIM 计算宽度 (px)，整页截图统一缩放到该宽度
+TILE_SIZE = 16 # SSIM 分块大小 (px，基于 DIFF_WIDTH 缩放后)
+HASH_WIDTH = 64 # 感知哈希网格宽度
+MAX_REGIONS = 30 # 每张图最多标记的变化区域数
+IMAGE_EXTS = (".jpg", ".webp", ".png")
+DATE_DIR_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def available():
+    """numpy 与 Pillow 均已安装时才可用"""
+    return np is not None and Image is not None
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_gray(path, width=DIFF_WIDTH):
+    """以灰度读入并缩放到指定宽度；JPEG 使用 draft 模式在解码阶段直接降采样"""
+    img = Image.open(path)
+    img.draft("L", (width, max(1, img.height * width // max(1, img.width))))
+    img = img.convert("L")
+    if img.width != width:
+        img = img.resize((width, max(1, round(img.height * width / img.width))), Image.BILINEAR)
+    return np.asarray(img, dtype=np.float32)
+
+
+def perceptual_hash(gray, width=HASH_WIDTH):
+    """差值哈希 (dHash)：缩放到 width+1 列后比较相邻像素，行数随页面长度等比变化"""
+    h = max(1, round(gray.shape[0] * width / gray.shape[1]))
+    small = np.asarray(Image.fromarray(gray.astype(np.uint8)).resize((width + 1, h), Image.BILINEAR), dtype=np.int16)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+def tiled_ssim(a, b, tile=TILE_SIZE):
+    """
+    向量化分块 SSIM：把图像 reshape 成 (行块, tile, 列块, tile)，一次性算出每个块的均值/方差/协方差。
+    返回每个块的 SSIM 矩阵 (只比较两图重叠部分)
+    """
+    h = min(a.shape[0], b.shape[0]) // tile * tile
+    w = min(a.shape[1], b.shape[1]) // tile * tile
+    if h == 0 or w == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    A = a[:h, :w].reshape(h // tile, tile, w // tile, tile)
+    B = b[:h, :w].reshape(h // tile, tile, w // tile, tile)
+
+    mu_a = A.mean(axis=(1, 3))
+    mu_b = B.mean(axis=(1, 3))
+    da = A - mu_a[:, None, :, None]
+    db = B - mu_b[:, None, :, None]
+    var_a = (da * da).mean(axis=(1, 3))
+    var_b = (db * db).mean(axis=(1, 3))
+    cov = (da * db).mean(axis=(1, 3))
+
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    return ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+
+
+def changed_regions(mask, limit=MAX_REGIONS):
+    """把变化块按 4 邻接合并成矩形区域，返回 [(行, 列, 行数, 列数)]，按面积从大到小"""
+    rows, cols = mask.shape
+    seen = np.zeros_like(mask, dtype=bool)
+    regions = []
+    for r0, c0 in zip(*np.nonzero(mask)):
+        if seen[r0, c0]:
+            continue
+        seen[r0, c0] = True
+        top, left, bottom, right = r0, c0, r0, c0
+        q = deque([(r0, c0)])
+        while q:
+            r, c = q.popleft()
+            top, left, bottom, right = min(top, r), min(left, c), max(bottom, r), max(right, c)
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and mask[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    q.append((nr, nc))
+        regions.append((int(top), int(left), int(bottom - top + 1), int(right - left + 1)))
+    regions.sort(key=lambda x: x[2] * x[3], reverse=True)
+    return regions[:limit]
+
+
+def compare_images(new_path, base_path, threshold=0.90):
+    """
+    对比一对截图，返回 dict:
+    DiffStatus: identical / changed；DiffScore: 平均 SSIM；ChangedPct: 变化面积百分比；
+    DiffRegions: [[x, y, w, h], ...] (相对今日截图尺寸的比例，便于报告中按百分比定位)
+    """
+    result = {"DiffStatus": "identical", "DiffScore": 1.0, "ChangedPct": 0.0, "DiffRegions": []}
+
+    # 1. 字节完全一致：无需解码
+    if os.path.getsize(new_path) == os.path.getsize(base_path) and file_digest(new_path) == file_digest(base_path):
+        return result
+
+    a = load_gray(new_path)
+    b = load_gray(base_path)
+
+    # 2. 感知哈希一致：视为无变化
+    if a.shape == b.shape and np.array_equal(perceptual_hash(a), perceptual_hash(b)):
+        return result
+
+    # 3. 分块 SSIM
+    ssim = tiled_ssim(a, b)
+    mask = ssim < threshold
+    tile_rows = a.shape[0] // TILE_SIZE
+    tile_cols = a.shape[1] // TILE_SIZE
+
+    # 页面长度变化：今日截图多出来的部分整体记为变化
+    if tile_rows > mask.shape[0]:
+        grown = np.zeros((tile_rows, mask.shape[1]), dtype=bool)
+        grown[:mask.shape[0]] = mask
+        grown[mask.shape[0]:] = True
+        mask = grown
+
+    total_tiles = max(1, tile_rows * tile_cols)
+    changed = int(mask.sum()) + max(0, b.shape[0] // TILE_SIZE - tile_rows) * tile_cols # 页面变短同样计入
+    if changed == 0:
+        result["DiffScore"] = round(float(ssim.mean()), 4) if ssim.size else 1.0
+        return result
+
+    height, width = a.shape
+    regions = []
+    for r, c, nr, nc in changed_regions(mask):
+        regions.append([
+            round(c * TILE_SIZE / width, 4), round(r * TILE_SIZE / height, 4),
+            round(nc * TILE_SIZE / width, 4), round(nr * TILE_SIZE / height, 4)
+        ])
+
+    result.update({
+        "DiffStatus": "changed",
+        "DiffScore": round(float(ssim.mean()), 4) if ssim.size else 0.0,
+        "ChangedPct": round(min(100.0, changed * 100.0 / total_tiles), 2),
+        "DiffRegions": regions
+    })
+    return result
+
+
+def _compare_job(args):
+    new_path, base_path, threshold = args
+    try:
+        return compare_images(new_path, base_path, threshold)
+    except Exception as e:
+        return {"DiffStatus": "error", "DiffError": str(e)[:100]}
+
+
+def find_baseline(screenshot_path, output_root, today, project=None, stem=None):
+    """
+    在 output_root 下找 today 之前最近一天、同项目同页面类型的截图 (任意图片格式)。
+    截图存放在内容寻址存储中时 (路径里没有项目/页面信息)，需传入 project 与 stem；每一天先查清单再查日期目录
+    """
+    project_dir = project if project is not None else os.path.basename(os.path.dirname(screenshot_path))
+    stem = stem if stem is not None else os.path.splitext(os.path.basename(screenshot_path))[0]
+    try:
+        days = sorted((d for d in os.listdir(output_root) if DATE_DIR_RE.match(d) and d < today), reverse=True)
+    except OSError:
+        return None
+    for day in days:
+        candidate = blob_store.resolve(output_root, day, project_dir, stem)
+        if candidate:
+            return candidate
+        for ext in IMAGE_EXTS:
+            candidate = os.path.join(output_root, day, project_dir, stem + ext)
+            if os.path.exists(candidate):
+                return candidate
+    return None
+
+
+def compare_batch(pairs, threshold=0.90, workers=0):
+    """
+    批量对比 [(今日截图, 基线截图), ...]，多进程并行 (CPU 密集)。
+    返回与 pairs 顺序一致的结果列表
+    """
+    if not pairs:
+        return []
+    jobs = [(new, base, threshold) for new, base in pairs]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        return [_compare_job(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(_compare_job, jobs, chunksize=4))